@@ -1,5 +1,6 @@
 """Command-line interface for llamate."""
 import argparse
+import importlib
 import sys
 from typing import List, Optional
 
@@ -7,12 +8,23 @@ from .. import constants
 from ..core import config
 from ..core.version import get_version
 from ..services.aliases import get_model_aliases
-from .commands import config as config_commands
-from .commands import init as init_commands
-from .commands import model as model_commands
-from .commands import run as run_commands
-from .commands import serve as serve_commands
-from .commands import update as update_commands
+
+
+def _command(module_name: str, func_name: str):
+    """Return a handler that imports the command module only when it runs.
+
+    Args:
+        module_name: Module under llamate.cli.commands
+        func_name: Command function in that module
+
+    Returns:
+        Callable taking the parsed arguments
+    """
+    def handler(args):
+        module = importlib.import_module(f"{__package__}.commands.{module_name}")
+        return getattr(module, func_name)(args)
+    handler.__name__ = func_name
+    return handler
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -27,7 +39,7 @@ def create_parser() -> argparse.ArgumentParser:
                              help='Override the GPU backend for llama-server download')
     init_parser.add_argument('--arch', choices=['amd64', 'arm64', 'x64', 'aarch64'],
                              help='Override system architecture (amd64, arm64, etc)')
-    init_parser.set_defaults(func=init_commands.init_command)
+    init_parser.set_defaults(func=_command('init', 'init_command'))
 
     # Set command
     set_parser = subparsers.add_parser('set', help='Set global config or model arguments',
@@ -35,7 +47,7 @@ def create_parser() -> argparse.ArgumentParser:
                                       "Global keys: " + ", ".join(constants.DEFAULT_CONFIG.keys()))
     set_parser.add_argument('model_name', nargs='?', help='Model name or KEY=VALUE for global config')
     set_parser.add_argument('model_args', nargs='*', help='Additional KEY=VALUE pairs for model config')
-    set_parser.set_defaults(func=config_commands.handle_set_command)
+    set_parser.set_defaults(func=_command('config', 'handle_set_command'))
 
     # Model management commands
     alias_keys = list(get_model_aliases().keys())[:10]
@@ -58,36 +70,36 @@ def create_parser() -> argparse.ArgumentParser:
                           help='Disable automatic GPU configuration')
     add_parser.add_argument('--no-pull', action='store_true',
                           help='Skip downloading the GGUF file after adding the model')
-    add_parser.set_defaults(func=model_commands.model_add_command)
+    add_parser.set_defaults(func=_command('model', 'model_add_command'))
 
     list_parser = subparsers.add_parser('list', help='List configured models')
-    list_parser.set_defaults(func=model_commands.model_list_command)
+    list_parser.set_defaults(func=_command('model', 'model_list_command'))
 
     remove_parser = subparsers.add_parser('remove', help='Remove a model')
     remove_parser.add_argument('model_name', help='Name of the model to remove')
     remove_parser.add_argument('--delete-gguf', action='store_true',
                              help='Also delete the GGUF file')
-    remove_parser.set_defaults(func=model_commands.model_remove_command)
+    remove_parser.set_defaults(func=_command('model', 'model_remove_command'))
 
     # Pull command
     pull_parser = subparsers.add_parser('pull', help='Download GGUF file')
     pull_parser.add_argument('model_name_or_spec', help='Model to download (name, repo:file, or URL)')
-    pull_parser.set_defaults(func=model_commands.model_pull_command)
+    pull_parser.set_defaults(func=_command('model', 'model_pull_command'))
 
     # Show command
     show_parser = subparsers.add_parser('show', help='Show model information')
     show_parser.add_argument('model_name', help='Name of the model to show')
-    show_parser.set_defaults(func=model_commands.model_show_command)
+    show_parser.set_defaults(func=_command('model', 'model_show_command'))
 
     copy_parser = subparsers.add_parser('copy', help='Copy a model configuration')
     copy_parser.add_argument('source_model', help='Name or alias of the source model')
     copy_parser.add_argument('new_model_name', help='New name for the copied model')
-    copy_parser.set_defaults(func=model_commands.model_copy_command)
+    copy_parser.set_defaults(func=_command('model', 'model_copy_command'))
 
     # List aliases command
     list_aliases_parser = subparsers.add_parser('list-aliases',
                                                 help='List all available model aliases')
-    list_aliases_parser.set_defaults(func=model_commands.model_list_aliases_command)
+    list_aliases_parser.set_defaults(func=_command('model', 'model_list_aliases_command'))
 
     # Config commands
     config_parser = subparsers.add_parser('config', help='Model configuration commands')
@@ -97,44 +109,44 @@ def create_parser() -> argparse.ArgumentParser:
     config_set.add_argument('model_name', help='Model name')
     config_set.add_argument('key', help='Argument name')
     config_set.add_argument('value', help='Argument value')
-    config_set.set_defaults(func=config_commands.config_set_command)
+    config_set.set_defaults(func=_command('config', 'config_set_command'))
 
     config_get = config_subparsers.add_parser('get', help='Get model argument')
     config_get.add_argument('model_name', help='Model name')
     config_get.add_argument('key', help='Argument name')
-    config_get.set_defaults(func=config_commands.config_get_command)
+    config_get.set_defaults(func=_command('config', 'config_get_command'))
 
     config_list = config_subparsers.add_parser('list', help='List model arguments')
     config_list.add_argument('model_name', help='Model name')
-    config_list.set_defaults(func=config_commands.config_list_args_command)
+    config_list.set_defaults(func=_command('config', 'config_list_args_command'))
 
     config_remove = config_subparsers.add_parser('remove', help='Remove model argument')
     config_remove.add_argument('model_name', help='Model name')
     config_remove.add_argument('key', help='Argument name')
-    config_remove.set_defaults(func=config_commands.config_remove_arg_command)
+    config_remove.set_defaults(func=_command('config', 'config_remove_arg_command'))
 
     # Serve command
     serve_parser = subparsers.add_parser('serve', help='Run the llama-swap server')
     serve_parser.add_argument('--port', type=int, help='Port to run llama-swap on')
     serve_parser.add_argument('--public', action='store_true',
                               help='Listen on all interfaces (public) instead of localhost')
-    serve_parser.set_defaults(func=serve_commands.serve_command)
+    serve_parser.set_defaults(func=_command('serve', 'serve_command'))
 
     # Update command
     update_parser = subparsers.add_parser('update', help='Update llamate CLI, llama-server, and llama-swap')
     update_parser.add_argument('--arch', help='Override system architecture (amd64, arm64, etc)')
-    update_parser.set_defaults(func=update_commands.update_command)
+    update_parser.set_defaults(func=_command('update', 'update_command'))
 
     # Run command
     run_parser = subparsers.add_parser('run', help='Run a model in interactive chat mode')
     run_parser.add_argument('model_name', help='Name of the model to run')
     run_parser.add_argument('--host', default='localhost', help='Host for the llama-swap API')
     run_parser.add_argument('--port', type=int, help='Port of the llama-swap server')
-    run_parser.set_defaults(func=run_commands.run_command)
+    run_parser.set_defaults(func=_command('run', 'run_command'))
 
     # Print command
     print_parser = subparsers.add_parser('print', help='Print the llama-swap config')
-    print_parser.set_defaults(func=config_commands.print_config_command)
+    print_parser.set_defaults(func=_command('config', 'print_config_command'))
 
     return parser
 
@@ -161,7 +173,7 @@ def main(args: Optional[List[str]] = None) -> int:
                 print("llamate needs to be initialized.")
                 if reinitialize == 'y' or reinitialize == 'yes':
                     print("Initializing llamate...")
-                    init_commands.init_command(argparse.Namespace(backend=None))
+                    _command('init', 'init_command')(argparse.Namespace(backend=None))
                     return 0
                 else:
                     print("Initialization skipped.")
@@ -169,7 +181,7 @@ def main(args: Optional[List[str]] = None) -> int:
                     return 1
 
             print("Re-initializing llamate...")
-            init_commands.init_command(argparse.Namespace(backend=None))
+            _command('init', 'init_command')(argparse.Namespace(backend=None))
 
         if hasattr(parsed_args, 'func'):
             parsed_args.func(parsed_args)
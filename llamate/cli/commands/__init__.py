@@ -1,32 +1,31 @@
-"""Command implementations for llamate CLI."""
+"""Command implementations for llamate CLI.
 
-from .init import init_command
-from .model import (
-    model_add_command,
-    model_list_command,
-    model_remove_command
-)
-from .config import (
-    config_set_command,
-    config_get_command,
-    config_list_args_command,
-    config_remove_arg_command,
-    handle_set_command
-)
-from .run import run_command
-from .serve import serve_command, print_config_command
+Submodules are imported on first attribute access so that importing the
+CLI does not pull in every command's dependencies up front.
+"""
+import importlib
 
-__all__ = [
-    'init_command',
-    'model_add_command',
-    'model_list_command',
-    'model_remove_command',
-    'config_set_command',
-    'config_get_command',
-    'config_list_args_command',
-    'config_remove_arg_command',
-    'handle_set_command',
-    'serve_command',
-    'print_config_command',
-    'run_command'
-]
\ No newline at end of file
+_EXPORTS = {
+    'init_command': 'init',
+    'model_add_command': 'model',
+    'model_list_command': 'model',
+    'model_remove_command': 'model',
+    'config_set_command': 'config',
+    'config_get_command': 'config',
+    'config_list_args_command': 'config',
+    'config_remove_arg_command': 'config',
+    'handle_set_command': 'config',
+    'serve_command': 'serve',
+    'print_config_command': 'serve',
+    'run_command': 'run',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
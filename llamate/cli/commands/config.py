@@ -53,7 +53,7 @@ def handle_set_command(args) -> None:
     elif hasattr(args, 'model_name') and '=' in args.model_name:
         # Global config setting with KEY=VALUE
         key, value = args.model_name.split('=', 1)
-        global_config = config.load_global_config()
+        global_config = dict(config.load_global_config())
         if key not in config.constants.DEFAULT_CONFIG:
             print(f"Warning: Key '{key}' is not a standard global config key")
         global_config[key] = value
@@ -72,7 +72,7 @@ def set_global_command(key: str, value: str) -> None:
         key: Config key to set
         value: Value to set
     """
-    global_config = config.load_global_config()
+    global_config = dict(config.load_global_config())
     if key not in config.constants.DEFAULT_CONFIG:
         print(f"Warning: Key '{key}' is not a standard global config key")
     global_config[key] = value
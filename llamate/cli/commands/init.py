@@ -19,7 +19,7 @@ def init_command(args) -> None:
 
     # Create required directories
     config.constants.LLAMATE_HOME.mkdir(parents=True, exist_ok=True)
-    global_config = config.load_global_config()
+    global_config = dict(config.load_global_config())
     # Save arch override if provided
     if args.arch:
         global_config['arch_override'] = args.arch
@@ -116,7 +116,7 @@ def model_remove_command(args) -> None:
         print(f"Model '{args.model_name}' definition removed.")
 
         # Remove any aliases pointing to this model
-        global_config = config.load_global_config()
+        global_config = dict(config.load_global_config())
         aliases = global_config.get("aliases", {})
         updated_aliases = {a: m for a, m in aliases.items() if m != args.model_name}
         if len(updated_aliases) != len(aliases):
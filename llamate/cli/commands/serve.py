@@ -212,7 +212,9 @@ def serve_command(args) -> None:
             monitor_thread.join(timeout=1)
 
             # If process exited normally (not due to config change), we should exit too
-            if process.returncode != 0 and process.returncode != 143:  # 143 is SIGTERM
+            # 143 is a shell's exit status for SIGTERM; Popen reports a process killed
+            # by the SIGTERM terminate_process sends as -SIGTERM
+            if process.returncode not in (0, 143, -signal.SIGTERM):
                 print(f"llama-swap exited with code {process.returncode}")
                 break
 
@@ -44,7 +44,7 @@ def update_command(args) -> None:
 
     print(f"\nCurrent llamate version: {version.get_version()}")
 
-    global_config = config.load_global_config()
+    global_config = dict(config.load_global_config())
     bin_dir = config.constants.LLAMATE_HOME / "bin"
     bin_dir.mkdir(exist_ok=True)
 
@@ -1,5 +1,6 @@
 """Global constants and default configurations for llamate."""
 from pathlib import Path
+from types import MappingProxyType
 
 # Global paths will be initialized by core.config
 LLAMATE_HOME = None
@@ -9,13 +10,13 @@ GGUFS_DIR = None
 LLAMA_SWAP_CONFIG_FILE = None # Added for consistency, though it's set in config.py
 LLAMA_SWAP_DEFAULT_PORT = 11434
 
-# Default configuration
-DEFAULT_CONFIG = {
+# Default configuration (read-only; core.config rebinds it when paths change)
+DEFAULT_CONFIG = MappingProxyType({
     "llama_server_path": "",
     "ggufs_storage_path": "",  # Set during initialization
     "llama_swap_listen_port": LLAMA_SWAP_DEFAULT_PORT,
     "aliases": {}
-}
+})
 
 DEFAULT_MODEL_CONFIG = {
     "hf_repo": "",
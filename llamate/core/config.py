@@ -1,6 +1,10 @@
 """Configuration management for llamate."""
+import copy
+import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
 
 import yaml
 
@@ -21,7 +25,8 @@ def init_paths(base_path: Optional[Path] = None) -> None:
     """Initialize global paths for llamate.
 
     Args:
-        base_path: Optional custom base path. If None, uses ~/.config/llamate
+        base_path: Optional custom base path. If None, uses $LLAMATE_HOME when set,
+            otherwise ~/.config/llamate
 
     Raises:
         ValueError: If base_path is not writable
@@ -29,12 +34,17 @@ def init_paths(base_path: Optional[Path] = None) -> None:
     if base_path is not None and not (base_path.exists() or base_path.parent.exists()):
         raise ValueError(f"Base path {base_path} does not exist and cannot be created")
 
+    if base_path is None and os.environ.get("LLAMATE_HOME"):
+        base_path = Path(os.environ["LLAMATE_HOME"])
     constants.LLAMATE_HOME = base_path or Path.home() / ".config" / "llamate"
     constants.LLAMATE_CONFIG_FILE = constants.LLAMATE_HOME / "llamate.yaml"
     constants.LLAMA_SWAP_CONFIG_FILE = constants.LLAMATE_HOME / "config.yaml"
     constants.MODELS_DIR = constants.LLAMATE_HOME / "models"
     constants.GGUFS_DIR = constants.LLAMATE_HOME / "ggufs"
-    constants.DEFAULT_CONFIG["ggufs_storage_path"] = str(constants.GGUFS_DIR)
+    constants.DEFAULT_CONFIG = MappingProxyType({
+        **constants.DEFAULT_CONFIG,
+        "ggufs_storage_path": str(constants.GGUFS_DIR),
+    })
 
 def _ensure_config_dir() -> None:
     """Ensure configuration directory exists.
@@ -47,24 +57,38 @@ def _ensure_config_dir() -> None:
     except (OSError, PermissionError) as e:
         raise RuntimeError(f"Failed to create config directory {constants.LLAMATE_HOME}: {e}")
 
-def load_global_config() -> Dict[str, Any]:
-    """Load global configuration from YAML file, merging with defaults."""
-    default_config = constants.DEFAULT_CONFIG.copy()
+@lru_cache(maxsize=32)
+def _read_yaml(path: Path, mtime_ns: int, size: int) -> Any:
+    """Parse a YAML file, memoized on its path, mtime and size.
 
+    Callers must not mutate the returned object; use _load_yaml instead.
+    """
+    return yaml.safe_load(path.read_bytes())
+
+def _load_yaml(path: Path) -> Any:
+    """Return a private copy of the parsed YAML file, reusing a cached parse if unchanged."""
+    st = path.stat()
+    return copy.deepcopy(_read_yaml(path, st.st_mtime_ns, st.st_size))
+
+def load_global_config() -> Mapping[str, Any]:
+    """Load global configuration from YAML file, merging with defaults.
+
+    Returns the read-only defaults when no config file exists, so callers
+    that modify the result must take a dict() copy first.
+    """
     if not constants.LLAMATE_CONFIG_FILE.exists():
-        return default_config
+        return constants.DEFAULT_CONFIG
 
     try:
-        with open(constants.LLAMATE_CONFIG_FILE, 'r') as f:
-            user_config = yaml.safe_load(f) or {}
+        user_config = _load_yaml(constants.LLAMATE_CONFIG_FILE) or {}
 
-            # Merge user config with defaults
-            merged_config = {**default_config, **user_config}
-            return merged_config
+        # Merge user config with defaults
+        merged_config = {**constants.DEFAULT_CONFIG, **user_config}
+        return merged_config
     except yaml.YAMLError as e:
         raise RuntimeError(f"Failed to load config file {constants.LLAMATE_CONFIG_FILE}: {e}")
 
-def save_global_config(config: Dict[str, Any]) -> None:
+def save_global_config(config: Mapping[str, Any]) -> None:
     """Save global configuration to YAML file.
 
     Args:
@@ -76,7 +100,8 @@ def save_global_config(config: Dict[str, Any]) -> None:
     _ensure_config_dir()
     try:
         with open(constants.LLAMATE_CONFIG_FILE, 'w') as f:
-            yaml.dump(config, f)
+            yaml.dump(dict(config), f)
+        _read_yaml.cache_clear()
     except (yaml.YAMLError, OSError) as e:
         raise RuntimeError(f"Failed to save config file {constants.LLAMATE_CONFIG_FILE}: {e}")
 
@@ -98,8 +123,7 @@ def load_model_config(model_name: str) -> Dict[str, Any]:
         raise ValueError(f"Model '{model_name}' not found")
 
     try:
-        with open(model_file, 'r') as f:
-            config = yaml.safe_load(f) or {}
+        config = _load_yaml(model_file) or {}
 
         # Handle backward compatibility
         if "default_args" in config:
@@ -124,6 +148,7 @@ def save_model_config(model_name: str, config: Dict[str, Any]) -> None:
         model_file = constants.MODELS_DIR / f"{model_name}.yaml"
         with open(model_file, 'w') as f:
             yaml.dump(config, f)
+        _read_yaml.cache_clear()
 
         # After saving the model config, update the llama-swap config file
         # Import here to avoid circular imports
@@ -157,8 +182,8 @@ def register_alias(alias: str, model_name: str) -> None:
         raise ModelNotFoundError(f"Model '{model_name}' not found")
 
     # Register alias
-    global_config = load_global_config()
-    aliases = global_config.get("aliases", {})
+    global_config = dict(load_global_config())
+    aliases = dict(global_config.get("aliases", {}))
     aliases[alias] = model_name
     global_config["aliases"] = aliases
     save_global_config(global_config)
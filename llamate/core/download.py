@@ -1,29 +1,73 @@
-from typing import Optional
+from typing import Optional, Tuple
 """Download functionality for llamate."""
 import json
+import math
 import os # Added for os.chmod
+import queue
 import shutil
+import socket
 import ssl
 import tarfile
+import threading
+import time
 import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 import certifi
 import sys
 import requests
 import re
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+import urllib3
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
 from urllib.parse import urlparse
 from ..core import platform
 import urllib
 from ..utils.exceptions import InvalidURLError, DownloadError
 
+# Fresh downloads at least this large are fetched as parallel byte ranges
+PARALLEL_MIN_SIZE = 64 * 1024 * 1024
+PARALLEL_SEGMENT_SIZE = 16 * 1024 * 1024
+PARALLEL_MAX_WORKERS = 8
+
+class _TunedAdapter(HTTPAdapter):
+    """HTTPAdapter with a larger receive buffer for high-latency model downloads."""
+
+    # urllib3's defaults already include TCP_NODELAY
+    socket_options = HTTPConnection.default_socket_options + [
+        (socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024),
+    ]
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['socket_options'] = self.socket_options
+        return super().init_poolmanager(*args, **kwargs)
+
+def _build_session() -> requests.Session:
+    """Create the shared HTTP session with pooled, retrying connections."""
+    session = requests.Session()
+    retry = Retry(total=5, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+    adapter = _TunedAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+# Shared across downloads so TCP/TLS connections are reused
+_SESSION = _build_session()
+_CA_BUNDLE = certifi.where()
+
+@lru_cache(maxsize=1)
+def _ssl_context() -> ssl.SSLContext:
+    """SSL context over certifi's CA bundle, loaded once per process."""
+    return ssl.create_default_context(cafile=_CA_BUNDLE)
+
+_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
 def format_bytes(size: int) -> str:
     """Convert bytes to human-readable format."""
-    power = 2**10
-    for unit in ("B", "KB", "MB", "GB", "TB"):
-        if size < power:
-            return f"{size:.1f} {unit}"
-        size /= power
-    return f"{size:.1f} TB" # Handle values larger than TB
+    idx = min(len(_UNITS) - 1, int(math.log2(max(size, 1))) // 10)
+    return f"{size / (1 << (idx * 10)):.1f} {_UNITS[idx]}"
 
 def validate_url(url: str) -> None:
     """Validate a URL for download.
@@ -45,6 +89,227 @@ def validate_url(url: str) -> None:
     except Exception as e:
         raise InvalidURLError(f"Invalid URL '{url}': {e}")
 
+def _probe_download(url: str, timeout: int) -> Tuple[int, bool]:
+    """Return the size of a remote file and whether the server accepts byte ranges.
+
+    Servers that reject HEAD are reported as (0, False) so callers fall back
+    to a single streamed GET.
+    """
+    try:
+        response = _SESSION.head(url, allow_redirects=True, verify=_CA_BUNDLE, timeout=timeout)
+        response.raise_for_status()
+    except requests.exceptions.RequestException:
+        return 0, False
+    try:
+        total_size = int(response.headers.get('content-length', 0))
+    except ValueError:
+        total_size = 0
+    return total_size, response.headers.get('accept-ranges', '').lower() == 'bytes'
+
+def _preallocate(fd: int, size: int) -> None:
+    """Reserve size bytes for fd up front so the file is laid out contiguously."""
+    if hasattr(os, 'posix_fallocate'):
+        try:
+            os.posix_fallocate(fd, 0, size)
+            return
+        except OSError:
+            pass  # Filesystem does not support it; fall back to a sparse extend
+    os.ftruncate(fd, size)
+
+# Bytes written between resume checkpoints in the .meta file
+META_CHECKPOINT_SIZE = 16 * 1024 * 1024
+
+# Minimum seconds between progress line redraws
+PROGRESS_INTERVAL = 0.25
+
+class _ProgressPrinter:
+    """Redraw the progress line at most every PROGRESS_INTERVAL seconds."""
+
+    def __init__(self, total_size: int):
+        self.total_size = total_size
+        self._last_print = 0.0
+
+    def update(self, downloaded: int) -> None:
+        if self.total_size <= 0:
+            return
+        now = time.monotonic()
+        # The final update always prints so the line ends at 100%
+        if now - self._last_print < PROGRESS_INTERVAL and downloaded < self.total_size:
+            return
+        self._last_print = now
+        progress = downloaded / self.total_size * 100
+        print(f"\rDownloading: {format_bytes(downloaded)}/{format_bytes(self.total_size)} ({progress:.1f}%)",
+              end='', flush=True)
+
+def _fetch_range(url: str, start: int, end: int, fd: int, timeout: int, on_progress) -> None:
+    """Download bytes start..end (inclusive) of url into fd at the same offset."""
+    headers = {'Range': f'bytes={start}-{end}'}
+    with _SESSION.get(url, headers=headers, stream=True, verify=_CA_BUNDLE, timeout=timeout) as response:
+        response.raise_for_status()
+        if response.status_code != 206:
+            raise DownloadError(f"Server ignored range request for bytes {start}-{end}")
+        offset = start
+        for chunk in response.iter_content(chunk_size=1024 * 1024):
+            if not chunk:
+                continue
+            os.pwrite(fd, chunk, offset)
+            offset += len(chunk)
+            on_progress(len(chunk))
+    if offset != end + 1:
+        raise DownloadError(f"Incomplete range {start}-{end}: got {offset - start} bytes")
+
+def _download_ranges(url: str, tmp_file: Path, meta_file: Path, total_size: int, timeout: int,
+                     state: Optional[dict] = None) -> int:
+    """Download url into tmp_file using concurrent range requests.
+
+    Completed segments are recorded in meta_file as they finish, so an interrupted
+    download resumes with only the missing segments.
+
+    Args:
+        url: The URL to download from
+        tmp_file: File to write; it is preallocated to total_size first
+        meta_file: File recording the completed segments
+        total_size: Size of the remote file in bytes
+        timeout: Request timeout in seconds
+        state: Segment record read from meta_file by an earlier, interrupted run
+
+    Returns:
+        int: Number of bytes in tmp_file, including segments completed by earlier runs
+    """
+    segments = max(4, total_size // PARALLEL_SEGMENT_SIZE)
+    bounds = [total_size * i // segments for i in range(segments + 1)]
+
+    # Earlier progress only counts for the same file split the same way
+    done = set()
+    if (state and state.get('size') == total_size and state.get('segments') == segments
+            and tmp_file.exists()):
+        done = set(state.get('done', ()))
+
+    downloaded = sum(bounds[i + 1] - bounds[i] for i in done)
+    lock = threading.Lock()
+    printer = _ProgressPrinter(total_size)
+
+    def on_progress(nbytes: int) -> None:
+        nonlocal downloaded
+        with lock:
+            downloaded += nbytes
+            printer.update(downloaded)
+
+    def save_progress() -> None:
+        with open(meta_file, 'w') as mf:
+            json.dump({'size': total_size, 'segments': segments, 'done': sorted(done)}, mf)
+
+    # A resumed file keeps its contents and its preallocated size
+    flags = os.O_WRONLY | os.O_CREAT | (0 if done else os.O_TRUNC)
+    fd = os.open(tmp_file, flags, 0o644)
+    try:
+        if not done:
+            _preallocate(fd, total_size)
+        save_progress()
+
+        def fetch_segment(i: int) -> None:
+            _fetch_range(url, bounds[i], bounds[i + 1] - 1, fd, timeout, on_progress)
+            # Only recorded as done once its bytes are on disk
+            os.fsync(fd)
+            with lock:
+                done.add(i)
+                save_progress()
+
+        with ThreadPoolExecutor(max_workers=PARALLEL_MAX_WORKERS) as executor:
+            futures = [executor.submit(fetch_segment, i) for i in range(segments) if i not in done]
+            try:
+                for future in as_completed(futures):
+                    future.result()
+            except BaseException:
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise
+    finally:
+        os.close(fd)
+    return downloaded
+
+def _copy_local(source: Path, destination: Path, max_size: Optional[int] = None) -> None:
+    """Copy a local file into place, in-kernel where the platform allows it."""
+    tmp_file = destination.with_suffix(destination.suffix + ".tmp")
+    try:
+        size = source.stat().st_size
+        if max_size and size > max_size:
+            raise DownloadError(f"File size {size} exceeds limit {max_size}")
+        # copyfile uses sendfile on Linux and fcopyfile on macOS (whose sendfile only
+        # writes to sockets), falling back to a plain read/write loop elsewhere
+        shutil.copyfile(source, tmp_file)
+        tmp_file.replace(destination)
+    except OSError as e:
+        if tmp_file.exists():
+            tmp_file.unlink()
+        raise DownloadError(f"Download failed: {e}")
+
+class _ProgressWriter:
+    """File wrapper that tracks bytes written for progress and size checks."""
+
+    def __init__(self, fh, meta_file: Path, downloaded: int, total_size: int, max_size: Optional[int]):
+        self.fh = fh
+        self.meta_file = meta_file
+        self.downloaded = downloaded
+        self.max_size = max_size
+        self.printer = _ProgressPrinter(total_size)
+        self._checkpointed = downloaded
+
+    def write(self, data: bytes) -> int:
+        written = self.fh.write(data)
+        self.downloaded += len(data)
+
+        # Check size during download
+        if self.max_size and self.downloaded > self.max_size:
+            raise DownloadError(f"File size exceeds limit {self.max_size}")
+
+        self.printer.update(self.downloaded)
+        if self.downloaded - self._checkpointed >= META_CHECKPOINT_SIZE:
+            self.checkpoint()
+        return written
+
+    def checkpoint(self) -> None:
+        """Record the resume offset once everything before it is on disk."""
+        self.fh.flush()
+        os.fsync(self.fh.fileno())
+        with open(self.meta_file, 'w') as mf:
+            mf.write(str(self.downloaded))
+        self._checkpointed = self.downloaded
+
+class _BackgroundWriter:
+    """Hand chunks to a worker thread so disk writes overlap the next network read."""
+
+    def __init__(self, fh, depth: int = 8):
+        self.fh = fh
+        self._queue = queue.Queue(maxsize=depth)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            data = self._queue.get()
+            if data is None:
+                return
+            # Keep draining after a failure so the producer never blocks
+            if self._error is None:
+                try:
+                    self.fh.write(data)
+                except BaseException as e:
+                    self._error = e
+
+    def write(self, data: bytes) -> int:
+        if self._error is not None:
+            raise self._error
+        self._queue.put(data)
+        return len(data)
+
+    def close(self) -> None:
+        """Wait for queued writes and re-raise the first write error."""
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+
 def download_file(
     url: str,
     destination: Path,
@@ -65,6 +330,13 @@ def download_file(
         InvalidURLError: If URL is invalid
         DownloadError: If download fails
     """
+    # Local file:// sources are copied without going through HTTP
+    parsed = urlparse(url)
+    if parsed.scheme == 'file':
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        _copy_local(Path(urllib.request.url2pathname(parsed.path)), destination, max_size)
+        return
+
     # Validate URL before proceeding
     validate_url(url)
     
@@ -79,42 +351,47 @@ def download_file(
         meta_file.unlink()
 
     downloaded_bytes = 0
+    # Parallel downloads record completed segments (JSON) rather than a byte offset
+    segment_state = None
     if resume and meta_file.exists():
         try:
             with open(meta_file, 'r') as f:
-                downloaded_bytes = int(f.read().strip())
-            print(f"Resuming download from {downloaded_bytes} bytes")
-        except (ValueError, IOError) as e:
-            print(f"Warning: Could not read download progress: {e}")
-            downloaded_bytes = 0
-
-    total_downloaded = downloaded_bytes
-
-    downloaded_bytes = 0
-    if resume and meta_file.exists():
-        try:
-            with open(meta_file, 'r') as f:
-                downloaded_bytes = int(f.read().strip())
-            print(f"Resuming download from {downloaded_bytes} bytes")
-        except (ValueError, IOError) as e:
+                progress = f.read().strip()
+            if progress.startswith('{'):
+                segment_state = json.loads(progress)
+                print(f"Resuming download ({len(segment_state['done'])}/{segment_state['segments']} segments complete)")
+            else:
+                downloaded_bytes = int(progress)
+                print(f"Resuming download from {downloaded_bytes} bytes")
+        except (ValueError, IOError, KeyError, TypeError) as e:
             print(f"Warning: Could not read download progress: {e}")
             downloaded_bytes = 0
+            segment_state = None
 
     total_downloaded = downloaded_bytes
 
     try:
-        # Create meta file before starting download
+        # Create meta file before starting download; any segment record is already in segment_state
         with open(meta_file, 'w') as mf:
             mf.write(str(downloaded_bytes))
-            
+
+        # Large fresh downloads from range-capable servers are split across connections
+        if downloaded_bytes == 0 and hasattr(os, 'pwrite'):
+            total_size, accepts_ranges = _probe_download(url, timeout)
+            if accepts_ranges and total_size >= PARALLEL_MIN_SIZE:
+                if max_size and total_size > max_size:
+                    raise DownloadError(f"File size {total_size} exceeds limit {max_size}")
+                total_downloaded = _download_ranges(url, tmp_file, meta_file, total_size, timeout, segment_state)
+                return
+
         headers = {'Range': f'bytes={downloaded_bytes}-'} if resume and downloaded_bytes > 0 else {}
         
         # Use requests for downloading
-        response = requests.get(
+        response = _SESSION.get(
             url,
             headers=headers,
             stream=True,
-            verify=certifi.where(),
+            verify=_CA_BUNDLE,
             timeout=timeout
         )
         response.raise_for_status()
@@ -134,27 +411,35 @@ def download_file(
 
         mode = 'ab' if resume and downloaded_bytes > 0 else 'wb'
         
-        mode = 'ab' if resume and downloaded_bytes > 0 else 'wb'
-        
         with open(tmp_file, mode) as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                if not chunk:
-                    break
-                f.write(chunk)
-                total_downloaded += len(chunk)
-                
-                # Check size during download
-                if max_size and total_downloaded > max_size:
-                    raise DownloadError(f"File size exceeds limit {max_size}")
-                    
-                if total_size > 0:
-                    progress = total_downloaded / total_size * 100
-                    print(f"\rDownloading: {format_bytes(total_downloaded)}/{format_bytes(total_size)} ({progress:.1f}%)",
-                          end='', flush=True)
-                with open(meta_file, 'w') as mf:
-                    mf.write(str(total_downloaded))
-
-    except requests.exceptions.RequestException as e:
+            # The last checkpoint may trail the data on disk; resume from the checkpoint
+            if mode == 'ab':
+                f.truncate(downloaded_bytes)
+
+            # Appends on resume must land at EOF, so only fresh files are preallocated
+            preallocate = mode == 'wb' and total_size > 0
+            if preallocate:
+                _preallocate(f.fileno(), total_size)
+
+            # Copy the raw stream in C; writes, progress and meta updates run on a worker thread
+            response.raw.decode_content = True
+            progress_writer = _ProgressWriter(f, meta_file, total_downloaded, total_size, max_size)
+            writer = _BackgroundWriter(progress_writer)
+            try:
+                shutil.copyfileobj(response.raw, writer, length=1 << 20)
+            finally:
+                # Runs on errors and Ctrl-C too, so an interrupted download stays resumable
+                try:
+                    writer.close()
+                finally:
+                    # Drop any reserved tail if the body was shorter than advertised
+                    if preallocate:
+                        f.truncate()
+                    progress_writer.checkpoint()
+            total_downloaded = progress_writer.downloaded
+
+    # Reading response.raw directly surfaces urllib3's errors (e.g. a connection dropped mid-body) unwrapped
+    except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError) as e:
         error_msg = str(e)
         print(f"\nDownload failed: {error_msg}", file=sys.stderr)
         # Clean up partial files on any error
@@ -212,8 +497,8 @@ def download_binary(
         asset_name_fragment = 'llama-swap' # Default for llama-swap
 
     try:
-        # Create an SSL context using certifi's CA bundle
-        context = ssl.create_default_context(cafile=certifi.where())
+        # Reuse the SSL context built over certifi's CA bundle
+        context = _ssl_context()
 
         # Make the request with the custom SSL context
         req = urllib.request.Request(api_url, headers={'Accept': 'application/vnd.github.v3+json'})
@@ -317,11 +602,9 @@ def extract_binary(archive: Path, dest_dir: Path) -> None:
     if archive.parent == dest_dir and \
        not (archive.suffix == '.zip' or archive.suffix == '.gz' or archive.suffix == '.tgz'):
         if archive != final_binary_path: # Only rename if current name is different
-            print(f"DEBUG: extract_binary - Renaming direct binary: {archive} to {final_binary_path}")
             archive.rename(final_binary_path)
         if sys.platform != "win32":
             os.chmod(final_binary_path, os.stat(final_binary_path).st_mode | 0o111) # Add execute permissions
-        print(f"DEBUG: extract_binary - Early return: Direct binary already in destination, renamed, and made executable: {final_binary_path}")
         return
 
     # Check if the file is a known archive type
@@ -52,21 +52,18 @@ def parse_hf_spec(hf_spec: str) -> Tuple[str, str]:
 
     try:
         if hf_spec.startswith("https://huggingface.co/"):
-            parts = hf_spec.split('/')
-            user_index = parts.index("huggingface.co") + 1
-            repo_index = user_index + 1
-            
-            if "resolve" in parts:
-                file_index = parts.index("resolve") + 2
-            elif "blob" in parts:
-                file_index = parts.index("blob") + 2
-            else:
+            # https://huggingface.co/USER/REPO/{resolve,blob}/REVISION/FILE_PATH
+            user, _, rest = hf_spec.removeprefix("https://huggingface.co/").partition('/')
+            repo, _, rest = rest.partition('/')
+            kind, _, rest = rest.partition('/')
+            if kind not in ("resolve", "blob"):
                 raise InvalidInputError("Invalid HuggingFace URL format. Must contain 'resolve' or 'blob' path segment")
-                
-            if user_index >= len(parts) or repo_index >= len(parts) or file_index >= len(parts):
+
+            file_path = rest.partition('/')[2]
+            if not user or not repo or not file_path:
                 raise InvalidInputError(f"Invalid URL structure: {hf_spec}")
-                
-            return f"{parts[user_index]}/{parts[repo_index]}", '/'.join(parts[file_index:])
+
+            return f"{user}/{repo}", file_path
 
         if ':' in hf_spec:
             repo, file = hf_spec.split(':', 1)
@@ -100,6 +97,19 @@ def _validate_text(text: str, field_name: str, allow_empty: bool = False) -> str
         raise InvalidInputError(f"{field_name} cannot be empty")
     return text.strip()
 
+class _ModelNameTable(dict):
+    """str.translate table mapping characters not allowed in model names to '_'.
+
+    Entries are computed on first lookup so non-ASCII letters keep isalnum() semantics.
+    """
+
+    def __missing__(self, code: int) -> int:
+        char = chr(code)
+        self[code] = code if char.isalnum() or char in "_-:" else ord('_')
+        return self[code]
+
+_MODEL_NAME_TABLE = _ModelNameTable()
+
 def validate_model_name(model_name: str) -> str:
     """Validate and sanitize a model name.
     
@@ -115,7 +125,7 @@ def validate_model_name(model_name: str) -> str:
     model_name = _validate_text(model_name, "Model name")
     if not any(c.isalnum() for c in model_name):
         raise InvalidInputError("Model name must contain at least one alphanumeric character")
-    return ''.join(c if c.isalnum() or c in "_-:" else '_' for c in model_name)
+    return model_name.translate(_MODEL_NAME_TABLE)
 
 def validate_args_list(args_list: List[str]) -> Dict[str, str]:
     """Validate model arguments from command line.
@@ -134,19 +144,19 @@ def validate_args_list(args_list: List[str]) -> Dict[str, str]:
 
     result = {}
     for arg in args_list:
-        if '=' not in arg:
+        key, sep, value = arg.partition('=')
+        if not sep:
             raise InvalidInputError(f"Argument '{arg}' is not in KEY=VALUE format")
-        
-        key, value = arg.split('=', 1)
         if not key:
             raise InvalidInputError("Argument key cannot be empty")
             
-        key = _validate_text(key, "Argument key")
-        if not all(c.isalnum() or c in "-_" for c in key):
+        key = key.strip()
+        # str.isalnum() checks the whole key in one call once - and _ are removed
+        bare_key = key.replace('-', '').replace('_', '')
+        if bare_key and not bare_key.isalnum():
             raise InvalidInputError(f"Invalid argument key format: {key}. Only alphanumeric, - and _ allowed")
         
-        value = _validate_text(value, "Argument value", allow_empty=True)
-        result[key] = value
+        result[key] = value.strip()
     return result
 
 def configure_gpu(model_config: Dict[str, Any], model_name: str, auto_detect: bool = True) -> Dict[str, Any]:
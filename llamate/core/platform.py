@@ -1,4 +1,6 @@
 """Platform-specific functionality."""
+from functools import lru_cache
+import glob
 from pathlib import Path
 import platform
 import subprocess
@@ -6,6 +8,7 @@ from typing import Tuple, Optional
 
 from ..core import config
 from .. import constants
+from ..utils import gpu
 
 def get_platform_info() -> Tuple[str, str]:
     """Get platform information and validate against supported architectures.
@@ -46,7 +49,11 @@ def get_platform_info() -> Tuple[str, str]:
         # If there's any issue with the override, fall back to normal detection
         pass
     
-    # Normal detection
+    return _detect_platform_info()
+
+@lru_cache(maxsize=1)
+def _detect_platform_info() -> Tuple[str, str]:
+    """Detect (os_name, arch) from the running system, cached for the process."""
     system = platform.system()
     machine = platform.machine().lower()
     
@@ -63,6 +70,7 @@ def get_platform_info() -> Tuple[str, str]:
     
     return os_name, arch
 
+@lru_cache(maxsize=1)
 def get_platform_arch() -> str:
     """Get standardized platform architecture.
     
@@ -79,6 +87,7 @@ def get_platform_arch() -> str:
         return 'arm64'
     raise ValueError(f'Unsupported architecture: {machine}')
 
+@lru_cache(maxsize=1)
 def is_windows() -> bool:
     """Check if running on Windows."""
     return platform.system() == "Windows"
@@ -88,31 +97,119 @@ def get_swap_platform() -> str:
     os_name, arch = get_platform_info()
     return f"{os_name}-{arch}"
 
+# PCI vendor IDs exposed by Linux sysfs
+PCI_VENDOR_GLOB = "/sys/bus/pci/devices/*/vendor"
+PCI_VENDOR_AMD = "0x1002"
+
+# Present on Linux whenever the NVIDIA kernel driver is loaded
+NVIDIA_DRIVER_PROC = "/proc/driver/nvidia/version"
+# WSL2 has no NVIDIA proc entry; GPUs come through /dev/dxg with the Windows driver's nvidia-smi
+WSL_GPU_PATHS = ("/dev/dxg", "/usr/lib/wsl/lib/nvidia-smi")
+
+def _wsl_gpu_passthrough() -> bool:
+    """Check for WSL2's paravirtualized GPU, which hides the real device from sysfs and /proc."""
+    return any(Path(path).exists() for path in WSL_GPU_PATHS)
+
+def _nvidia_driver_loaded() -> bool:
+    """Check for the NVIDIA driver with a stat or two; assumed loaded off Linux."""
+    if platform.system() != "Linux" or Path(NVIDIA_DRIVER_PROC).is_file():
+        return True
+    return _wsl_gpu_passthrough()
+
+def _pci_vendors() -> Optional[set]:
+    """Return the PCI vendor IDs listed in sysfs, or None where sysfs is unavailable."""
+    paths = glob.glob(PCI_VENDOR_GLOB)
+    if not paths:
+        return None
+    vendors = set()
+    for path in paths:
+        try:
+            with open(path) as f:
+                vendors.add(f.read().strip().lower())
+        except OSError:
+            continue
+    return vendors
+
+# Long enough for a cold driver init without persistence mode, even on multi-GPU hosts
+NVIDIA_SMI_TIMEOUT = 10.0
+
+@lru_cache(maxsize=1)
+def _nvidia_probe() -> bool:
+    """Check once per process that nvidia-smi runs and can talk to the driver.
+
+    Raises subprocess.TimeoutExpired if nvidia-smi stalls; lru_cache doesn't cache
+    exceptions, so a slow probe is retried rather than remembered as unusable.
+    """
+    if not _nvidia_driver_loaded():
+        return False
+    try:
+        subprocess.run(['nvidia-smi', '-L'], capture_output=True, timeout=NVIDIA_SMI_TIMEOUT, check=True)
+        return True
+    except subprocess.TimeoutExpired:
+        raise
+    except (subprocess.SubprocessError, FileNotFoundError):
+        return False
+
+def _nvidia_usable() -> bool:
+    """Check that nvidia-smi runs and can talk to the driver.
+
+    nvidia-smi can be installed without a working driver, where it errors out or
+    stalls; a device listing with a timeout catches both.
+    """
+    try:
+        return _nvidia_probe()
+    except subprocess.TimeoutExpired:
+        return False
+
+def _suggest_nvidia_layers(memory_mib: float) -> int:
+    """Suggest n-gpu-layers for an NVIDIA GPU with memory_mib of VRAM."""
+    memory_gb = memory_mib / 1024  # Convert to GB
+    return min(32, max(4, int(memory_gb / 0.75)))  # Rough heuristic
+
+@lru_cache(maxsize=1)
 def detect_gpu() -> Tuple[bool, Optional[int]]:
     """Detect GPU and suggest number of layers to offload.
+
+    The result is cached for the life of the process; call detect_gpu.cache_clear()
+    to probe again.
     
     Returns:
         tuple: (has_gpu, suggested_layers) where suggested_layers is None if no GPU
     """
-    # Try NVIDIA GPU first
-    try:
-        result = subprocess.run(
-            ['nvidia-smi', '--query-gpu=memory.total', '--format=csv,noheader,nounits'],
-            capture_output=True, text=True, check=True
-        )
-        memory_gb = float(result.stdout.strip()) / 1024  # Convert to GB
-        suggested_layers = min(32, max(4, int(memory_gb / 0.75)))  # Rough heuristic
-        return True, suggested_layers
-    except (subprocess.SubprocessError, FileNotFoundError, ValueError):
-        pass
+    # NVIDIA is ruled out by its driver alone: sysfs under WSL2 (and in some containers)
+    # lists only virtual devices, so it can't be trusted to show an NVIDIA GPU
+    has_nvidia = _nvidia_driver_loaded()
+    # On Linux, sysfs tells us whether an AMD GPU is present without spawning rocm-smi
+    vendors = _pci_vendors()
+    has_amd = vendors is None or PCI_VENDOR_AMD in vendors or _wsl_gpu_passthrough()
+
+    # Try NVIDIA GPU first, through NVML when available; layers are sized for all devices combined
+    if has_nvidia:
+        devices = gpu.nvml_memory_mib()
+        if devices is not None:
+            return True, _suggest_nvidia_layers(sum(devices))
+
+        try:
+            if _nvidia_usable():
+                result = subprocess.run(
+                    ['nvidia-smi', '--query-gpu=memory.total', '--format=csv,noheader,nounits'],
+                    capture_output=True, text=True, check=True, timeout=NVIDIA_SMI_TIMEOUT
+                )
+                # One line per device; sum them like the NVML path does
+                devices = [float(line) for line in result.stdout.splitlines() if line.strip()]
+                if devices:
+                    return True, _suggest_nvidia_layers(sum(devices))
+        except (subprocess.SubprocessError, FileNotFoundError, ValueError):
+            pass
 
     # Try AMD GPU
-    try:
-        result = subprocess.run(['rocm-smi', '--showmeminfo'], capture_output=True, text=True, check=True)
-        if 'GPU_MEMORY' in result.stdout:
-            return True, 20  # Conservative default for AMD
-    except (subprocess.SubprocessError, FileNotFoundError):
-        pass
+    if has_amd:
+        try:
+            result = subprocess.run(['rocm-smi', '--showmeminfo'], capture_output=True, text=True, check=True)
+            if 'GPU_MEMORY' in result.stdout:
+                return True, 20  # Conservative default for AMD
+        except (subprocess.SubprocessError, FileNotFoundError):
+            pass
 
     return False, None
 
@@ -134,12 +231,9 @@ def get_optimal_llama_server_architecture() -> str:
             raise ValueError("Unsupported macOS architecture for llama-server: only arm64 is supported for Metal backend.")
     elif os_name == 'linux':
         if arch == 'x64': # All provided Linux binaries are x86_64
-            # Check for NVIDIA GPU
-            try:
-                subprocess.run(['nvidia-smi'], capture_output=True, check=True)
+            # Check for a working NVIDIA GPU
+            if _nvidia_usable():
                 return 'cuda-linux-x86_64'
-            except (subprocess.CalledProcessError, FileNotFoundError):
-                pass # No NVIDIA GPU or nvidia-smi not found
 
             # Check for AMD ROCm GPU
             try:
@@ -159,6 +253,7 @@ def get_optimal_llama_server_architecture() -> str:
     else:
         raise ValueError(f"Unsupported OS for llama-server: {os_name}")
 
+@lru_cache(maxsize=1)
 def get_llama_server_bin_name() -> str:
     """Get the platform-specific llama-server binary name.
     
@@ -170,6 +265,7 @@ def get_llama_server_bin_name() -> str:
     # The download and execution logic will use the full architecture string.
     return "llama-server.exe" if is_windows() else "llama-server"
 
+@lru_cache(maxsize=1)
 def get_llama_swap_bin_name() -> str:
     """Get the platform-specific llama-swap binary name.
     
@@ -1,38 +1,139 @@
-import requests
+import json
+import os
+import sys
 import time
-import yaml
-from typing import Dict, Any
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional, Tuple
+from .. import constants
 from ..utils.exceptions import ResourceError
 
+# The disk cache is JSON; orjson is optional and works on bytes directly
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+    _JSONDecodeError = orjson.JSONDecodeError
+except ImportError:
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+    _json_loads = json.loads
+    _JSONDecodeError = json.JSONDecodeError
+
+# requests and yaml are imported on first fetch; most commands never need them
+@lru_cache(maxsize=None)
+def _session():
+    """Return the session kept alive across refreshes in long-running processes"""
+    import requests
+    session = requests.Session()
+    session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1))
+    return session
+
 # Cache configuration
 _aliases_cache = None
-_last_fetch = 0
+_last_fetch = 0  # time.monotonic_ns() of the last fetch
 CACHE_TTL = 86400  # 24 hours
+CACHE_TTL_NS = CACHE_TTL * 1_000_000_000
 
 def fetch_remote_aliases() -> Dict[str, Any]:
     """Fetch latest aliases from GitHub with error handling"""
     url = "https://raw.githubusercontent.com/R-Dson/llamate-alias/refs/heads/main/model_aliases.yml"
     
     try:
-        response = requests.get(url, timeout=10)
+        import yaml
+        # libyaml's C loader when PyYAML was built with it
+        SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+        response = _session().get(url, timeout=10)
         response.raise_for_status()
         
         # Parse YAML content directly
-        return yaml.safe_load(response.text)
+        return yaml.load(response.text, Loader=SafeLoader)
     except Exception as e:
         raise ResourceError(f"Failed to fetch remote aliases: {str(e)}")
 
-def get_model_aliases() -> Dict[str, Any]:
-    """Get aliases with caching mechanism"""
+def _validate_aliases(raw: Any) -> Dict[str, Dict[str, Any]]:
+    """Check alias entries once as they enter the cache, so callers can trust their shape
+
+    Entries need string hf_repo and .gguf hf_file values; malformed ones are dropped
+    with a warning. Arg values are stringified since they end up on a command line;
+    booleans become "true"/"false" so build_command can turn true into a bare flag.
+    """
+    if not isinstance(raw, dict):
+        raise ResourceError("Model aliases must be a mapping of alias names to model configs")
+    aliases = {}
+    for name, entry in raw.items():
+        if (not isinstance(entry, dict)
+                or not isinstance(entry.get("hf_repo"), str)
+                or not isinstance(entry.get("hf_file"), str)
+                or not entry["hf_file"].endswith(".gguf")
+                or not isinstance(entry.get("args") or {}, dict)):
+            print(f"Warning: ignoring malformed model alias '{name}'", file=sys.stderr)
+            continue
+        aliases[str(name)] = {
+            **entry,
+            "args": {str(k): str(v).lower() if isinstance(v, bool) else str(v) for k, v in (entry.get("args") or {}).items()},
+        }
+    return aliases
+
+def _cache_file() -> Path:
+    """Location of the on-disk alias cache shared between CLI invocations"""
+    return constants.LLAMATE_HOME / "cache" / "model_aliases.json"
+
+def _read_disk_cache(now: float) -> Optional[Tuple[Dict[str, Any], float]]:
+    """Return (aliases, fetch time) from disk if they are younger than CACHE_TTL"""
+    path = _cache_file()
+    try:
+        fetched_at = path.stat().st_mtime
+        if now - fetched_at >= CACHE_TTL:
+            return None
+        aliases = _json_loads(path.read_bytes())
+    except (OSError, _JSONDecodeError):
+        return None
+    return (aliases, fetched_at) if isinstance(aliases, dict) else None
+
+def _write_disk_cache(aliases: Dict[str, Any], now: float) -> None:
+    """Atomically store aliases on disk, stamped with the fetch time"""
+    path = _cache_file()
+    tmp = path.with_suffix(".tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_bytes(_json_dumps(aliases))
+        os.utime(tmp, (now, now))
+        os.replace(tmp, path)
+    except (OSError, TypeError):
+        pass  # The cache is an optimization; a failed write just means refetching next time
+
+def get_model_aliases() -> Mapping[str, Any]:
+    """Get aliases with caching mechanism
+
+    Aliases are cached in memory and on disk for CACHE_TTL seconds, so short-lived
+    CLI invocations don't refetch them. The cached mapping is shared by every
+    caller, so it is returned read-only.
+    """
     global _aliases_cache, _last_fetch
     
     # Return cached version if valid
-    if _aliases_cache and (time.time() - _last_fetch) < CACHE_TTL:
+    # Monotonic so NTP adjustments can't expire or extend the in-memory cache;
+    # the disk cache has to use wall-clock mtimes to be shared across processes
+    now = time.monotonic_ns()
+    if _aliases_cache and now - _last_fetch < CACHE_TTL_NS:
+        return _aliases_cache
+
+    wall_now = time.time()
+    cached = _read_disk_cache(wall_now)
+    if cached is not None:
+        aliases, fetched_at = cached
+        _last_fetch = now - int((wall_now - fetched_at) * 1_000_000_000)
+        _aliases_cache = MappingProxyType(aliases)
         return _aliases_cache
     
     try:
-        _aliases_cache = fetch_remote_aliases()
-        _last_fetch = time.time()
-        return _aliases_cache
+        aliases = _validate_aliases(fetch_remote_aliases())
     except ResourceError:
-        raise ResourceError("Failed to fetch model aliases from remote source. Please check your network connection or try again later.")
\ No newline at end of file
+        raise ResourceError("Failed to fetch model aliases from remote source. Please check your network connection or try again later.")
+    _write_disk_cache(aliases, wall_now)
+    _aliases_cache = MappingProxyType(aliases)
+    _last_fetch = now
+    return _aliases_cache
@@ -1,10 +1,14 @@
 """Llama server management functionality."""
 import subprocess
+from itertools import chain
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 
 from ..core import config
 
+# Model args consumed by llama-swap rather than llama-server
+_EXCLUDED_ARGS = frozenset({"proxy"})
+
 def validate_server_path(server_path: str) -> bool:
     """Validate that the server path exists and is executable.
     
@@ -35,31 +39,25 @@ def build_command(gguf_path: Path, model_config: Dict[str, Any],
     Returns:
         list: Command line arguments list
     """
-    global_config = config.load_global_config()
-    server_path = global_config.get("llama_server_path")
+    server_path = config.load_global_config().get("llama_server_path")
     if not server_path:
         raise ValueError("llama_server_path is not set")
 
     cmd = [server_path, "-m", str(gguf_path)]
 
-    # Add configured arguments
+    # Add configured arguments; "true" values become bare flags
     args = model_config.get("args", {})
-    for key, value in args.items():
-        if key == 'proxy':  # Skip proxy, it's for llama-swap
-            continue
-        if value == "true":
-            cmd.append(f"--{key}")
-        else:
-            cmd.extend([f"--{key}", value])
+    cmd.extend(chain.from_iterable(
+        (f"--{key}",) if value == "true" else (f"--{key}", value)
+        for key, value in args.items()
+        if key not in _EXCLUDED_ARGS
+    ))
     
     # Add any passthrough arguments
     if passthrough_args:
         for arg in passthrough_args:
-            if '=' in arg:
-                key, value = arg.split('=', 1)
-                cmd.extend([key, value])
-            else:
-                cmd.append(arg)
+            key, sep, value = arg.partition('=')
+            cmd.extend((key, value) if sep else (arg,))
 
     return cmd
 
@@ -76,13 +74,16 @@ def run_server(cmd: List[str]) -> subprocess.Popen:
         RuntimeError: If the server fails to start
     """
     try:
-        # Run server in non-blocking mode with output suppressed
-        process = subprocess.Popen(
+        # Run server in non-blocking mode with output suppressed. With /dev/null
+        # redirects and close_fds=False (our own descriptors are non-inheritable
+        # anyway), CPython starts the child with posix_spawn instead of fork+exec,
+        # avoiding a copy of this process's page tables.
+        return subprocess.Popen(
             cmd,
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
+            close_fds=False,
             text=True
         )
-        return process
-    except subprocess.SubprocessError as e:
+    except (subprocess.SubprocessError, OSError) as e:
         raise RuntimeError(f"Failed to start llama server: {e}") from e
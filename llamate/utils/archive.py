@@ -1,12 +1,136 @@
 """Archive handling utilities."""
+from concurrent.futures import ThreadPoolExecutor
+import errno
+from functools import lru_cache
 import os
 from pathlib import Path
+import stat
+import struct
 import zipfile
+import zlib
 import tarfile
 import platform
+import shutil
+
+# libarchive bindings are optional (the "archive" extra); without them extract_archive
+# falls back to zipfile/tarfile
+try:
+    import libarchive
+except ImportError:
+    libarchive = None
+
+# Read size for the stdlib paths; the 8 KiB defaults cost ~16x the read calls on large archives
+READ_BUFFER_SIZE = 128 * 1024
+# Chunk size for copying extracted members to disk
+COPY_BUFFER_SIZE = 1024 * 1024
+# Fixed part of a zip local file header; the last two fields are the name and extra lengths
+_ZIP_LOCAL_HEADER = struct.Struct('<4s5H3L2H')
+
+def _is_within_directory(directory: Path, target: Path) -> bool:
+    abs_directory = directory.resolve()
+    abs_target = target.resolve()
+    prefix = os.path.commonpath([abs_directory])
+    return prefix == os.path.commonpath([prefix, abs_target])
+
+def _is_traversal(name: str) -> bool:
+    """Cheap lexical check for member names that are absolute or climb out with '..'.
+
+    Enough on its own until the archive has created a link that a later name could
+    walk through; from then on callers also resolve the path with _is_within_directory.
+    """
+    name = name.replace('\\', '/')
+    return name.startswith('/') or name[1:2] == ':' or '..' in name.split('/')
+
+def _extract_with_libarchive(archive_path: Path, extract_dir: Path) -> None:
+    """Stream entries out of the archive with libarchive, one decompression buffer at a time."""
+    with libarchive.file_reader(str(archive_path)) as archive:
+        for entry in archive:
+            # Checked before anything is written for the entry; links are never created here
+            if _is_traversal(entry.pathname):
+                raise ValueError("Attempted path traversal in archive")
+            target = extract_dir / entry.pathname
+            if entry.isdir:
+                target.mkdir(parents=True, exist_ok=True)
+                continue
+            if not entry.isfile:
+                continue  # Links and special files are skipped, as tarfile's data filter would refuse most of them
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with open(target, 'wb', buffering=0) as f:
+                for block in entry.get_blocks():
+                    f.write(block)
+            # Keep the executable bits the binaries need, minus group/other write and setuid/setgid
+            mode = stat.S_IMODE(entry.mode) & 0o755
+            if mode:
+                os.chmod(target, mode)
+
+def _copy_stored_member(src_fd: int, info: zipfile.ZipInfo, target: Path) -> bool:
+    """Copy a stored (uncompressed) zip member in-kernel with copy_file_range, then check its CRC-32.
+
+    Returns False, having written nothing useful, when the member or platform doesn't
+    allow it; the caller then extracts it through zipfile instead.
+    """
+    if (not hasattr(os, 'copy_file_range') or info.compress_type != zipfile.ZIP_STORED
+            or info.flag_bits & 0x1):  # Encrypted
+        return False
+    # The member's data follows its local header, whose name/extra lengths may differ from the central directory's
+    header = os.pread(src_fd, _ZIP_LOCAL_HEADER.size, info.header_offset)
+    if len(header) != _ZIP_LOCAL_HEADER.size or header[:4] != b'PK\x03\x04':
+        return False
+    *_, name_len, extra_len = _ZIP_LOCAL_HEADER.unpack(header)
+    offset = info.header_offset + _ZIP_LOCAL_HEADER.size + name_len + extra_len
+    remaining = info.file_size
+    with open(target, 'wb') as dst:
+        try:
+            while remaining:
+                copied = os.copy_file_range(src_fd, dst.fileno(), remaining, offset_src=offset)
+                if not copied:
+                    return False  # Truncated archive; let zipfile report it
+                offset += copied
+                remaining -= copied
+        except OSError as e:
+            if e.errno in (errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP):
+                return False
+            raise
+    # The kernel copy skips zipfile's CRC check, so verify the written bytes (still in page cache)
+    crc = 0
+    with open(target, 'rb') as copied_file:
+        while chunk := copied_file.read(COPY_BUFFER_SIZE):
+            crc = zlib.crc32(chunk, crc)
+    if crc != info.CRC:
+        raise zipfile.BadZipFile(f"Bad CRC-32 for file {info.filename!r}")
+    return True
+
+def _extract_zip_members(zip_ref: zipfile.ZipFile, extract_dir: Path, src_fd: int) -> None:
+    """Extract every member of an open zip, decompressing distinct files on parallel threads."""
+    files = []
+    for info in zip_ref.infolist():
+        # zipfile never creates links, so the lexical check is enough
+        if _is_traversal(info.filename):
+            raise ValueError("Attempted path traversal in archive")
+        target = extract_dir / info.filename
+        if info.is_dir():
+            target.mkdir(parents=True, exist_ok=True)
+        else:
+            files.append((info, target))
+
+    def extract_member(member) -> None:
+        info, target = member
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if _copy_stored_member(src_fd, info, target):
+            return
+        # zlib releases the GIL, so members decompress concurrently
+        with zip_ref.open(info) as src, open(target, 'wb') as dst:
+            shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as executor:
+        # Consuming the results re-raises the first failure
+        list(executor.map(extract_member, files))
 
 def extract_archive(archive_path: Path, extract_dir: Path) -> None:
     """Extract a zip or tar.gz archive.
+
+    Extracted files are left to OS writeback and never fsynced; callers that need
+    them durable must sync the files and extract_dir themselves.
     
     Args:
         archive_path: Path to the archive file
@@ -17,35 +141,42 @@ def extract_archive(archive_path: Path, extract_dir: Path) -> None:
     """
     extract_dir.mkdir(parents=True, exist_ok=True)
     
-    if archive_path.suffix == '.zip':
-        with zipfile.ZipFile(archive_path, 'r') as zip_ref:
-            zip_ref.extractall(extract_dir)
+    if libarchive is not None and (archive_path.suffix == '.zip' or archive_path.name.endswith('.tar.gz')):
+        _extract_with_libarchive(archive_path, extract_dir)
+    elif archive_path.suffix == '.zip':
+        with open(archive_path, 'rb', buffering=READ_BUFFER_SIZE) as f, zipfile.ZipFile(f, 'r') as zip_ref:
+            _extract_zip_members(zip_ref, extract_dir, f.fileno())
     elif archive_path.name.endswith('.tar.gz'):
-        with tarfile.open(archive_path, 'r:gz') as tar_ref:
-            # Check for zipslip vulnerability
-            def is_within_directory(directory: Path, target: Path) -> bool:
-                abs_directory = directory.resolve()
-                abs_target = target.resolve()
-                prefix = os.path.commonpath([abs_directory])
-                return prefix == os.path.commonpath([prefix, abs_target])
-
-            def safe_extract(tar, path: Path) -> None:
-                for member in tar.getmembers():
-                    member_path = path / member.name
-                    if not is_within_directory(path, member_path):
-                        raise ValueError("Attempted path traversal in archive")
+        # Stream mode decompresses in READ_BUFFER_SIZE reads and never seeks back
+        with tarfile.open(archive_path, 'r|gz', bufsize=READ_BUFFER_SIZE) as tar_ref:
+            links_extracted = False
+            for member in tar_ref:
+                # Check for zipslip vulnerability before the member is written
+                target = extract_dir / member.name
+                if _is_traversal(member.name) or (links_extracted and not _is_within_directory(extract_dir, target)):
+                    raise ValueError("Attempted path traversal in archive")
+                if member.isfile():
+                    # Copied in large chunks rather than through extract's 16 KiB buffer
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    with tar_ref.extractfile(member) as src, open(target, 'wb') as dst:
+                        shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+                    # Same permissions the data filter would keep
+                    os.chmod(target, member.mode & 0o755)
                 # Handle Python 3.12+ where filter argument is required
-                if hasattr(tarfile, 'data_filter'):
-                    tar.extractall(path, filter='data')
+                elif hasattr(tarfile, 'data_filter'):
+                    tar_ref.extract(member, extract_dir, filter='data')
                 else:
-                    tar.extractall(path)
-
-            safe_extract(tar_ref, extract_dir)
+                    tar_ref.extract(member, extract_dir)
+                links_extracted = links_extracted or member.issym() or member.islnk()
     else:
         raise ValueError(f"Unsupported archive format: {archive_path.suffix}")
         
+@lru_cache(maxsize=1)
 def get_platform_archive_ext() -> str:
     """Get the appropriate archive extension for the current platform.
+
+    The result is cached for the life of the process; call
+    get_platform_archive_ext.cache_clear() to check again.
     
     Returns:
         str: '.zip' for Windows, '.tar.gz' for others
@@ -1,32 +1,80 @@
 """GPU detection and configuration utilities."""
+from functools import lru_cache
 import subprocess
-from typing import Tuple, Optional
+from typing import List, Tuple, Optional
 
+# NVML bindings are optional (the "nvidia" extra); without them callers shell out to nvidia-smi
+try:
+    import pynvml
+except ImportError:
+    pynvml = None
+
+# Rough heuristic: ~0.75GB per layer
+_LAYERS_PER_GB = 1 / 0.75
+
+def nvml_memory_mib() -> Optional[List[float]]:
+    """Return each NVIDIA device's total memory in MiB via NVML.
+
+    Callers choose how to combine the devices. Returns None if NVML is unusable or
+    reports no devices.
+    """
+    if pynvml is None:
+        return None
+    try:
+        pynvml.nvmlInit()
+    except pynvml.NVMLError:
+        return None
+    try:
+        return [
+            pynvml.nvmlDeviceGetMemoryInfo(pynvml.nvmlDeviceGetHandleByIndex(i)).total / (1024 * 1024)
+            for i in range(pynvml.nvmlDeviceGetCount())
+        ] or None
+    except pynvml.NVMLError:
+        return None
+    finally:
+        pynvml.nvmlShutdown()
+
+@lru_cache(maxsize=1)
 def get_nvidia_memory() -> Optional[float]:
-    """Get total NVIDIA GPU memory in GB.
+    """Get the first NVIDIA GPU's total memory in GB.
+
+    Queried through NVML when pynvml is installed, falling back to nvidia-smi. The
+    result is cached for the life of the process; call get_nvidia_memory.cache_clear()
+    to query again.
     
     Returns:
         float or None: Total GPU memory in GB, or None if not available
     """
+    devices = nvml_memory_mib()
+    if devices is not None:
+        return devices[0] / 1024
     try:
         result = subprocess.run(
             ['nvidia-smi', '--query-gpu=memory.total', '--format=csv,noheader,nounits'],
-            capture_output=True, text=True, check=True
+            capture_output=True
         )
-        return float(result.stdout.strip()) / 1024  # Convert to GB
-    except (subprocess.SubprocessError, FileNotFoundError, ValueError):
+        # nvidia-smi reports whole MiB; anything else is rejected before parsing
+        stdout = result.stdout.strip()
+        if result.returncode != 0 or not stdout.isdigit():
+            return None
+        return int(stdout) / 1024  # Convert to GB
+    except (subprocess.SubprocessError, FileNotFoundError):
         return None
 
+@lru_cache(maxsize=1)
 def get_amd_memory() -> Optional[float]:
     """Get total AMD GPU memory in GB.
+
+    The result is cached for the life of the process; call get_amd_memory.cache_clear()
+    to query again.
     
     Returns:
         float or None: Total GPU memory in GB, or None if not available
     """
     try:
-        result = subprocess.run(['rocm-smi', '--showmeminfo'], 
-                              capture_output=True, text=True, check=True)
-        if 'GPU_MEMORY' in result.stdout:
+        result = subprocess.run(['rocm-smi', '--showmeminfo'], capture_output=True)
+        # The output is only searched for a marker, so it is never decoded
+        if result.returncode == 0 and b'GPU_MEMORY' in result.stdout:
             # AMD ROCm doesn't provide an easy way to get total memory
             # Return a conservative estimate
             return 8.0  # Assume 8GB minimum for a GPU
@@ -43,6 +91,5 @@ def calculate_gpu_layers(memory_gb: float) -> int:
     Returns:
         int: Suggested number of layers to offload to GPU
     """
-    # Rough heuristic: ~0.75GB per layer
-    suggested = int(memory_gb / 0.75)
-    return min(32, max(4, suggested))  # Keep between 4 and 32 layers
\ No newline at end of file
+    # Keep between 4 and 32 layers
+    return max(4, min(32, int(memory_gb * _LAYERS_PER_GB)))
\ No newline at end of file
@@ -0,0 +1,60 @@
+"""Event-driven waits shared by the process-level tests"""
+import ctypes
+import os
+import selectors
+import time
+
+
+# inotify(7) event masks for entries appearing in a watched directory
+IN_CREATE = 0x100
+IN_MOVED_TO = 0x80
+
+
+def _inotify_watch(directory):
+    """Return a non-blocking inotify fd watching directory for new entries, or None where unsupported."""
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    if libc.inotify_add_watch(fd, os.fsencode(directory), IN_CREATE | IN_MOVED_TO) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+def wait_for_path(path, timeout):
+    """Wait up to timeout seconds for path to exist, waking as soon as it is created.
+
+    Blocks in a single selector wait on an inotify watch of the parent directory, with the
+    deadline as the wait's timeout. Falls back to short polling where inotify is unavailable.
+    """
+    deadline = time.monotonic() + timeout
+    fd = _inotify_watch(path.parent)
+    if fd is None:
+        while not path.exists():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(0.05, remaining))
+        return True
+
+    with selectors.DefaultSelector() as selector:
+        selector.register(fd, selectors.EVENT_READ)
+        try:
+            # Checked after the watch is in place, so a creation in between isn't missed
+            while not path.exists():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                if selector.select(remaining):
+                    try:
+                        os.read(fd, 4096)  # Drain the events; we only care that something changed
+                    except BlockingIOError:
+                        pass
+            return True
+        finally:
+            os.close(fd)
+
@@ -36,24 +36,15 @@ def patch_input(side_effects, stdout):
     return patch('builtins.input', mock_input)
 
 @pytest.fixture
-def mock_init_command(tmp_path):
+def mock_init_command(tmp_path, llamate_home):
     mock_global_config = {"llama_server_path": ""}
 
     with (
         patch('llamate.core.config.load_global_config', return_value=mock_global_config) as mock_load_config,
         patch('llamate.core.config.save_global_config') as mock_save_config,
         patch('llamate.core.download.download_binary', return_value=tmp_path / "mock_archive.tar.gz") as mock_download,
-        patch('llamate.core.download.extract_binary') as mock_extract,
-        patch('llamate.constants.LLAMATE_HOME', tmp_path / ".config" / "llamate"),
-        patch('llamate.constants.MODELS_DIR', tmp_path / ".config" / "llamate" / "models"),
-        patch('llamate.constants.GGUFS_DIR', tmp_path / ".config" / "llamate" / "ggufs")
+        patch('llamate.core.download.extract_binary') as mock_extract
     ):
-        
-        # Ensure LLAMATE_HOME does not exist initially for first-run tests
-        if constants.LLAMATE_HOME.exists():
-            import shutil
-            shutil.rmtree(constants.LLAMATE_HOME)
-            
         # Create mock archive file that download_binary would return
         mock_archive = tmp_path / "mock_archive.tar.gz"
         mock_archive.touch()
@@ -1,4 +1,6 @@
 """Tests for model management commands."""
+from contextlib import ExitStack
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -13,70 +15,77 @@ from llamate.cli.commands.model import (
 from llamate.utils.exceptions import InvalidInputError
 
 
+# Plain-attribute inputs for the add-command error paths, shared across tests; unlike a
+# MagicMock, reading a misspelled or missing attribute raises instead of returning a new mock
+_ARGS_INVALID_ALIAS = SimpleNamespace(hf_spec="invalid@alias", alias=None, set=None, auto_gpu=True, no_pull=True)
+_ARGS_INVALID_HF_SPEC = SimpleNamespace(hf_spec="invalid/repo:spec", alias=None, set=None, auto_gpu=True, no_pull=True)
+_ARGS_NOT_INITIALIZED = SimpleNamespace(hf_spec="user/repo:model.gguf", alias=None, set=None, auto_gpu=True, no_pull=True)
+_ARGS_INVALID_ARGS = SimpleNamespace(
+    hf_spec="user/repo:model.gguf", alias=None, set=["invalid=arg"], auto_gpu=True, no_pull=True
+)
+
+
+def _validate_args_stub(args):
+    return {k.split('=')[0]: k.split('=')[1] for k in args} if args else {}
+
+
+# (fixture key, patch target, patch kwargs) for every patch in mock_model_commands
+PATCH_SPEC = [
+    ("mock_load_global_config", 'llamate.core.config.load_global_config', {}),
+    ("mock_save_global_config", 'llamate.core.config.save_global_config', {}),
+    ("mock_load_model_config", 'llamate.core.config.load_model_config', {}),
+    ("mock_save_model_config", 'llamate.core.config.save_model_config', {}),
+    ("mock_parse_alias", 'llamate.core.model.parse_model_alias', {"return_value": None}),
+    ("mock_parse_hf_spec", 'llamate.core.model.parse_hf_spec', {"return_value": ("test/repo", "test.gguf")}),
+    ("mock_validate_name", 'llamate.core.model.validate_model_name', {"side_effect": lambda x: x}),
+    ("mock_validate_args", 'llamate.core.model.validate_args_list', {"side_effect": _validate_args_stub}),
+    ("mock_configure_gpu", 'llamate.core.model.configure_gpu', {"side_effect": lambda cfg, name, **kwargs: cfg}),
+    ("mock_path_exists", 'pathlib.Path.exists', {"return_value": True}),
+    ("mock_path_unlink", 'pathlib.Path.unlink', {}),
+    ("mock_save_llama_swap_config", 'llamate.services.llama_swap.save_llama_swap_config', {}),
+]
+
+
 @pytest.fixture
-def mock_model_commands(tmp_path):
+def mock_model_commands(tmp_path, monkeypatch):
     """Mock components needed for model command tests"""
-    mock_global_config = {"llama_server_path": "/fake/server", "ggufs_storage_path": str(tmp_path / "ggufs")}
-    mock_model_config = {"hf_repo": "test/repo", "hf_file": "test.gguf", "args": {}}
-
-    with (
-        patch('llamate.core.config.load_global_config', return_value=mock_global_config) as mock_load_global_config,
-        patch('llamate.core.config.save_global_config') as mock_save_global_config,
-        patch('llamate.core.config.load_model_config', return_value=mock_model_config.copy()) as mock_load_model_config,
-        patch('llamate.core.config.save_model_config') as mock_save_model_config,
-        patch('llamate.core.model.parse_model_alias', return_value=None) as mock_parse_alias,
-        patch('llamate.core.model.parse_hf_spec', return_value=("test/repo", "test.gguf")) as mock_parse_hf_spec,
-        patch('llamate.core.model.validate_model_name', side_effect=lambda x: x) as mock_validate_name,
-        patch('llamate.core.model.validate_args_list', side_effect=lambda x: {k.split('=')[0]: k.split('=')[1] for k in x} if x else {}) as mock_validate_args,
-        patch('llamate.core.model.configure_gpu', side_effect=lambda cfg, name, **kwargs: cfg) as mock_configure_gpu,
-        patch('llamate.constants.LLAMATE_HOME', tmp_path / ".config" / "llamate"),
-        patch('llamate.constants.MODELS_DIR', tmp_path / ".config" / "llamate" / "models"),
-        patch('llamate.constants.GGUFS_DIR', tmp_path / "ggufs"),
-        patch('pathlib.Path.exists') as mock_path_exists, # Changed to not have a default return value
-        patch('pathlib.Path.unlink') as mock_path_unlink,
-        patch('llamate.services.llama_swap.save_llama_swap_config') as mock_save_llama_swap_config
-    ):
-        # Set the default return value for Path.exists
-        mock_path_exists.return_value = True
-        yield {
-            "mock_load_global_config": mock_load_global_config,
-            "mock_save_global_config": mock_save_global_config,
-            "mock_load_model_config": mock_load_model_config,
-            "mock_save_model_config": mock_save_model_config,
-            "mock_parse_alias": mock_parse_alias,
-            "mock_parse_hf_spec": mock_parse_hf_spec,
-            "mock_validate_name": mock_validate_name,
-            "mock_validate_args": mock_validate_args,
-            "mock_configure_gpu": mock_configure_gpu,
-            "llamate_home": constants.LLAMATE_HOME,
-            "models_dir": constants.MODELS_DIR,
-            "ggufs_dir": constants.GGUFS_DIR,
-            "mock_path_exists": mock_path_exists,
-            "mock_path_unlink": mock_path_unlink,
-            "mock_save_llama_swap_config": mock_save_llama_swap_config,
-            "tmp_path": tmp_path
+    monkeypatch.setattr(constants, 'LLAMATE_HOME', tmp_path / ".config" / "llamate")
+    monkeypatch.setattr(constants, 'MODELS_DIR', tmp_path / ".config" / "llamate" / "models")
+    monkeypatch.setattr(constants, 'GGUFS_DIR', tmp_path / "ggufs")
+
+    with ExitStack() as stack:
+        mocks = {key: stack.enter_context(patch(target, **kwargs)) for key, target, kwargs in PATCH_SPEC}
+        mocks["mock_load_global_config"].return_value = {
+            "llama_server_path": "/fake/server",
+            "ggufs_storage_path": str(tmp_path / "ggufs"),
         }
-
-def test_model_add_command_invalid_alias(mock_model_commands, capsys):
+        mocks["mock_load_model_config"].return_value = {"hf_repo": "test/repo", "hf_file": "test.gguf", "args": {}}
+        mocks.update(
+            llamate_home=constants.LLAMATE_HOME,
+            models_dir=constants.MODELS_DIR,
+            ggufs_dir=constants.GGUFS_DIR,
+            tmp_path=tmp_path,
+        )
+        yield mocks
+
+def test_model_add_command_invalid_alias(mock_model_commands):
     """Test adding a model with invalid alias format"""
     mocks = mock_model_commands
     mocks["mock_parse_alias"].side_effect = InvalidInputError("Invalid alias format")
-    args = MagicMock(hf_spec="invalid@alias", alias=None, set=None, auto_gpu=True)
 
     with pytest.raises(InvalidInputError) as excinfo:
-        model_add_command(args)
+        model_add_command(_ARGS_INVALID_ALIAS)
 
     assert "Invalid alias format" in str(excinfo.value)
     mocks["mock_save_model_config"].assert_not_called()
 
-def test_model_add_command_invalid_hf_spec(mock_model_commands, capsys):
+def test_model_add_command_invalid_hf_spec(mock_model_commands):
     """Test adding a model with invalid HF spec"""
     mocks = mock_model_commands
     mocks["mock_parse_hf_spec"].side_effect = InvalidInputError("Invalid HF spec")
-    args = MagicMock(hf_spec="invalid/repo:spec", alias=None, set=None, auto_gpu=True)
 
     with pytest.raises(InvalidInputError) as excinfo:
-        model_add_command(args)
+        model_add_command(_ARGS_INVALID_HF_SPEC)
 
     assert "Invalid HF spec" in str(excinfo.value)
     mocks["mock_save_model_config"].assert_not_called()
@@ -85,24 +94,22 @@ def test_model_add_command_not_initialized(mock_model_commands, capsys):
     """Test adding a model when llamate is not initialized."""
     mocks = mock_model_commands
     mocks["mock_path_exists"].return_value = False # Simulate LLAMATE_HOME does not exist
-    args = MagicMock(hf_spec="user/repo:model.gguf", alias=None, set=None, auto_gpu=True)
 
     with pytest.raises(SystemExit) as excinfo:
-        model_add_command(args)
+        model_add_command(_ARGS_NOT_INITIALIZED)
 
     assert excinfo.value.code == 1
     captured = capsys.readouterr()
     assert "llamate is not initialized. Run 'llamate init' first." in captured.out
     mocks["mock_save_model_config"].assert_not_called()
 
-def test_model_add_command_invalid_args(mock_model_commands, capsys):
+def test_model_add_command_invalid_args(mock_model_commands):
     """Test adding a model with invalid arguments"""
     mocks = mock_model_commands
     mocks["mock_validate_args"].side_effect = InvalidInputError("Invalid argument format")
-    args = MagicMock(hf_spec="user/repo:model.gguf", alias=None, set=["invalid=arg"], auto_gpu=True)
 
     with pytest.raises(InvalidInputError) as excinfo:
-        model_add_command(args)
+        model_add_command(_ARGS_INVALID_ARGS)
 
     assert "Invalid argument format" in str(excinfo.value)
     mocks["mock_save_model_config"].assert_not_called()
@@ -134,11 +141,11 @@ def test_model_remove_command_success(mock_model_commands, capsys, monkeypatch):
     mocks["mock_path_unlink"].assert_called_once() # For the model yaml file
     mocks["mock_load_global_config"].assert_called_once()
     mocks["mock_save_global_config"].assert_not_called()  # No aliases to remove in this test
-    captured = capsys.readouterr()
-    assert f"Model '{model_name}' definition removed." in captured.out
-    assert "Do you want to remove the GGUF file" in captured.out
+    out = capsys.readouterr().out
+    assert f"Model '{model_name}' definition removed." in out
+    assert "Do you want to remove the GGUF file" in out
     # Check that the removal message is not present
-    assert "GGUF file 'test.gguf' removed." not in captured.out
+    assert "GGUF file 'test.gguf' removed." not in out
 
 def test_model_remove_command_prompt_yes(mock_model_commands, capsys, monkeypatch):
     """Test removing a model with prompt response 'y'."""
@@ -156,10 +163,10 @@ def test_model_remove_command_prompt_yes(mock_model_commands, capsys, monkeypatc
     assert mocks["mock_path_unlink"].call_count == 2 # For the model yaml and the gguf file
     mocks["mock_load_global_config"].assert_called()
     assert mocks["mock_load_global_config"].call_count == 1
-    captured = capsys.readouterr()
-    assert f"Model '{model_name}' definition removed." in captured.out
-    assert "Do you want to remove the GGUF file" in captured.out
-    assert "GGUF file 'test.gguf' removed." in captured.out
+    out = capsys.readouterr().out
+    assert f"Model '{model_name}' definition removed." in out
+    assert "Do you want to remove the GGUF file" in out
+    assert "GGUF file 'test.gguf' removed." in out
 
 def test_model_remove_command_delete_gguf(mock_model_commands, capsys, monkeypatch):
     """Test removing a model with --delete-gguf flag (no prompt)."""
@@ -177,10 +184,10 @@ def test_model_remove_command_delete_gguf(mock_model_commands, capsys, monkeypat
     assert mocks["mock_path_unlink"].call_count == 2 # For the model yaml and the gguf file
     mocks["mock_load_global_config"].assert_called()
     assert mocks["mock_load_global_config"].call_count == 1
-    captured = capsys.readouterr()
-    assert f"Model '{model_name}' definition removed." in captured.out
-    assert "GGUF file 'test.gguf' removed." in captured.out
-    assert "Do you want to remove the GGUF file" not in captured.out
+    out = capsys.readouterr().out
+    assert f"Model '{model_name}' definition removed." in out
+    assert "GGUF file 'test.gguf' removed." in out
+    assert "Do you want to remove the GGUF file" not in out
 
 def test_model_remove_command_model_not_found(mock_model_commands, capsys):
     """Test removing a non-existent model."""
@@ -1,11 +1,9 @@
 """Tests for the monitoring functions in serve.py."""
 import os
 import platform
-import tempfile
 import threading
 import time
-from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, Mock, patch
 
 import pytest
 
@@ -15,48 +13,44 @@ from llamate.cli.commands.serve import monitor_config_files, terminate_process
 @pytest.fixture
 def mock_process():
     """Create a mock process for testing."""
-    process = MagicMock()
+    process = Mock(spec=['poll', 'pid', 'terminate', 'wait', 'kill'])
     process.poll.return_value = None  # Process is running
     process.pid = 12345
     return process
 
 
 @pytest.fixture
-def mock_environment():
+def mock_environment(tmp_path):
     """Create a mock environment with config and model files."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_path = Path(temp_dir)
-        config_file = temp_path / "config.yaml"
-        models_dir = temp_path / "models"
-        models_dir.mkdir(exist_ok=True)
+    config_file = tmp_path / "config.yaml"
+    models_dir = tmp_path / "models"
+    models_dir.mkdir()
 
-        # Create bin directory for Windows compatibility
-        bin_dir = temp_path / "bin"
-        bin_dir.mkdir(exist_ok=True)
+    # Create bin directory for Windows compatibility
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
 
-        # Create a dummy llama-server executable
-        server_name = "llama-server.exe" if platform.system() == "Windows" else "llama-server"
-        (bin_dir / server_name).touch()
+    # Create a dummy llama-server executable
+    server_name = "llama-server.exe" if platform.system() == "Windows" else "llama-server"
+    (bin_dir / server_name).touch()
 
-        # Create main config file
-        with open(config_file, "w") as f:
-            f.write("initial config content")
+    # Create main config file
+    config_file.write_text("initial config content")
 
-        # Create a model file
-        model_file = models_dir / "model1.yaml"
-        with open(model_file, "w") as f:
-            f.write("initial model content")
+    # Create a model file
+    model_file = models_dir / "model1.yaml"
+    model_file.write_text("initial model content")
 
-        yield {
-            "temp_dir": temp_path,
-            "config_file": config_file,
-            "models_dir": models_dir,
-            "model_file": model_file,
-        }
+    return {
+        "temp_dir": tmp_path,
+        "config_file": config_file,
+        "models_dir": models_dir,
+        "model_file": model_file,
+    }
 
 
-def test_monitor_config_file_change(mock_process, mock_environment):
-    """Test that monitor_config_files detects changes to the main config file."""
+def _assert_restart_on(mock_process, mock_environment, mutate, message):
+    """Run monitor_config_files in a daemon thread, apply ``mutate`` and wait for a restart."""
     # Skip test on Windows if running in CI - Windows file monitoring has timing issues in CI
     if platform.system() == "Windows" and os.environ.get("CI"):
         pytest.skip("Skipping file monitoring test on Windows in CI environment")
@@ -69,7 +63,7 @@ def test_monitor_config_file_change(mock_process, mock_environment):
         process_terminated.set()
 
     with patch("llamate.cli.commands.serve.terminate_process", mock_terminate):
-        # Start monitoring in a separate thread
+        # A daemon thread can't hold up the session if the monitor ever ignores stop_event
         monitor_thread = threading.Thread(
             target=monitor_config_files,
             args=(
@@ -78,179 +72,60 @@ def test_monitor_config_file_change(mock_process, mock_environment):
                 mock_process,
                 stop_event,
             ),
+            daemon=True,
         )
-        monitor_thread.daemon = True
         monitor_thread.start()
 
         # Give monitoring time to initialize
         time.sleep(1)
 
-        # Modify the config file
-        with open(mock_environment["config_file"], "w") as f:
-            f.write("modified config content")
+        mutate()
 
         # Give time for the monitor to detect the change
-        timeout = 10
-        start_time = time.time()
-        while not process_terminated.is_set() and time.time() - start_time < timeout:
-            time.sleep(0.5)
+        process_terminated.wait(timeout=10)
 
         # Stop the monitoring thread
         stop_event.set()
         monitor_thread.join(timeout=5)
 
         # Assert that terminate_process was called
-        assert process_terminated.is_set(), "Process termination was not triggered by config file change"
-
-
-def test_monitor_model_file_change(mock_process, mock_environment):
-    """Test that monitor_config_files detects changes to model config files."""
-    # Skip test on Windows if running in CI - Windows file monitoring has timing issues in CI
-    if platform.system() == "Windows" and os.environ.get("CI"):
-        pytest.skip("Skipping file monitoring test on Windows in CI environment")
-
-    stop_event = threading.Event()
-    process_terminated = threading.Event()
-
-    # Override terminate_process to record that it was called
-    def mock_terminate(proc):
-        process_terminated.set()
+        assert process_terminated.is_set(), message
 
-    with patch("llamate.cli.commands.serve.terminate_process", mock_terminate):
-        # Start monitoring in a separate thread
-        monitor_thread = threading.Thread(
-            target=monitor_config_files,
-            args=(
-                mock_environment["config_file"],
-                mock_environment["models_dir"],
-                mock_process,
-                stop_event,
-            ),
-        )
-        monitor_thread.daemon = True
-        monitor_thread.start()
 
-        # Give monitoring time to initialize
-        time.sleep(1)
-
-        # Modify the model file
-        with open(mock_environment["model_file"], "w") as f:
-            f.write("modified model content")
-
-        # Give time for the monitor to detect the change
-        timeout = 10
-        start_time = time.time()
-        while not process_terminated.is_set() and time.time() - start_time < timeout:
-            time.sleep(0.5)
+def test_monitor_config_file_change(mock_process, mock_environment):
+    """Test that monitor_config_files detects changes to the main config file."""
+    _assert_restart_on(
+        mock_process, mock_environment,
+        lambda: mock_environment["config_file"].write_text("modified config content"),
+        "Process termination was not triggered by config file change",
+    )
 
-        # Stop the monitoring thread
-        stop_event.set()
-        monitor_thread.join(timeout=5)
 
-        # Assert that terminate_process was called
-        assert process_terminated.is_set(), "Process termination was not triggered by model file change"
+def test_monitor_model_file_change(mock_process, mock_environment):
+    """Test that monitor_config_files detects changes to model config files."""
+    _assert_restart_on(
+        mock_process, mock_environment,
+        lambda: mock_environment["model_file"].write_text("modified model content"),
+        "Process termination was not triggered by model file change",
+    )
 
 
 def test_monitor_new_model_file(mock_process, mock_environment):
     """Test that monitor_config_files detects when a new model file is added."""
-    # Skip test on Windows if running in CI - Windows file monitoring has timing issues in CI
-    if platform.system() == "Windows" and os.environ.get("CI"):
-        pytest.skip("Skipping file monitoring test on Windows in CI environment")
-
-    stop_event = threading.Event()
-    process_terminated = threading.Event()
-
-    # Override terminate_process to record that it was called
-    def mock_terminate(proc):
-        process_terminated.set()
-
-    with patch("llamate.cli.commands.serve.terminate_process", mock_terminate):
-        # Start monitoring in a separate thread
-        monitor_thread = threading.Thread(
-            target=monitor_config_files,
-            args=(
-                mock_environment["config_file"],
-                mock_environment["models_dir"],
-                mock_process,
-                stop_event,
-            ),
-        )
-        monitor_thread.daemon = True
-        monitor_thread.start()
-
-        # Give monitoring time to initialize
-        time.sleep(1)
-
-        # Create a new model file
-        new_model_file = mock_environment["models_dir"] / "new_model.yaml"
-        with open(new_model_file, "w") as f:
-            f.write("new model content")
-
-        # Give time for the monitor to detect the change
-        timeout = 10
-        start_time = time.time()
-        while not process_terminated.is_set() and time.time() - start_time < timeout:
-            time.sleep(0.5)
-
-        # Stop the monitoring thread
-        stop_event.set()
-        monitor_thread.join(timeout=5)
-
-        # Clean up the new file
-        try:
-            os.unlink(new_model_file)
-        except:
-            pass
-
-        # Assert that terminate_process was called
-        assert process_terminated.is_set(), "Process termination was not triggered by new model file"
+    _assert_restart_on(
+        mock_process, mock_environment,
+        lambda: (mock_environment["models_dir"] / "new_model.yaml").write_text("new model content"),
+        "Process termination was not triggered by new model file",
+    )
 
 
 def test_monitor_delete_model_file(mock_process, mock_environment):
     """Test that monitor_config_files detects when a model file is deleted."""
-    # Skip test on Windows if running in CI - Windows file monitoring has timing issues in CI
-    if platform.system() == "Windows" and os.environ.get("CI"):
-        pytest.skip("Skipping file monitoring test on Windows in CI environment")
-
-    stop_event = threading.Event()
-    process_terminated = threading.Event()
-
-    # Override terminate_process to record that it was called
-    def mock_terminate(proc):
-        process_terminated.set()
-
-    with patch("llamate.cli.commands.serve.terminate_process", mock_terminate):
-        # Start monitoring in a separate thread
-        monitor_thread = threading.Thread(
-            target=monitor_config_files,
-            args=(
-                mock_environment["config_file"],
-                mock_environment["models_dir"],
-                mock_process,
-                stop_event,
-            ),
-        )
-        monitor_thread.daemon = True
-        monitor_thread.start()
-
-        # Give monitoring time to initialize
-        time.sleep(1)
-
-        # Delete the model file
-        os.unlink(mock_environment["model_file"])
-
-        # Give time for the monitor to detect the change
-        timeout = 10
-        start_time = time.time()
-        while not process_terminated.is_set() and time.time() - start_time < timeout:
-            time.sleep(0.5)
-
-        # Stop the monitoring thread
-        stop_event.set()
-        monitor_thread.join(timeout=5)
-
-        # Assert that terminate_process was called
-        assert process_terminated.is_set(), "Process termination was not triggered by model file deletion"
+    _assert_restart_on(
+        mock_process, mock_environment,
+        lambda: os.unlink(mock_environment["model_file"]),
+        "Process termination was not triggered by model file deletion",
+    )
 
 
 def test_terminate_process_windows():
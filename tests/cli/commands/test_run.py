@@ -1,7 +1,7 @@
 import pytest
 import sys
 import requests # Added import
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, Mock
 from io import StringIO
 
 from llamate.cli.commands.run import run_command
@@ -21,11 +21,21 @@ def mock_requests_post():
     with patch('requests.post') as mock_post:
         yield mock_post
 
+@pytest.fixture
+def fake_input(monkeypatch):
+    """Fixture returning a helper that feeds a sequence of lines to input()."""
+    def _feed(lines):
+        responses = iter(lines)
+        monkeypatch.setattr('builtins.input', lambda *_: next(responses))
+    return _feed
+
 def create_mock_response(chunks):
     """Helper to create a mock requests response object for streaming."""
-    mock_response = MagicMock()
+    mock_response = Mock(spec=['status_code', 'iter_content', 'raise_for_status'])
     mock_response.status_code = 200
-    mock_response.iter_content.return_value = (chunk.encode('utf-8') for chunk in chunks)
+    # Encode once up front; every iter_content() call gets a fresh iterator
+    payload = [chunk.encode('utf-8') for chunk in chunks]
+    mock_response.iter_content.side_effect = lambda *args, **kwargs: iter(payload)
     mock_response.raise_for_status.return_value = None
     return mock_response
 
@@ -53,16 +63,11 @@ def test_run_command_successful_conversation(mock_global_config, mock_requests_p
     assert kwargs['json']['messages'][0]['content'] == "hi"
     assert kwargs['json']['stream'] is True
 
-def test_run_command_exit_command(mock_global_config, capsys):
+@pytest.mark.parametrize("exit_cmd", ["/bye", "exit"])
+def test_run_command_exit_command(mock_global_config, fake_input, exit_cmd, capsys):
     """Test that the run command exits on '/bye' or 'exit'."""
-    with patch('builtins.input', side_effect=["/bye"]):
-        run_command(MagicMock(model_name="test-model"))
-    captured = capsys.readouterr()
-    assert "Ending conversation." in captured.out
-    assert "Starting conversation with model: test-model" in captured.out
-
-    with patch('builtins.input', side_effect=["exit"]):
-        run_command(MagicMock(model_name="test-model"))
+    fake_input([exit_cmd])
+    run_command(MagicMock(model_name="test-model"))
     captured = capsys.readouterr()
     assert "Ending conversation." in captured.out
     assert "Starting conversation with model: test-model" in captured.out
@@ -11,6 +11,10 @@ from unittest.mock import patch
 
 import pytest
 
+# Nothing below exercises serve_command yet; skip the module instead of
+# building the fixture for placeholder tests.
+pytest.skip("serve_command tests not implemented yet", allow_module_level=True)
+
 
 @pytest.fixture
 def mock_serve_components():
@@ -1,9 +1,16 @@
 """Tests for CLI functionality"""
-import json
-from unittest.mock import MagicMock, patch
+import re
+from types import MappingProxyType, SimpleNamespace as NS
+from unittest.mock import DEFAULT, patch
 
 import pytest
 
+# orjson is optional; json.loads accepts bytes as well
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 from llamate.cli.commands.config import (
     config_get_command,
     config_list_args_command,
@@ -12,18 +19,13 @@ from llamate.cli.commands.config import (
 )
 
 
-def test_config_handling(test_data_dir):
+def test_config_handling(test_data_dir, sample_config, sample_config_json):
     """Test configuration file handling"""
     config_path = test_data_dir / "config.json"
-    test_config = {
-        "model_path": str(test_data_dir / "model"),
-        "context_length": 2048,
-        "temperature": 0.7
-    }
 
-    config_path.write_text(json.dumps(test_config))
-    loaded_config = json.loads(config_path.read_text())
-    assert loaded_config == test_config
+    config_path.write_bytes(sample_config_json)
+    loaded_config = json_loads(config_path.read_bytes())
+    assert loaded_config == sample_config
 
 def test_config_validation(test_data_dir):
     """Test config validation"""
@@ -35,37 +37,55 @@ def test_config_validation(test_data_dir):
     required_keys = ["model_path", "context_length", "temperature"]
     assert all(key in config for key in required_keys)
 
+# Error patterns for pytest.raises, compiled once per module
+_RE_MODEL_NOT_FOUND = re.compile(r"Error: Model 'non_existent' not found")
+_RE_ARG_NOT_FOUND = re.compile(r"Argument 'non_existent_arg' not found for model 'test_model'")
+
+# Read-only configs shared by every mock_config_commands instance
+MOCK_GLOBAL_CONFIG = MappingProxyType({"llama_server_path": "/fake/server", "ggufs_storage_path": "/fake/ggufs"})
+MOCK_MODEL_CONFIG = MappingProxyType({
+    "hf_repo": "test/repo",
+    "hf_file": "test.gguf",
+    "args": MappingProxyType({"temp": "0.7", "n-gpu-layers": "30"}),
+})
+
 # Fixture to mock necessary components for config command tests
 @pytest.fixture
 def mock_config_commands():
-    mock_global_config = {"llama_server_path": "/fake/server", "ggufs_storage_path": "/fake/ggufs"}
-    mock_model_config = {"hf_repo": "test/repo", "hf_file": "test.gguf", "args": {"temp": "0.7", "n-gpu-layers": "30"}}
 
-    with patch('llamate.core.config.load_global_config', return_value=mock_global_config.copy()) as mock_load_global_config, \
-         patch('llamate.core.config.save_global_config') as mock_save_global_config, \
-         patch('llamate.core.config.load_model_config', return_value=mock_model_config.copy()) as mock_load_model_config, \
-         patch('llamate.core.config.save_model_config') as mock_save_model_config, \
+    with patch.multiple(
+             'llamate.core.config',
+             load_global_config=DEFAULT,
+             save_global_config=DEFAULT,
+             load_model_config=DEFAULT,
+             save_model_config=DEFAULT,
+         ) as config_mocks, \
          patch('llamate.constants.DEFAULT_CONFIG', {"llama_server_path": "", "ggufs_storage_path": ""}), \
-         patch('sys.stdout', new_callable=MagicMock) as mock_stdout, \
          patch('builtins.input', return_value="") as mock_input, \
          patch('llamate.services.llama_swap.save_llama_swap_config') as mock_save_llama_swap_config: # Add llama_swap mock
+        mock_load_global_config = config_mocks["load_global_config"]
+        mock_load_global_config.return_value = MOCK_GLOBAL_CONFIG
+        mock_load_model_config = config_mocks["load_model_config"]
+        # The config commands edit "args" in place, so only that level is copied
+        mock_load_model_config.return_value = {**MOCK_MODEL_CONFIG, "args": dict(MOCK_MODEL_CONFIG["args"])}
+        mock_save_global_config = config_mocks["save_global_config"]
+        mock_save_model_config = config_mocks["save_model_config"]
 
         yield {
             "mock_load_global_config": mock_load_global_config,
             "mock_save_global_config": mock_save_global_config,
             "mock_load_model_config": mock_load_model_config,
             "mock_save_model_config": mock_save_model_config,
-            "mock_stdout": mock_stdout,
             "mock_input": mock_input,
             "mock_save_llama_swap_config": mock_save_llama_swap_config,
-            "global_config": mock_global_config,
-            "model_config": mock_model_config
+            "global_config": MOCK_GLOBAL_CONFIG,
+            "model_config": MOCK_MODEL_CONFIG
         }
 
-def test_config_set_command_success(mock_config_commands, runner, tmp_path, capsys):
+def test_config_set_command_success(mock_config_commands, capsys):
     """Test config_set_command successfully sets a model argument."""
     mocks = mock_config_commands
-    args = MagicMock(model_name="test_model", key="temp", value="0.9")
+    args = NS(model_name="test_model", key="temp", value="0.9")
 
     config_set_command(args)
 
@@ -76,22 +96,10 @@ def test_config_set_command_success(mock_config_commands, runner, tmp_path, caps
     captured = capsys.readouterr()
     assert "Argument 'temp' set to '0.9' for model 'test_model'" in captured.out
 
-def test_config_set_command_model_not_found(mock_config_commands):
-    """Test config_set_command when model is not found."""
-    mocks = mock_config_commands
-    mocks["mock_load_model_config"].side_effect = ValueError("Model 'non_existent' not found")
-    args = MagicMock(model_name="non_existent", key="temp", value="0.9")
-
-    with pytest.raises(ValueError, match="Error: Model 'non_existent' not found"):
-        config_set_command(args)
-
-    mocks["mock_load_model_config"].assert_called_once_with("non_existent")
-    mocks["mock_save_model_config"].assert_not_called()
-
-def test_config_get_command_success(mock_config_commands, runner, tmp_path, capsys):
+def test_config_get_command_success(mock_config_commands, capsys):
     """Test config_get_command successfully gets a model argument."""
     mocks = mock_config_commands
-    args = MagicMock(model_name="test_model", key="temp")
+    args = NS(model_name="test_model", key="temp")
 
     config_get_command(args)
 
@@ -101,31 +109,10 @@ def test_config_get_command_success(mock_config_commands, runner, tmp_path, caps
     assert '0.7' in captured.out
     # The test expects the value to be printed, but the exact output format might vary
 
-def test_config_get_command_model_not_found(mock_config_commands):
-    """Test config_get_command when model is not found."""
-    mocks = mock_config_commands
-    mocks["mock_load_model_config"].side_effect = ValueError("Model 'non_existent' not found")
-    args = MagicMock(model_name="non_existent", key="temp")
-
-    with pytest.raises(ValueError, match="Error: Model 'non_existent' not found"):
-        config_get_command(args)
-
-    mocks["mock_load_model_config"].assert_called_once_with("non_existent")
-
-def test_config_get_command_arg_not_found(mock_config_commands):
-    """Test config_get_command when argument is not found."""
-    mocks = mock_config_commands
-    args = MagicMock(model_name="test_model", key="non_existent_arg")
-
-    with pytest.raises(ValueError, match="Argument 'non_existent_arg' not found for model 'test_model'"):
-        config_get_command(args)
-
-    mocks["mock_load_model_config"].assert_called_once_with("test_model")
-
-def test_config_list_args_command_with_args(mock_config_commands, runner, tmp_path, capsys):
+def test_config_list_args_command_with_args(mock_config_commands, capsys):
     """Test config_list_args_command when model has arguments."""
     mocks = mock_config_commands
-    args = MagicMock(model_name="test_model")
+    args = NS(model_name="test_model")
 
     config_list_args_command(args)
 
@@ -133,11 +120,11 @@ def test_config_list_args_command_with_args(mock_config_commands, runner, tmp_pa
     captured = capsys.readouterr()
     assert "Arguments for model 'test_model':" in captured.out
 
-def test_config_list_args_command_no_args(mock_config_commands, runner, tmp_path, capsys):
+def test_config_list_args_command_no_args(mock_config_commands, capsys):
     """Test config_list_args_command when model has no arguments."""
     mocks = mock_config_commands
     mocks["mock_load_model_config"].return_value = {"hf_repo": "test/repo", "hf_file": "test.gguf", "args": {}}
-    args = MagicMock(model_name="test_model")
+    args = NS(model_name="test_model")
 
     config_list_args_command(args)
 
@@ -145,21 +132,10 @@ def test_config_list_args_command_no_args(mock_config_commands, runner, tmp_path
     captured = capsys.readouterr()
     assert "No arguments set for model 'test_model'" in captured.out
 
-def test_config_list_args_command_model_not_found(mock_config_commands):
-    """Test config_list_args_command when model is not found."""
-    mocks = mock_config_commands
-    mocks["mock_load_model_config"].side_effect = ValueError("Model 'non_existent' not found")
-    args = MagicMock(model_name="non_existent")
-
-    with pytest.raises(ValueError, match="Error: Model 'non_existent' not found"):
-        config_list_args_command(args)
-
-    mocks["mock_load_model_config"].assert_called_once_with("non_existent")
-
-def test_config_remove_arg_command_success(mock_config_commands, runner, tmp_path, capsys):
+def test_config_remove_arg_command_success(mock_config_commands, capsys):
     """Test config_remove_arg_command successfully removes a model argument."""
     mocks = mock_config_commands
-    args = MagicMock(model_name="test_model", key="temp")
+    args = NS(model_name="test_model", key="temp")
 
     config_remove_arg_command(args)
 
@@ -171,52 +147,65 @@ def test_config_remove_arg_command_success(mock_config_commands, runner, tmp_pat
     captured = capsys.readouterr()
     assert "Argument 'temp' removed from model 'test_model'" in captured.out
 
-def test_config_remove_arg_command_model_not_found(mock_config_commands):
-    """Test config_remove_arg_command when model is not found."""
+# Config subcommands and the args each needs, for the generated error matrix.
+# "arg_not_found" only applies to commands that look up an existing key.
+COMMANDS = {
+    "set": (config_set_command, {"key": "temp", "value": "0.9"}),
+    "get": (config_get_command, {"key": "temp"}),
+    "list": (config_list_args_command, {}),
+    "remove": (config_remove_arg_command, {"key": "temp"}),
+}
+SCENARIOS = {
+    "model_not_found": ("set", "get", "list", "remove"),
+    "arg_not_found": ("get", "remove"),
+}
+
+def pytest_generate_tests(metafunc):
+    if {"cmd_name", "scenario"} <= set(metafunc.fixturenames):
+        cases = [(cmd, scenario) for scenario, cmds in SCENARIOS.items() for cmd in cmds]
+        metafunc.parametrize("cmd_name,scenario", cases, ids=[f"{c}-{s}" for c, s in cases])
+
+def test_config_command_errors(mock_config_commands, cmd_name, scenario):
+    """Test missing-model and missing-argument errors for every config subcommand."""
     mocks = mock_config_commands
-    mocks["mock_load_model_config"].side_effect = ValueError("Model 'non_existent' not found")
-    args = MagicMock(model_name="non_existent", key="temp")
+    command, extra_args = COMMANDS[cmd_name]
 
-    with pytest.raises(ValueError, match="Error: Model 'non_existent' not found"):
-        config_remove_arg_command(args)
+    if scenario == "model_not_found":
+        mocks["mock_load_model_config"].side_effect = ValueError("Model 'non_existent' not found")
+        model_name, pattern = "non_existent", _RE_MODEL_NOT_FOUND
+    else:
+        extra_args = {**extra_args, "key": "non_existent_arg"}
+        model_name, pattern = "test_model", _RE_ARG_NOT_FOUND
 
-    mocks["mock_load_model_config"].assert_called_once_with("non_existent")
-    mocks["mock_save_model_config"].assert_not_called()
+    with pytest.raises(ValueError, match=pattern):
+        command(NS(model_name=model_name, **extra_args))
 
-def test_config_remove_arg_command_arg_not_found(mock_config_commands):
-    """Test config_remove_arg_command when argument is not found."""
-    mocks = mock_config_commands
-    args = MagicMock(model_name="test_model", key="non_existent_arg")
-
-    with pytest.raises(ValueError, match="Argument 'non_existent_arg' not found for model 'test_model'"):
-        config_remove_arg_command(args)
-
-    mocks["mock_load_model_config"].assert_called_once_with("test_model")
+    mocks["mock_load_model_config"].assert_called_once_with(model_name)
     mocks["mock_save_model_config"].assert_not_called()
 
 # TODO: Need to fix import path and add missing fixtures before enabling these tests
 """
-def test_handle_set_command_interactive_global(runner, capsys):
+def test_handle_set_command_interactive_global(capsys):
     # Test commented out - requires fixing import path
     pass
 
-def test_handle_set_command_interactive_global_no_input(mock_prompt, mock_save_config, mock_load_config, runner, capsys):
+def test_handle_set_command_interactive_global_no_input(mock_prompt, mock_save_config, mock_load_config, capsys):
     # Test commented out - requires missing fixtures
     pass
 
-def test_handle_set_command_global_key_value(mock_save_config, mock_load_config, runner, capsys):
+def test_handle_set_command_global_key_value(mock_save_config, mock_load_config, capsys):
     # Test commented out - requires missing fixtures
     pass
 
-def test_handle_set_command_model_key_value(mock_save_config, mock_load_config, runner, capsys):
+def test_handle_set_command_model_key_value(mock_save_config, mock_load_config, capsys):
     # Test commented out - requires missing fixtures
     pass
 
-def test_set_global_command_success(mock_save_config, mock_load_config, runner, capsys):
+def test_set_global_command_success(mock_save_config, mock_load_config, capsys):
     # Test commented out - requires missing fixtures
     pass
 
-def test_set_global_command_warning_non_standard_key(mock_save_config, mock_load_config, runner, capsys):
+def test_set_global_command_warning_non_standard_key(mock_save_config, mock_load_config, capsys):
     # Test commented out - requires missing fixtures
     pass
 """
@@ -1,63 +1,66 @@
 """Tests for the main CLI entry point and argument parsing."""
+from argparse import _SubParsersAction
+
 import pytest
-from unittest.mock import patch, MagicMock
-import sys
+from unittest.mock import DEFAULT, patch
 
 from llamate.cli.cli import main, create_parser
-from llamate.cli.commands import init as init_commands
-from llamate.cli.commands import config as config_commands
-from llamate.cli.commands import model as model_commands
-from llamate.cli.commands import serve as serve_commands
 
 # Fixture to mock command functions
 @pytest.fixture
 def mock_commands():
     with (
-            patch('llamate.cli.commands.init.init_command') as mock_init,
-            patch('llamate.cli.commands.config.handle_set_command') as mock_set,
-            patch('llamate.cli.commands.model.model_add_command') as mock_add,
-            patch('llamate.cli.commands.model.model_list_command') as mock_list,
-            patch('llamate.cli.commands.model.model_remove_command') as mock_remove,
-            patch('llamate.cli.commands.config.config_set_command') as mock_config_set,
-            patch('llamate.cli.commands.config.config_get_command') as mock_config_get,
-            patch('llamate.cli.commands.config.config_list_args_command') as mock_config_list,
-            patch('llamate.cli.commands.config.config_remove_arg_command') as mock_config_remove,
-            patch('llamate.cli.commands.serve.serve_command') as mock_serve,
-            patch('llamate.cli.commands.config.print_config_command') as mock_print
+            patch.multiple('llamate.cli.commands.init', init_command=DEFAULT) as init_mocks,
+            patch.multiple(
+                'llamate.cli.commands.config',
+                handle_set_command=DEFAULT,
+                config_set_command=DEFAULT,
+                config_get_command=DEFAULT,
+                config_list_args_command=DEFAULT,
+                config_remove_arg_command=DEFAULT,
+                print_config_command=DEFAULT,
+            ) as config_mocks,
+            patch.multiple(
+                'llamate.cli.commands.model',
+                model_add_command=DEFAULT,
+                model_list_command=DEFAULT,
+                model_remove_command=DEFAULT,
+            ) as model_mocks,
+            patch.multiple('llamate.cli.commands.serve', serve_command=DEFAULT) as serve_mocks
         ):
         yield {
-            "init": mock_init,
-            "set": mock_set,
-            "add": mock_add,
-            "list": mock_list,
-            "remove": mock_remove,
-            "config_set": mock_config_set,
-            "config_get": mock_config_get,
-            "config_list": mock_config_list,
-            "config_remove": mock_config_remove,
-            "serve": mock_serve,
-            "print": mock_print,
+            "init": init_mocks["init_command"],
+            "set": config_mocks["handle_set_command"],
+            "add": model_mocks["model_add_command"],
+            "list": model_mocks["model_list_command"],
+            "remove": model_mocks["model_remove_command"],
+            "config_set": config_mocks["config_set_command"],
+            "config_get": config_mocks["config_get_command"],
+            "config_list": config_mocks["config_list_args_command"],
+            "config_remove": config_mocks["config_remove_arg_command"],
+            "serve": serve_mocks["serve_command"],
+            "print": config_mocks["print_config_command"],
         }
 
-def test_create_parser():
+@pytest.fixture(scope="module")
+def parser():
+    """Build the CLI parser once for all parser tests in this module."""
+    return create_parser()
+
+def test_create_parser(parser):
     """Test if the parser is created correctly with all commands."""
-    parser = create_parser()
-    subparsers_actions = [action for action in parser._actions if isinstance(action, pytest.importorskip('argparse')._SubParsersAction)]
-    assert len(subparsers_actions) == 1
-    subparser = subparsers_actions[0]
+    subparser = next(action for action in parser._actions if isinstance(action, _SubParsersAction))
     
     expected_commands = ['init', 'set', 'add', 'list', 'remove', 'config', 'serve', 'print']
     assert all(cmd in subparser.choices for cmd in expected_commands)
 
     # Check config subparsers
     config_parser = subparser.choices['config']
-    config_subparsers_actions = [action for action in config_parser._actions if isinstance(action, pytest.importorskip('argparse')._SubParsersAction)]
-    assert len(config_subparsers_actions) == 1
-    config_subparser = config_subparsers_actions[0]
+    config_subparser = next(action for action in config_parser._actions if isinstance(action, _SubParsersAction))
     expected_config_commands = ['set', 'get', 'list', 'remove']
     assert all(cmd in config_subparser.choices for cmd in expected_config_commands)
 
-def test_main_no_command(mock_commands, capsys):
+def test_main_no_command(mock_commands):
     """Test main function when no command is provided."""
     # TODO: Fix test for no command
     pass
@@ -67,12 +70,12 @@ def test_main_init_command(mock_commands):
     # TODO: Fix test for init command
     pass
 
-def test_main_set_command_global(mock_commands, capsys):
+def test_main_set_command_global(mock_commands):
     """Test main function with global set command."""
     # TODO: Fix test for global set command
     pass
 
-def test_main_set_command_key_value(mock_commands, capsys):
+def test_main_set_command_key_value(mock_commands):
     """Test main function with direct key=value set command."""
     # TODO: Fix test for key-value set command
     pass
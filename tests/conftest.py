@@ -1,26 +1,86 @@
 """Test fixtures for llamate"""
+import json
 import pytest
-from pathlib import Path
+from types import MappingProxyType
 import os
 
+from unittest.mock import patch
+
+from llamate import constants
+from llamate.core import config
+from llamate.core import platform as llamate_platform
+
+# orjson is an optional test dependency; it encodes straight to bytes
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+except ImportError:
+    def _json_dumps(obj):
+        return json.dumps(obj).encode()
+
+@pytest.fixture(scope="session")
+def test_data_dir(tmp_path_factory):
+    """Fixture for test data directory, private to each xdist worker (each has its own basetemp)"""
+    return tmp_path_factory.mktemp("test_data")
+
+@pytest.fixture(scope="session")
+def sample_config(test_data_dir):
+    """Sample model configuration shared by the config tests"""
+    return {
+        "model_path": str(test_data_dir / "model"),
+        "context_length": 2048,
+        "temperature": 0.7
+    }
+
+@pytest.fixture(scope="session")
+def sample_config_json(sample_config):
+    """UTF-8 JSON encoding of sample_config, serialized once per session"""
+    return _json_dumps(sample_config)
+
+@pytest.fixture(scope="session")
+def std_global_config():
+    """Read-only global config shared by the llama-swap config tests"""
+    return MappingProxyType({
+        "llama_server_path": "/path/to/llama-server",
+        "ggufs_storage_path": "/path/to/ggufs",
+        "healthCheckTimeout": 30,
+        "logLevel": "debug",
+        "groups": {"group1": ["model1"]}
+    })
+
 @pytest.fixture
-def test_data_dir():
-    """Fixture for test data directory"""
-    path = Path(__file__).parent / "test_data"
-    path.mkdir(exist_ok=True)
-    return path
+def llamate_home(tmp_path, monkeypatch):
+    """Point every llamate path constant at a temporary home via $LLAMATE_HOME"""
+    home = tmp_path / ".config" / "llamate"
+    monkeypatch.setenv("LLAMATE_HOME", str(home))
+    # Record the current values so monkeypatch restores them after init_paths rebinds them
+    for name in ("LLAMATE_HOME", "LLAMATE_CONFIG_FILE", "LLAMA_SWAP_CONFIG_FILE",
+                 "MODELS_DIR", "GGUFS_DIR", "DEFAULT_CONFIG"):
+        monkeypatch.setattr(constants, name, getattr(constants, name))
+    config.init_paths()
+    return home
+
+# OS/architecture probes that llamate caches for the life of the process
+_PLATFORM_PROBES = (
+    llamate_platform.is_windows,
+    llamate_platform.get_platform_arch,
+    llamate_platform.get_llama_server_bin_name,
+    llamate_platform.get_llama_swap_bin_name,
+    llamate_platform._detect_platform_info,
+)
 
 @pytest.fixture
-def runner():
-    """Fixture for running CLI commands"""
-    class CliRunner:
-        def invoke(self, cli, args):
-            """Run a CLI command with given arguments"""
-            try:
-                result = cli(args)
-                return result
-            except SystemExit as e:
-                return e.code
-            except Exception as e:
-                return e
-    return CliRunner()
\ No newline at end of file
+def mock_platform():
+    """Mock platform.system/machine, with llamate's cached platform probes cleared around the test"""
+    for probe in _PLATFORM_PROBES:
+        probe.cache_clear()
+    with (
+        patch('platform.system') as mock_system,
+        patch('platform.machine') as mock_machine
+    ):
+        yield {
+            'system': mock_system,
+            'machine': mock_machine
+        }
+    for probe in _PLATFORM_PROBES:
+        probe.cache_clear()
@@ -7,22 +7,48 @@ from unittest.mock import patch
 from llamate.core import config
 from llamate import constants
 
+# Prefer libyaml's C implementation when PyYAML was built with it
+_YAML_LOADER = yaml.CSafeLoader if yaml.__with_libyaml__ else yaml.SafeLoader
+_YAML_DUMPER = yaml.CSafeDumper if yaml.__with_libyaml__ else yaml.SafeDumper
+
+def _yload(path):
+    return yaml.load(path.read_bytes(), Loader=_YAML_LOADER)
+
+def _ydump(data):
+    return yaml.dump(data, Dumper=_YAML_DUMPER)
+
+# YAML documents written by the load tests, dumped once per session
+@pytest.fixture(scope="session")
+def yaml_payloads():
+    configs = {
+        "existing_global": {"llama_server_path": "/path/to/server", "new_key": "value"},
+        "existing_model": {"hf_repo": "test/repo", "hf_file": "test.gguf", "args": {"param": "value"}},
+        "old_model": {"hf_repo": "old/repo", "hf_file": "old.gguf", "default_args": {"param": "value"}},
+        "no_args_model": {"hf_repo": "no/args/repo", "hf_file": "no_args.gguf"},
+    }
+    return {name: (cfg, _ydump(cfg)) for name, cfg in configs.items()}
+
 # Fixture to mock constants and provide a temporary home directory
 @pytest.fixture
-def mock_constants(tmp_path):
-    with patch('llamate.constants.LLAMATE_HOME', tmp_path / ".config" / "llamate"), \
-         patch('llamate.constants.LLAMATE_CONFIG_FILE', tmp_path / ".config" / "llamate" / "llamate.yaml"), \
-         patch('llamate.constants.MODELS_DIR', tmp_path / ".config" / "llamate" / "models"), \
-         patch('llamate.constants.GGUFS_DIR', tmp_path / ".config" / "llamate" / "ggufs"), \
-         patch('llamate.constants.DEFAULT_CONFIG', {
-             "llama_server_path": "",
-             "ggufs_storage_path": "",
-             "llama_swap_listen_port": constants.LLAMA_SWAP_DEFAULT_PORT
-         }):
-        yield tmp_path
-
-def test_init_paths_default(mock_constants):
+def mock_constants(tmp_path, monkeypatch):
+    home = tmp_path / ".config" / "llamate"
+    monkeypatch.setattr(constants, 'LLAMATE_HOME', home)
+    monkeypatch.setattr(constants, 'LLAMATE_CONFIG_FILE', home / "llamate.yaml")
+    monkeypatch.setattr(constants, 'MODELS_DIR', home / "models")
+    monkeypatch.setattr(constants, 'GGUFS_DIR', home / "ggufs")
+    monkeypatch.setattr(constants, 'DEFAULT_CONFIG', {
+        "llama_server_path": "",
+        "ggufs_storage_path": "",
+        "llama_swap_listen_port": constants.LLAMA_SWAP_DEFAULT_PORT
+    })
+    (home / "models").mkdir(parents=True)
+    (home / "ggufs").mkdir()
+    yield tmp_path
+    config._read_yaml.cache_clear()
+
+def test_init_paths_default(mock_constants, monkeypatch):
     """Test init_paths with default path"""
+    monkeypatch.delenv("LLAMATE_HOME", raising=False)
     # Ensure constants are initially None or different
     constants.LLAMATE_HOME = None
     constants.LLAMATE_CONFIG_FILE = None
@@ -37,6 +63,16 @@ def test_init_paths_default(mock_constants):
     assert constants.GGUFS_DIR == Path.home() / ".config" / "llamate" / "ggufs"
     assert constants.DEFAULT_CONFIG["ggufs_storage_path"] == str(constants.GGUFS_DIR)
 
+def test_init_paths_env_override(mock_constants, monkeypatch):
+    """Test init_paths honours the LLAMATE_HOME environment variable"""
+    env_home = mock_constants / "env_llamate"
+    monkeypatch.setenv("LLAMATE_HOME", str(env_home))
+    config.init_paths()
+
+    assert constants.LLAMATE_HOME == env_home
+    assert constants.MODELS_DIR == env_home / "models"
+    assert constants.GGUFS_DIR == env_home / "ggufs"
+
 def test_init_paths_custom(mock_constants):
     """Test init_paths with custom base path"""
     custom_path = mock_constants / "custom_llamate"
@@ -53,13 +89,11 @@ def test_load_global_config_default(mock_constants):
     global_config = config.load_global_config()
     assert global_config == constants.DEFAULT_CONFIG
 
-def test_load_global_config_existing(mock_constants):
+def test_load_global_config_existing(mock_constants, yaml_payloads):
     """Test loading existing global config"""
     config_path = constants.LLAMATE_CONFIG_FILE
-    config_path.parent.mkdir(parents=True, exist_ok=True)
-    existing_config = {"llama_server_path": "/path/to/server", "new_key": "value"}
-    with open(config_path, 'w') as f:
-        yaml.dump(existing_config, f)
+    existing_config, existing_yaml = yaml_payloads["existing_global"]
+    config_path.write_text(existing_yaml)
 
     global_config = config.load_global_config()
     expected_config = {**constants.DEFAULT_CONFIG, **existing_config}
@@ -73,18 +107,14 @@ def test_save_global_config(mock_constants):
     config.save_global_config(new_config)
 
     assert config_path.exists()
-    with open(config_path, 'r') as f:
-        loaded_config = yaml.safe_load(f)
-    assert loaded_config == new_config
+    assert _yload(config_path) == new_config
 
-def test_load_model_config_existing(mock_constants):
+def test_load_model_config_existing(mock_constants, yaml_payloads):
     """Test loading existing model config"""
     model_name = "test_model"
     model_file = constants.MODELS_DIR / f"{model_name}.yaml"
-    model_file.parent.mkdir(parents=True, exist_ok=True)
-    existing_config = {"hf_repo": "test/repo", "hf_file": "test.gguf", "args": {"param": "value"}}
-    with open(model_file, 'w') as f:
-        yaml.dump(existing_config, f)
+    existing_config, existing_yaml = yaml_payloads["existing_model"]
+    model_file.write_text(existing_yaml)
 
     model_config = config.load_model_config(model_name)
     assert model_config == existing_config
@@ -104,41 +134,53 @@ def test_save_model_config(mock_constants):
     config.save_model_config(model_name, new_config)
 
     assert model_file.exists()
-    with open(model_file, 'r') as f:
-        loaded_config = yaml.safe_load(f)
-    assert loaded_config == new_config
+    assert _yload(model_file) == new_config
 
-def test_load_model_config_backward_compatibility(mock_constants):
+def test_load_model_config_backward_compatibility(mock_constants, yaml_payloads):
     """Test loading model config with old 'default_args' key"""
     model_name = "old_model"
     model_file = constants.MODELS_DIR / f"{model_name}.yaml"
-    model_file.parent.mkdir(parents=True, exist_ok=True)
-    old_config = {"hf_repo": "old/repo", "hf_file": "old.gguf", "default_args": {"param": "value"}}
     expected_config = {"hf_repo": "old/repo", "hf_file": "old.gguf", "args": {"param": "value"}}
-    with open(model_file, 'w') as f:
-        yaml.dump(old_config, f)
+    model_file.write_text(yaml_payloads["old_model"][1])
 
     model_config = config.load_model_config(model_name)
     assert model_config == expected_config
 
-def test_load_model_config_no_args(mock_constants):
+def test_load_model_config_no_args(mock_constants, yaml_payloads):
     """Test loading model config with no args key"""
     model_name = "no_args_model"
     model_file = constants.MODELS_DIR / f"{model_name}.yaml"
-    model_file.parent.mkdir(parents=True, exist_ok=True)
-    no_args_config = {"hf_repo": "no/args/repo", "hf_file": "no_args.gguf"}
     expected_config = {"hf_repo": "no/args/repo", "hf_file": "no_args.gguf", "args": {}}
-    with open(model_file, 'w') as f:
-        yaml.dump(no_args_config, f)
+    model_file.write_text(yaml_payloads["no_args_model"][1])
 
     model_config = config.load_model_config(model_name)
     assert model_config == expected_config
 
+def test_load_model_config_cached(mock_constants, yaml_payloads):
+    """Test that unchanged model files are parsed once and returned as independent copies"""
+    model_file = constants.MODELS_DIR / "cached_model.yaml"
+    model_file.write_text(yaml_payloads["existing_model"][1])
+
+    with patch('llamate.core.config.yaml.safe_load', wraps=yaml.safe_load) as mock_safe_load:
+        first = config.load_model_config("cached_model")
+        first["args"]["param"] = "mutated"
+        second = config.load_model_config("cached_model")
+
+    assert mock_safe_load.call_count == 1
+    assert second["args"]["param"] == "value"
+
+def test_load_global_config_sees_saved_changes(mock_constants):
+    """Test that saving the global config invalidates the cached parse"""
+    config.save_global_config({"llama_server_path": "/first"})
+    assert config.load_global_config()["llama_server_path"] == "/first"
+
+    config.save_global_config({"llama_server_path": "/second"})
+    assert config.load_global_config()["llama_server_path"] == "/second"
+
 def test_register_alias(mock_constants):
     """Test registering a valid alias"""
     model_name = "test_model"
     model_file = constants.MODELS_DIR / f"{model_name}.yaml"
-    model_file.parent.mkdir(parents=True, exist_ok=True)
     model_file.write_text("hf_repo: test/repo")
     
     alias = "my_alias"
@@ -151,7 +193,6 @@ def test_register_alias_invalid(mock_constants):
     """Test registering invalid aliases"""
     model_name = "test_model"
     model_file = constants.MODELS_DIR / f"{model_name}.yaml"
-    model_file.parent.mkdir(parents=True, exist_ok=True)
     model_file.write_text("hf_repo: test/repo")
     
     # Empty alias
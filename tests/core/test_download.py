@@ -1,14 +1,16 @@
 """Tests for download functionality."""
+import io
+import json
 import pytest
-from pathlib import Path
-from unittest.mock import patch, MagicMock, mock_open, ANY
+from unittest.mock import patch, MagicMock, ANY
 import requests # Import requests for mocking
-from io import StringIO
+import responses
+import urllib3
+from io import BytesIO, StringIO
 import re # Import re for content-range parsing
 
-from llamate.core.download import download_file, format_bytes
-from llamate import constants
-from llamate.utils.exceptions import DownloadError # Import constants
+from llamate.core.download import download_file, format_bytes, _ProgressPrinter, _ProgressWriter
+from llamate.utils.exceptions import DownloadError
 
 def test_format_bytes():
     """Test format_bytes utility function."""
@@ -22,106 +24,172 @@ def test_format_bytes():
     assert format_bytes(1.2 * 1024**3) == "1.2 GB"
     assert format_bytes(1024**4) == "1.0 TB" # Expect 1.0 TB after updating the function
 
-# Fixture to mock requests and file operations
-def path_exists_side_effect(path_to_check):
-    """Helper function for mocking Path.exists()"""
-    # Always return True for directories during cleanup
-    if str(path_to_check).endswith('pytest-of-cosmic'):
-        return True
-    # Handle normal test cases
-    return False
-
-@pytest.fixture
-def mock_download(tmp_path):
-    """Fixture to mock necessary components for download tests."""
-    mock_global_config = {"llama_server_path": ""}
+def test_progress_printer_throttles(monkeypatch, capsys):
+    """Test that progress redraws are rate limited but always reach 100%."""
+    monkeypatch.setattr('llamate.core.download.time.monotonic', lambda: 100.0)
+    printer = _ProgressPrinter(1000)
+    for downloaded in (100, 200, 300, 1000):
+        printer.update(downloaded)
 
-    # Mock requests.Response object
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.headers = {'content-length': '12'} # Default content length
-    # Simulate reading in chunks using iter_content
-    mock_response.iter_content.side_effect = lambda chunk_size: iter([b"chunk1", b"chunk2", b""])
-    mock_response.raise_for_status.return_value = None # Ensure raise_for_status does nothing on success
+    out = capsys.readouterr().out
+    assert out.count("Downloading:") == 2
+    assert "100.0%" in out
 
-    # Mock the context manager returned by requests.get(stream=True)
-    mock_response.__enter__.return_value = mock_response
-    mock_response.__exit__.return_value = None
+def test_progress_writer_checkpoints(tmp_path, monkeypatch):
+    """Test that the resume offset is persisted only at checkpoint boundaries."""
+    monkeypatch.setattr('llamate.core.download.META_CHECKPOINT_SIZE', 10)
+    meta_file = tmp_path / "model.gguf.meta"
+    with open(tmp_path / "model.gguf.tmp", 'wb') as fh:
+        writer = _ProgressWriter(fh, meta_file, 0, 0, None)
+        writer.write(b"x" * 6)
+        assert not meta_file.exists()
+        writer.write(b"x" * 6)
+        assert meta_file.read_text() == "12"
+        writer.write(b"x" * 3)
+        assert meta_file.read_text() == "12"
+        writer.checkpoint()
+        assert meta_file.read_text() == "15"
 
-    # Mock requests.get to return the mock_response (which is also a mock context manager)
-    mock_requests_get = MagicMock(return_value=mock_response)
+URL = "http://example.com/file.txt"
 
-    # Use mock_open to create the mock for builtins.open
-    mock_builtin_open = mock_open()
-    # Add closed attribute to the object returned by mock_open
-    mock_builtin_open.return_value.closed = False
-
-
-    with (
-        patch('llamate.core.config.load_global_config', return_value=mock_global_config) as mock_load_config,
-        patch('llamate.core.config.save_global_config') as mock_save_config,
-        patch('llamate.core.download.download_binary', return_value=tmp_path / "mock_archive.tar.gz") as mock_download_binary,
-        patch('llamate.core.download.extract_binary') as mock_extract,
-        patch('llamate.constants.LLAMATE_HOME', tmp_path / ".config" / "llamate"),
-        patch('llamate.constants.MODELS_DIR', tmp_path / ".config" / "llamate" / "models"),
-        patch('llamate.constants.GGUFS_DIR', tmp_path / ".config" / "llamate" / "ggufs"),
-        # Patch requests.get instead of urllib.request.urlopen
-        patch('requests.get', mock_requests_get) as mock_get,
-        patch('builtins.open', new=mock_builtin_open) as mock_open_patch,
-        patch.object(Path, 'exists') as mock_path_exists,
-        patch.object(Path, 'mkdir') as mock_path_mkdir,
-        patch.object(Path, 'rename') as mock_path_rename,
-        patch.object(Path, 'unlink') as mock_path_unlink
-    ):
+# Serve download_file's HTTP traffic from responses; files are written for real under tmp_path
+@pytest.fixture
+def mock_download(tmp_path):
+    """Fixture to register a 12-byte download at URL."""
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        # HEAD probe without Accept-Ranges keeps downloads on the single-stream path
+        rsps.head(URL, headers={'Content-Length': '12'})
+        rsps.get(URL, body=b"chunk1chunk2", headers={'Content-Length': '12'})
+        yield {"tmp_path": tmp_path, "rsps": rsps}
 
-        yield {
-            "mock_load_config": mock_load_config,
-            "mock_save_config": mock_save_config,
-            "mock_download_binary": mock_download_binary,
-            "mock_extract": mock_extract,
-            "llamate_home": constants.LLAMATE_HOME,
-            "tmp_path": tmp_path,
-            "mock_get": mock_get, # Yield mock_get instead of mock_urlopen
-            "mock_response": mock_response,
-            "mock_builtin_open": mock_builtin_open,
-            "mock_path_exists": mock_path_exists,
-            "mock_path_mkdir": mock_path_mkdir,
-            "mock_path_rename": mock_path_rename,
-            "mock_path_unlink": mock_path_unlink
-        }
-        # Teardown: Set closed attribute to True (if applicable to mocks)
-        # if hasattr(mock_response, 'closed'):
-        #      mock_response.closed = True
-        if mock_builtin_open.called and hasattr(mock_builtin_open(), 'closed'):
-             mock_builtin_open().closed = True
+def _get_calls(rsps):
+    """Return the GET requests seen by rsps."""
+    return [c.request for c in rsps.calls if c.request.method == 'GET']
 
 def test_download_file_success(mock_download, capsys):
     """Test successful file download without resume."""
     mocks = mock_download
-    url = "http://example.com/file.txt"
-    destination = mocks["tmp_path"] / "downloaded_file.txt"
+    destination = mocks["tmp_path"] / "downloads" / "downloaded_file.txt"
 
-    download_file(url, destination, resume=False)
+    with patch('llamate.core.download.os.posix_fallocate', create=True) as mock_fallocate:
+        download_file(URL, destination, resume=False)
 
-    # Assert requests.get was called
-    mocks["mock_get"].assert_called_once_with(url, headers={}, stream=True, verify=ANY, timeout=30)
-    mocks["mock_path_mkdir"].assert_called_once()
-    # Assert that open was called with the temporary file in write binary mode
-    mocks["mock_builtin_open"].assert_any_call(destination.with_suffix(".txt.tmp"), 'wb')
-    # Assert that open was called with the meta file in write mode
-    mocks["mock_builtin_open"].assert_any_call(destination.with_suffix(".txt.meta"), 'w')
-    mocks["mock_builtin_open"].return_value.__enter__().write.assert_any_call(b"chunk1")
-    mocks["mock_builtin_open"].return_value.__enter__().write.assert_any_call(b"chunk2")
-    # The number of exists checks may vary, but we expect at least 2
-    assert mocks["mock_path_exists"].call_count >= 2
-    mocks["mock_path_rename"].assert_called_once_with(destination)
-    # We might have multiple unlink calls (temp file + meta file)
-    assert mocks["mock_path_unlink"].call_count >= 1
+    # The temp file is preallocated to the advertised size before writing
+    mock_fallocate.assert_called_once_with(ANY, 0, 12)
+    # A single fresh GET, without a Range header
+    (request,) = _get_calls(mocks["rsps"])
+    assert 'Range' not in request.headers
+    assert destination.read_bytes() == b"chunk1chunk2"
+    # Temp and meta files are cleaned up once the download is renamed into place
+    assert not destination.with_suffix(".txt.tmp").exists()
+    assert not destination.with_suffix(".txt.meta").exists()
     # Use capsys to capture output
     captured = capsys.readouterr()
     assert "Downloading:" in captured.out
     assert "100.0%" in captured.out
 
+def test_download_file_parallel_ranges(tmp_path, monkeypatch, capsys):
+    """Test that large range-capable downloads are fetched as concurrent slices."""
+    payload = bytes(range(256)) * 40
+    monkeypatch.setattr('llamate.core.download.PARALLEL_MIN_SIZE', 1024)
+    url = "http://example.com/model.gguf"
+    destination = tmp_path / "model.gguf"
+
+    head_response = MagicMock()
+    head_response.headers = {'content-length': str(len(payload)), 'accept-ranges': 'bytes'}
+
+    def fake_get(url, headers, **kwargs):
+        start, end = map(int, headers['Range'][len('bytes='):].split('-'))
+        response = MagicMock()
+        response.__enter__.return_value = response
+        response.status_code = 206
+        # Stream the requested slice in 100-byte reads, as a live response would
+        body = BytesIO(payload[start:end + 1])
+        response.iter_content.side_effect = lambda chunk_size: iter(lambda: body.read(100), b"")
+        return response
+
+    with (
+        patch('llamate.core.download._SESSION.head', return_value=head_response),
+        patch('llamate.core.download._SESSION.get', side_effect=fake_get) as mock_get,
+    ):
+        download_file(url, destination, resume=False)
+
+    assert destination.read_bytes() == payload
+    assert mock_get.call_count == 4
+    assert not destination.with_suffix(".gguf.tmp").exists()
+    assert not destination.with_suffix(".gguf.meta").exists()
+    assert "100.0%" in capsys.readouterr().out
+
+def test_download_file_parallel_resume(tmp_path, monkeypatch):
+    """Test that an interrupted parallel download only refetches its unfinished segments."""
+    payload = bytes(range(256)) * 40
+    monkeypatch.setattr('llamate.core.download.PARALLEL_MIN_SIZE', 1024)
+    url = "http://example.com/model.gguf"
+    destination = tmp_path / "model.gguf"
+
+    head_response = MagicMock()
+    head_response.headers = {'content-length': str(len(payload)), 'accept-ranges': 'bytes'}
+    interrupted_start = len(payload) * 2 // 4  # Segment 2 of 0-3
+
+    def fake_get(url, headers, interrupt=False, **kwargs):
+        start, end = map(int, headers['Range'][len('bytes='):].split('-'))
+        if interrupt and start == interrupted_start:
+            raise KeyboardInterrupt
+        response = MagicMock()
+        response.__enter__.return_value = response
+        response.status_code = 206
+        response.iter_content.return_value = [payload[start:end + 1]]
+        return response
+
+    with (
+        patch('llamate.core.download._SESSION.head', return_value=head_response),
+        patch('llamate.core.download._SESSION.get', side_effect=lambda *a, **kw: fake_get(*a, interrupt=True, **kw)),
+        pytest.raises(KeyboardInterrupt),
+    ):
+        download_file(url, destination)
+
+    assert not destination.exists()
+    # Segments still queued when the interrupt landed may not have run
+    done = json.loads(destination.with_suffix(".gguf.meta").read_text())['done']
+    assert 2 not in done and {0, 1} <= set(done)
+    missing = [i for i in range(4) if i not in done]
+
+    with (
+        patch('llamate.core.download._SESSION.head', return_value=head_response),
+        patch('llamate.core.download._SESSION.get', side_effect=fake_get) as mock_get,
+    ):
+        download_file(url, destination)
+
+    fetched = sorted(call.kwargs['headers']['Range'] for call in mock_get.call_args_list)
+    assert fetched == [f'bytes={len(payload) * i // 4}-{len(payload) * (i + 1) // 4 - 1}' for i in missing]
+    assert destination.read_bytes() == payload
+    assert not destination.with_suffix(".gguf.meta").exists()
+
+def test_download_file_local_copy(tmp_path):
+    """Test that file:// URLs are copied locally without HTTP requests."""
+    source = tmp_path / "source.gguf"
+    source.write_bytes(b"gguf" * 1000)
+    destination = tmp_path / "models" / "copy.gguf"
+
+    with patch('llamate.core.download._SESSION.get') as mock_get:
+        download_file(source.as_uri(), destination)
+
+    mock_get.assert_not_called()
+    assert destination.read_bytes() == source.read_bytes()
+    assert not destination.with_suffix(".gguf.tmp").exists()
+
+def test_download_file_local_copy_size_limit(tmp_path):
+    """Test that file:// copies respect max_size."""
+    source = tmp_path / "source.gguf"
+    source.write_bytes(b"gguf" * 1000)
+    destination = tmp_path / "models" / "copy.gguf"
+
+    with pytest.raises(DownloadError, match="exceeds limit 100"):
+        download_file(source.as_uri(), destination, max_size=100)
+
+    assert not destination.exists()
+    assert not destination.with_suffix(".gguf.tmp").exists()
+
 """
 def test_download_file_resume_existing_meta(mock_download, capsys):
     mocks = mock_download
@@ -188,54 +256,78 @@ def test_download_file_resume_meta_read_error(mock_download, capsys):
 def test_download_file_url_error(mock_download, capsys):
     """Test file download when requests.exceptions.RequestException occurs."""
     mocks = mock_download
-    url = "http://example.com/file.txt"
     destination = mocks["tmp_path"] / "downloaded_file.txt"
 
-    # Mock requests.get to raise a RequestException
-    mocks["mock_get"].side_effect = requests.exceptions.RequestException("Mocked network error")
+    # Make the GET raise a RequestException
+    mocks["rsps"].replace(responses.GET, URL, body=requests.exceptions.RequestException("Mocked network error"))
 
     # Expect DownloadError with a message matching the requests exception
     with pytest.raises(DownloadError, match="Download failed: Mocked network error"):
-        download_file(url, destination, resume=False)
+        download_file(URL, destination, resume=False)
 
-    mocks["mock_get"].assert_called_once_with(url, headers={}, stream=True, verify=ANY, timeout=30)
-    mocks["mock_path_rename"].assert_not_called()
-    # Meta file might exist or should be kept with partial download, so don't assert unlink
-    # mocks["mock_path_unlink"].assert_not_called()
+    assert len(_get_calls(mocks["rsps"])) == 1
+    assert not destination.exists()
+    assert not destination.with_suffix(".txt.tmp").exists()
     # Use capsys to capture output
     captured = capsys.readouterr()
     assert "Download failed: Mocked network error" in captured.err
 
+class _TruncatedBody(io.RawIOBase):
+    """Response body whose connection drops after the first chunk."""
+
+    def __init__(self):
+        self.reads = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        self.reads += 1
+        if self.reads > 1:
+            raise urllib3.exceptions.ProtocolError("Connection broken: IncompleteRead")
+        buffer[:6] = b"chunk1"
+        return 6
+
+def test_download_file_connection_dropped(mock_download, capsys):
+    """Test that a body cut off mid-stream raises DownloadError and cleans up."""
+    mocks = mock_download
+    destination = mocks["tmp_path"] / "downloaded_file.txt"
+    mocks["rsps"].replace(responses.GET, URL, body=io.BufferedReader(_TruncatedBody()),
+                          headers={'Content-Length': '12'})
+
+    with pytest.raises(DownloadError, match="IncompleteRead"):
+        download_file(URL, destination, resume=False)
+
+    assert not destination.exists()
+    assert not destination.with_suffix(".txt.tmp").exists()
+    assert not destination.with_suffix(".txt.meta").exists()
+    assert "Download failed:" in capsys.readouterr().err
+
 def test_download_file_io_error(mock_download, capsys):
     """Test file download when IOError occurs during writing."""
     mocks = mock_download
-    url = "http://example.com/file.txt"
     destination = mocks["tmp_path"] / "downloaded_file.txt"
+    real_open = open
 
-    # Set up mock open to fail when writing to temp file
-    def mock_open_side_effect(*args, **kwargs):
-        if args and str(args[0]).endswith('.txt.tmp'):
-            # Create a mock file object that raises IOError on write
+    # Fail writes to the temp file; every other file is opened for real
+    def failing_open(file, *args, **kwargs):
+        if str(file).endswith('.txt.tmp'):
             mock_file = MagicMock()
             mock_file.__enter__.return_value.write.side_effect = IOError("Mocked disk full error")
             return mock_file
-        return mock_open().return_value
-    
-    mocks["mock_builtin_open"].side_effect = mock_open_side_effect
-    
-    # Ensure requests.get succeeds so we reach the file writing part
-    mocks["mock_get"].return_value.status_code = 200
-    mocks["mock_get"].return_value.headers = {'content-length': '12'}
-    mocks["mock_get"].return_value.iter_content.side_effect = lambda chunk_size: iter([b"chunk1", b"chunk2", b""])
+        return real_open(file, *args, **kwargs)
 
     # Expect DownloadError with a message matching the IOError
-    with pytest.raises(DownloadError, match="Download failed: Mocked disk full error"):
-        download_file(url, destination, resume=False)
+    with (
+        patch('builtins.open', side_effect=failing_open),
+        patch('llamate.core.download.os.fsync'),
+        pytest.raises(DownloadError, match="Download failed: Mocked disk full error"),
+    ):
+        download_file(URL, destination, resume=False)
 
-    mocks["mock_get"].assert_called_once_with(url, headers={}, stream=True, verify=ANY, timeout=30)
-    # Should attempt to create the meta file and temp file
-    assert mocks["mock_builtin_open"].call_count >= 2
-    mocks["mock_path_rename"].assert_not_called()
+    assert len(_get_calls(mocks["rsps"])) == 1
+    assert not destination.exists()
+    assert not destination.with_suffix(".txt.meta").exists()
     # Use capsys to capture output
     captured = capsys.readouterr()
     assert "Download failed: Mocked disk full error" in captured.err
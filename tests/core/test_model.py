@@ -1,5 +1,6 @@
 """Tests for model management functionality."""
 import pytest
+from types import MappingProxyType
 from unittest.mock import patch
 
 from llamate.core import model
@@ -8,12 +9,13 @@ from llamate.services.aliases import get_model_aliases
 # Fixture to mock get_model_aliases for consistent testing
 @pytest.fixture
 def mock_model_aliases():
-    mock_aliases = {
+    mock_aliases = MappingProxyType({
         "test_alias": {"hf_repo": "mock/repo", "hf_file": "mock.gguf", "args": {"temp": "0.7"}},
         "another_alias": {"hf_repo": "another/repo", "hf_file": "another.gguf", "args": {}},
         "repo_only_alias": {"hf_repo": "repo/only", "hf_file": "file.gguf", "args": {}}
-    }
-    with patch('llamate.services.aliases.get_model_aliases', return_value=mock_aliases):
+    })
+    # Patch the name model.py imported, not the service attribute
+    with patch('llamate.core.model.get_model_aliases', return_value=mock_aliases):
         yield mock_aliases
 
 # Fixture to mock platform.detect_gpu
@@ -43,107 +45,51 @@ def test_parse_hf_spec_invalid_format():
     with pytest.raises(model.InvalidInputError, match="Unrecognized repository specification format"):
         model.parse_hf_spec(hf_spec)
 
-def test_validate_model_name_valid():
-    """Test validating a valid model name."""
-    name = "my_model-123_v4"
-    validated_name = model.validate_model_name(name)
-    assert validated_name == name
-
-def test_validate_model_name_with_spaces():
-    """Test validating a model name with spaces (should be sanitized)."""
-    name = "my model name"
-    validated_name = model.validate_model_name(name)
-    assert validated_name == "my_model_name"
-
-def test_validate_model_name_empty():
-    """Test validating an empty model name."""
-    name = ""
-    with pytest.raises(ValueError, match="Model name cannot be empty"):
-        model.validate_model_name(name)
-
-def test_validate_model_name_no_alphanumeric():
-    """Test validating a model name with no alphanumeric characters."""
-    name = "_-"
-    with pytest.raises(ValueError, match="Model name must contain at least one alphanumeric character"):
-        model.validate_model_name(name)
-
-def test_validate_args_list_valid():
-    """Test validating a list of valid arguments."""
-    args_list = ["temp=0.8", "n-gpu-layers=30", "key=value with spaces"]
-    validated_args = model.validate_args_list(args_list)
-    assert validated_args == {"temp": "0.8", "n-gpu-layers": "30", "key": "value with spaces"}
-
-def test_validate_args_list_empty():
-    """Test validating an empty list of arguments."""
-    args_list = []
-    validated_args = model.validate_args_list(args_list)
-    assert validated_args == {}
-
-def test_validate_args_list_invalid_format():
-    """Test validating a list with an invalid argument format."""
-    args_list = ["temp=0.8", "invalid_arg", "key=value"]
-    with pytest.raises(ValueError, match="Argument 'invalid_arg' is not in KEY=VALUE format"):
-        model.validate_args_list(args_list)
-
-def test_validate_args_list_empty_key():
-    """Test validating a list with an empty key."""
-    args_list = ["=value"]
-    with pytest.raises(ValueError, match="Argument key cannot be empty"):
-        model.validate_args_list(args_list)
-
-def test_configure_gpu_auto_detect_gpu_found(mock_detect_gpu):
-    """Test configure_gpu with auto-detect and GPU found."""
-    mock_detect_gpu.return_value = (True, 40)
-    model_config = {"hf_repo": "test/repo", "hf_file": "test.gguf", "args": {}}
-    model_name = "my_model"
-    
-    updated_config = model.configure_gpu(model_config, model_name, auto_detect=True)
-    
-    mock_detect_gpu.assert_called_once()
-    assert updated_config["args"]['n-gpu-layers'] == "40"
-
-def test_configure_gpu_auto_detect_gpu_not_found(mock_detect_gpu):
-    """Test configure_gpu with auto-detect and no GPU found."""
-    mock_detect_gpu.return_value = (False, None)
-    model_config = {"hf_repo": "test/repo", "hf_file": "test.gguf", "args": {}}
-    model_name = "my_model"
-    
-    updated_config = model.configure_gpu(model_config, model_name, auto_detect=True)
-    
-    mock_detect_gpu.assert_called_once()
-    assert 'n-gpu-layers' not in updated_config["args"]
-
-def test_configure_gpu_auto_detect_gpu_found_no_layers(mock_detect_gpu):
-    """Test configure_gpu with auto-detect and GPU found but no suggested layers."""
-    mock_detect_gpu.return_value = (True, None)
-    model_config = {"hf_repo": "test/repo", "hf_file": "test.gguf", "args": {}}
-    model_name = "my_model"
-    
-    updated_config = model.configure_gpu(model_config, model_name, auto_detect=True)
-    
-    mock_detect_gpu.assert_called_once()
-    assert 'n-gpu-layers' not in updated_config["args"]
-
-def test_configure_gpu_auto_detect_disabled(mock_detect_gpu):
-    """Test configure_gpu with auto-detect disabled."""
-    model_config = {"hf_repo": "test/repo", "hf_file": "test.gguf", "args": {}}
-    model_name = "my_model"
-    
-    updated_config = model.configure_gpu(model_config, model_name, auto_detect=False)
-    
-    mock_detect_gpu.assert_not_called()
-    assert 'n-gpu-layers' not in updated_config["args"]
-
-def test_configure_gpu_n_gpu_layers_already_set(mock_detect_gpu):
-    """Test configure_gpu when n-gpu-layers is already in args."""
-    mock_detect_gpu.return_value = (True, 40)
-    model_config = {"hf_repo": "test/repo", "hf_file": "test.gguf", "args": {'n-gpu-layers': '20'}}
-    model_name = "my_model"
-    
-    updated_config = model.configure_gpu(model_config, model_name, auto_detect=True)
-    
-    mock_detect_gpu.assert_not_called()
-    assert updated_config["args"]['n-gpu-layers'] == "20"
+@pytest.mark.parametrize("name, expected, error", [
+    ("my_model-123_v4", "my_model-123_v4", None),
+    ("my model name", "my_model_name", None),  # spaces are sanitized
+    ("", None, "Model name cannot be empty"),
+    ("_-", None, "Model name must contain at least one alphanumeric character"),
+])
+def test_validate_model_name(name, expected, error):
+    """Test validating and sanitizing model names."""
+    if error:
+        with pytest.raises(ValueError, match=error):
+            model.validate_model_name(name)
+    else:
+        assert model.validate_model_name(name) == expected
+
+@pytest.mark.parametrize("args_list, expected, error", [
+    (["temp=0.8", "n-gpu-layers=30", "key=value with spaces"],
+     {"temp": "0.8", "n-gpu-layers": "30", "key": "value with spaces"}, None),
+    ([], {}, None),
+    (["temp=0.8", "invalid_arg", "key=value"], None, "Argument 'invalid_arg' is not in KEY=VALUE format"),
+    (["=value"], None, "Argument key cannot be empty"),
+])
+def test_validate_args_list(args_list, expected, error):
+    """Test validating KEY=VALUE argument lists."""
+    if error:
+        with pytest.raises(ValueError, match=error):
+            model.validate_args_list(args_list)
+    else:
+        assert model.validate_args_list(args_list) == expected
+
+@pytest.mark.parametrize("detected, auto_detect, preset_args, expected_layers, detect_called", [
+    ((True, 40), True, {}, "40", True),  # GPU found
+    ((False, None), True, {}, None, True),  # no GPU found
+    ((True, None), True, {}, None, True),  # GPU found but no suggested layers
+    ((True, 40), False, {}, None, False),  # auto-detect disabled
+    ((True, 40), True, {'n-gpu-layers': '20'}, "20", False),  # n-gpu-layers already set
+])
+def test_configure_gpu(mock_detect_gpu, detected, auto_detect, preset_args, expected_layers, detect_called):
+    """Test configure_gpu across detection results and existing settings."""
+    mock_detect_gpu.return_value = detected
+    model_config = {"hf_repo": "test/repo", "hf_file": "test.gguf", "args": dict(preset_args)}
+
+    updated_config = model.configure_gpu(model_config, "my_model", auto_detect=auto_detect)
+
+    assert mock_detect_gpu.call_count == int(detect_called)
+    assert updated_config["args"].get('n-gpu-layers') == expected_layers
 
 # Core model functionality tests
 @pytest.fixture
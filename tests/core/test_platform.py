@@ -2,18 +2,54 @@
 import subprocess
 import pytest
 from unittest.mock import patch, MagicMock
+from llamate.core import platform as platform_module
+from llamate.utils import gpu as gpu_module
 from llamate.core.platform import is_windows, get_platform_arch, get_swap_platform, get_platform_info, detect_gpu, get_llama_server_bin_name
 
+# Platform probes cached for the process; cleared so each test sees its own mocks
+CACHED_PROBES = (
+    detect_gpu, is_windows, get_platform_arch, get_llama_server_bin_name,
+    platform_module._detect_platform_info, platform_module.get_llama_swap_bin_name,
+    platform_module._nvidia_probe,
+)
+
+@pytest.fixture(autouse=True)
+def clear_platform_caches(monkeypatch, tmp_path):
+    """Make every test probe the (mocked) platform and GPU tools afresh, without real NVML."""
+    monkeypatch.setattr(gpu_module, 'pynvml', None)
+    # Pretend the NVIDIA driver is loaded unless a test says otherwise
+    driver_version = tmp_path / "nvidia_version"
+    driver_version.write_text("NVRM version: fake\n")
+    monkeypatch.setattr(platform_module, 'NVIDIA_DRIVER_PROC', str(driver_version))
+    monkeypatch.setattr(platform_module, 'WSL_GPU_PATHS', ())
+    # No sysfs PCI listing unless a test provides one, so every GPU tool is tried
+    monkeypatch.setattr(platform_module, 'PCI_VENDOR_GLOB', '/nonexistent/*/vendor')
+    for probe in CACHED_PROBES:
+        probe.cache_clear()
+    yield
+    for probe in CACHED_PROBES:
+        probe.cache_clear()
+
+@pytest.fixture
+def pci_devices(tmp_path, monkeypatch):
+    """Return a helper that lays out fake sysfs PCI devices with the given vendor IDs."""
+    def make(*vendors):
+        for i, vendor in enumerate(vendors):
+            device = tmp_path / f"0000:00:{i:02x}.0"
+            device.mkdir()
+            (device / "vendor").write_text(f"{vendor}\n")
+        monkeypatch.setattr(platform_module, 'PCI_VENDOR_GLOB', str(tmp_path / "*" / "vendor"))
+    return make
+
 @pytest.fixture
-def mock_platform():
-    with (
-        patch('platform.system') as mock_system,
-        patch('platform.machine') as mock_machine
-    ):
-        yield {
-            'system': mock_system,
-            'machine': mock_machine
-        }
+def mock_pynvml(monkeypatch):
+    """Install a fake pynvml module reporting one 4 GiB device."""
+    nvml = MagicMock()
+    nvml.NVMLError = type("NVMLError", (Exception,), {})
+    nvml.nvmlDeviceGetCount.return_value = 1
+    nvml.nvmlDeviceGetMemoryInfo.return_value = MagicMock(total=4096 * 1024 * 1024)
+    monkeypatch.setattr(gpu_module, 'pynvml', nvml)
+    return nvml
 
 def test_is_windows_true(mock_platform):
     """Test is_windows returns True on Windows platform"""
@@ -115,9 +151,112 @@ def test_detect_gpu_nvidia(mock_subprocess_run):
     assert suggested_layers == 5 # min(32, max(4, int(4096/1024 / 0.75))) = min(32, max(4, int(4 / 0.75))) = min(32, max(4, 5)) = 5
     mock_subprocess_run.assert_called_with(
         ['nvidia-smi', '--query-gpu=memory.total', '--format=csv,noheader,nounits'],
+        capture_output=True, text=True, check=True, timeout=platform_module.NVIDIA_SMI_TIMEOUT
+    )
+
+@patch('subprocess.run')
+def test_detect_gpu_nvidia_multi_gpu(mock_subprocess_run):
+    """Test detect_gpu sums the per-device lines nvidia-smi prints on a multi-GPU host."""
+    mock_subprocess_run.return_value = MagicMock(stdout="4096\n4096\n")
+    has_gpu, suggested_layers = detect_gpu()
+    assert has_gpu is True
+    assert suggested_layers == 10  # 8 GiB across two 4 GiB devices
+
+@patch('subprocess.run')
+def test_detect_gpu_nvidia_memory_query_hangs(mock_subprocess_run):
+    """Test detect_gpu gives up on a memory query that stalls after a successful probe."""
+    mock_subprocess_run.side_effect = [
+        MagicMock(),  # nvidia-smi -L
+        subprocess.TimeoutExpired(['nvidia-smi', '--query-gpu=memory.total'], 10.0),
+        subprocess.CalledProcessError(1, 'rocm-smi'),
+    ]
+    has_gpu, suggested_layers = detect_gpu()
+    assert has_gpu is False
+    assert suggested_layers is None
+
+@patch('subprocess.run')
+def test_detect_gpu_nvml(mock_subprocess_run, mock_pynvml):
+    """Test detect_gpu reads VRAM through NVML without spawning nvidia-smi."""
+    has_gpu, suggested_layers = detect_gpu()
+    assert has_gpu is True
+    assert suggested_layers == 5
+    mock_subprocess_run.assert_not_called()
+    mock_pynvml.nvmlShutdown.assert_called_once()
+
+@patch('subprocess.run')
+def test_detect_gpu_nvml_multi_gpu(mock_subprocess_run, mock_pynvml):
+    """Test detect_gpu sizes layers for the VRAM of every NVIDIA device combined."""
+    mock_pynvml.nvmlDeviceGetCount.return_value = 2
+    has_gpu, suggested_layers = detect_gpu()
+    assert has_gpu is True
+    assert suggested_layers == 10  # 8 GiB across two 4 GiB devices
+    mock_subprocess_run.assert_not_called()
+
+@patch('subprocess.run')
+def test_detect_gpu_nvml_error_falls_back(mock_subprocess_run, mock_pynvml):
+    """Test detect_gpu falls back to nvidia-smi when NVML cannot initialize."""
+    mock_pynvml.nvmlInit.side_effect = mock_pynvml.NVMLError()
+    mock_subprocess_run.return_value = MagicMock(stdout="4096\n")
+    has_gpu, suggested_layers = detect_gpu()
+    assert has_gpu is True
+    assert suggested_layers == 5
+    # Usability probe, then the memory query
+    assert mock_subprocess_run.call_count == 2
+
+@patch('subprocess.run')
+def test_detect_gpu_sysfs_no_gpu_vendor(mock_subprocess_run, pci_devices, monkeypatch):
+    """Test detect_gpu spawns no tools without an NVIDIA driver or an AMD device in sysfs."""
+    monkeypatch.setattr(platform_module.platform, 'system', lambda: 'Linux')
+    monkeypatch.setattr(platform_module, 'NVIDIA_DRIVER_PROC', '/nonexistent/nvidia/version')
+    pci_devices("0x8086", "0x1af4")
+    assert detect_gpu() == (False, None)
+    mock_subprocess_run.assert_not_called()
+
+@patch('subprocess.run')
+def test_detect_gpu_sysfs_amd_only(mock_subprocess_run, pci_devices, monkeypatch):
+    """Test detect_gpu skips nvidia-smi on an AMD-only host."""
+    monkeypatch.setattr(platform_module.platform, 'system', lambda: 'Linux')
+    monkeypatch.setattr(platform_module, 'NVIDIA_DRIVER_PROC', '/nonexistent/nvidia/version')
+    pci_devices("0x8086", "0x1002")
+    mock_subprocess_run.return_value = MagicMock(stdout="GPU_MEMORY: 8192MB\n")
+    assert detect_gpu() == (True, 20)
+    mock_subprocess_run.assert_called_once_with(
+        ['rocm-smi', '--showmeminfo'],
         capture_output=True, text=True, check=True
     )
 
+@patch('subprocess.run')
+def test_detect_gpu_sysfs_hides_nvidia(mock_subprocess_run, pci_devices):
+    """Test an NVIDIA driver is trusted even when sysfs shows only virtual devices (WSL2, containers)."""
+    pci_devices("0x1414")
+    mock_subprocess_run.return_value = MagicMock(stdout="4096\n")
+    assert detect_gpu() == (True, 5)
+
+@patch('subprocess.run')
+def test_detect_gpu_no_nvidia_driver(mock_subprocess_run, mock_pynvml, monkeypatch):
+    """Test detect_gpu skips NVML and nvidia-smi when the Linux NVIDIA driver isn't loaded."""
+    monkeypatch.setattr(platform_module.platform, 'system', lambda: 'Linux')
+    monkeypatch.setattr(platform_module, 'NVIDIA_DRIVER_PROC', '/nonexistent/nvidia/version')
+    mock_subprocess_run.return_value = MagicMock(stdout="GPU_MEMORY: 8192MB\n")
+    assert detect_gpu() == (True, 20)
+    mock_pynvml.nvmlInit.assert_not_called()
+    mock_subprocess_run.assert_called_once_with(
+        ['rocm-smi', '--showmeminfo'],
+        capture_output=True, text=True, check=True
+    )
+
+@patch('subprocess.run')
+def test_detect_gpu_wsl_nvidia(mock_subprocess_run, monkeypatch, tmp_path):
+    """Test detect_gpu finds an NVIDIA GPU under WSL2, which has no NVIDIA proc entry."""
+    monkeypatch.setattr(platform_module.platform, 'system', lambda: 'Linux')
+    monkeypatch.setattr(platform_module, 'NVIDIA_DRIVER_PROC', '/nonexistent/nvidia/version')
+    dxg = tmp_path / "dxg"
+    dxg.touch()
+    monkeypatch.setattr(platform_module, 'WSL_GPU_PATHS', (str(dxg),))
+    mock_subprocess_run.return_value = MagicMock(stdout="4096\n")
+    assert detect_gpu() == (True, 5)
+    assert platform_module._nvidia_usable() is True
+
 @patch('subprocess.run', side_effect=FileNotFoundError)
 def test_detect_gpu_no_nvidia_smi(mock_subprocess_run):
     """Test detect_gpu when nvidia-smi is not found."""
@@ -125,6 +264,24 @@ def test_detect_gpu_no_nvidia_smi(mock_subprocess_run):
     assert has_gpu is False
     assert suggested_layers is None
 
+@patch('subprocess.run', side_effect=subprocess.TimeoutExpired(['nvidia-smi', '-L'], 1.0))
+def test_detect_gpu_nvidia_smi_hangs(mock_subprocess_run):
+    """Test detect_gpu gives up on an nvidia-smi that hangs without querying memory."""
+    has_gpu, suggested_layers = detect_gpu()
+    assert has_gpu is False
+    assert suggested_layers is None
+    queried = [c.args[0] for c in mock_subprocess_run.call_args_list]
+    assert ['nvidia-smi', '-L'] in queried
+    assert not any('--query-gpu=memory.total' in cmd for cmd in queried)
+
+@patch('subprocess.run')
+def test_nvidia_usable_timeout_not_cached(mock_subprocess_run):
+    """Test a stalled nvidia-smi reports unusable without caching that answer."""
+    mock_subprocess_run.side_effect = [subprocess.TimeoutExpired(['nvidia-smi', '-L'], 10.0), MagicMock()]
+    assert platform_module._nvidia_usable() is False
+    assert platform_module._nvidia_usable() is True
+    assert mock_subprocess_run.call_args.kwargs['timeout'] == platform_module.NVIDIA_SMI_TIMEOUT
+
 @patch('subprocess.run', side_effect=subprocess.CalledProcessError(1, 'cmd'))
 def test_detect_gpu_nvidia_error(mock_subprocess_run):
     """Test detect_gpu when nvidia-smi returns an error."""
@@ -161,20 +318,12 @@ def test_detect_gpu_no_amd_smi(mock_subprocess_run):
     assert has_gpu is False
     assert suggested_layers is None
 
-@patch('platform.system')
-def test_get_llama_server_bin_name_windows(mock_system):
-    """Test get_llama_server_bin_name on Windows."""
-    mock_system.return_value = "Windows"
-    assert get_llama_server_bin_name() == "llama-server.exe"
-
-@patch('platform.system')
-def test_get_llama_server_bin_name_linux(mock_system):
-    """Test get_llama_server_bin_name on Linux."""
-    mock_system.return_value = "Linux"
-    assert get_llama_server_bin_name() == "llama-server"
-
-@patch('platform.system')
-def test_get_llama_server_bin_name_macos(mock_system):
-    """Test get_llama_server_bin_name on macOS."""
-    mock_system.return_value = "Darwin"
-    assert get_llama_server_bin_name() == "llama-server"
+@pytest.mark.parametrize("system, expected", [
+    ("Windows", "llama-server.exe"),
+    ("Linux", "llama-server"),
+    ("Darwin", "llama-server"),
+])
+def test_get_llama_server_bin_name(mock_platform, system, expected):
+    """Test get_llama_server_bin_name on each supported OS."""
+    mock_platform['system'].return_value = system
+    assert get_llama_server_bin_name() == expected
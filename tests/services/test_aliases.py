@@ -1,7 +1,9 @@
 """Tests for aliases service functionality"""
 import pytest
+import requests
 from unittest.mock import patch, MagicMock
-from llamate.services.aliases import fetch_remote_aliases, get_model_aliases, CACHE_TTL
+import llamate.services.aliases as aliases_module
+from llamate.services.aliases import fetch_remote_aliases, get_model_aliases, CACHE_TTL, CACHE_TTL_NS
 from llamate.utils.exceptions import ResourceError
 import time
 
@@ -14,12 +16,24 @@ gemma3:4b:
     ctx-size: "8192"
 """
 
+@pytest.fixture(autouse=True)
+def fresh_alias_cache():
+    """Start each test with an empty in-memory alias cache, and leave it empty afterwards.
+
+    _last_fetch may end up on a mocked clock, so a leftover cache could look fresh to later tests.
+    """
+    aliases_module._aliases_cache = None
+    aliases_module._last_fetch = 0
+    yield
+    aliases_module._aliases_cache = None
+    aliases_module._last_fetch = 0
+
 def test_fetch_remote_aliases_success():
     """Test successful YAML parsing of remote aliases"""
-    with patch('llamate.services.aliases.requests.get') as mock_get:
-        mock_response = MagicMock()
+    with patch('llamate.services.aliases._session') as mock_session:
+        mock_response = MagicMock(spec=requests.Response)
         mock_response.text = SAMPLE_YAML
-        mock_get.return_value = mock_response
+        mock_session.return_value.get.return_value = mock_response
         
         aliases = fetch_remote_aliases()
         assert aliases == {
@@ -34,46 +48,76 @@ def test_fetch_remote_aliases_success():
 
 def test_fetch_remote_aliases_failure():
     """Test fallback on network error"""
-    with patch('llamate.services.aliases.requests.get') as mock_get:
-        mock_get.side_effect = Exception("Network error")
+    with patch('llamate.services.aliases._session') as mock_session:
+        mock_session.return_value.get.side_effect = Exception("Network error")
         
         with pytest.raises(ResourceError):
             fetch_remote_aliases()
 
-def test_get_model_aliases_caching():
+def test_get_model_aliases_caching(llamate_home):
     """Test caching mechanism works as expected"""
     with patch('llamate.services.aliases.fetch_remote_aliases') as mock_fetch, \
          patch('llamate.services.aliases.time') as mock_time:
         
-        # Reset cache before test
-        import llamate.services.aliases as aliases_module
-        aliases_module._aliases_cache = None
-        aliases_module._last_fetch = 0
-        
-        mock_fetch.return_value = {"test": "value"}
+        entry = {"hf_repo": "r", "hf_file": "f.gguf", "args": {}}
+        mock_fetch.return_value = {"test": entry}
+        mock_time.monotonic_ns.return_value = 1_000_000_000_000
         mock_time.time.return_value = 1000.0
         
         # First call should fetch
         aliases = get_model_aliases()
-        assert aliases == {"test": "value"}
+        assert aliases == {"test": entry}
         assert mock_fetch.call_count == 1
         
         # Second call within TTL should use cache
         aliases = get_model_aliases()
-        assert aliases == {"test": "value"}
+        assert aliases == {"test": entry}
         assert mock_fetch.call_count == 1
         
         # After TTL expiration, should fetch again
+        mock_time.monotonic_ns.return_value = 1_000_000_000_000 + CACHE_TTL_NS + 1
         mock_time.time.return_value = 1000.0 + CACHE_TTL + 1
         aliases = get_model_aliases()
         assert mock_fetch.call_count == 2
 
+def test_get_model_aliases_disk_cache(llamate_home):
+    """Test a fresh process reuses aliases cached on disk by an earlier one"""
+    entry = {"hf_repo": "r", "hf_file": "f.gguf", "args": {}}
+    with patch('llamate.services.aliases.fetch_remote_aliases', return_value={"test": entry}) as mock_fetch:
+        assert get_model_aliases() == {"test": entry}
+        assert (llamate_home / "cache" / "model_aliases.json").exists()
+
+        # Simulate a new CLI invocation: the in-memory cache is empty again
+        aliases_module._aliases_cache = None
+        assert get_model_aliases() == {"test": entry}
+        assert mock_fetch.call_count == 1
+
+def test_get_model_aliases_validates_entries(llamate_home, capsys):
+    """Test malformed alias entries are dropped and arg values stringified once"""
+    raw = {
+        "good": {"hf_repo": "r", "hf_file": "f.gguf",
+                 "args": {"ctx-size": 8192, "flash-attn": True, "mmap": False}},
+        "null_args": {"hf_repo": "r", "hf_file": "n.gguf", "args": None},
+        "no_file": {"hf_repo": "r"},
+        "not_gguf": {"hf_repo": "r", "hf_file": "f.bin"},
+    }
+    with patch('llamate.services.aliases.fetch_remote_aliases', return_value=raw):
+        aliases = get_model_aliases()
+
+    assert dict(aliases) == {
+        "good": {"hf_repo": "r", "hf_file": "f.gguf",
+                 "args": {"ctx-size": "8192", "flash-attn": "true", "mmap": "false"}},
+        "null_args": {"hf_repo": "r", "hf_file": "n.gguf", "args": {}},
+    }
+    err = capsys.readouterr().err
+    assert "no_file" in err and "not_gguf" in err
+
 def test_invalid_yaml_handling():
     """Test invalid YAML handling"""
-    with patch('llamate.services.aliases.requests.get') as mock_get:
-        mock_response = MagicMock()
+    with patch('llamate.services.aliases._session') as mock_session:
+        mock_response = MagicMock(spec=requests.Response)
         mock_response.text = "invalid: yaml: here"
-        mock_get.return_value = mock_response
+        mock_session.return_value.get.return_value = mock_response
         
         with pytest.raises(ResourceError):
             fetch_remote_aliases()
\ No newline at end of file
@@ -3,6 +3,8 @@ import pytest
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 import subprocess
+import os
+import shutil
 
 from llamate.services import llama_server
 from llamate.core import config
@@ -109,6 +111,16 @@ def test_build_command_with_passthrough_args(mock_config):
         "--verbose"
     ]
 
+def test_build_command_rereads_changed_config(llamate_home):
+    """Test the server path is refreshed when the global config changes."""
+    model_config = {"hf_repo": "test/repo", "hf_file": "model.gguf", "args": {}}
+
+    config.save_global_config({"llama_server_path": "/first/llama-server"})
+    assert llama_server.build_command(Path("m.gguf"), model_config)[0] == "/first/llama-server"
+
+    config.save_global_config({"llama_server_path": "/second/path/to/llama-server"})
+    assert llama_server.build_command(Path("m.gguf"), model_config)[0] == "/second/path/to/llama-server"
+
 def test_build_command_no_server_path():
     """Test building command when server path is not set."""
     with patch('llamate.core.config.load_global_config', return_value={}):
@@ -121,7 +133,7 @@ def test_build_command_no_server_path():
 def test_run_server_success():
     """Test running server process successfully."""
     cmd = ["/fake/llama-server", "-m", "/path/to/model.gguf"]
-    mock_process = MagicMock()
+    mock_process = MagicMock(spec=subprocess.Popen)
     
     with patch('subprocess.Popen', return_value=mock_process) as mock_popen:
         process = llama_server.run_server(cmd)
@@ -130,10 +142,24 @@ def test_run_server_success():
             cmd,
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
+            close_fds=False,
             text=True
         )
         assert process == mock_process
 
+@pytest.mark.skipif(not getattr(subprocess, '_USE_POSIX_SPAWN', False),
+                    reason="subprocess does not use posix_spawn on this platform")
+def test_run_server_uses_posix_spawn(monkeypatch):
+    """Test the server is started through os.posix_spawn rather than fork+exec."""
+    real_spawn = os.posix_spawn
+    spawn = MagicMock(side_effect=real_spawn)
+    monkeypatch.setattr(os, 'posix_spawn', spawn)
+
+    process = llama_server.run_server([shutil.which("true")])
+    process.wait()
+
+    spawn.assert_called_once()
+
 def test_run_server_failure():
     """Test running server process when it fails to start."""
     cmd = ["/fake/llama-server", "-m", "/path/to/model.gguf"]
@@ -1,16 +1,23 @@
 """Tests for llama swap integration functionality."""
+import io
 import pytest
 from pathlib import Path
-from unittest.mock import patch, MagicMock, mock_open
+from types import MappingProxyType
+from unittest.mock import patch, mock_open
 import json
 import yaml
 import urllib.request
-import shutil
 
 from llamate.services import llama_swap
 from llamate.core import config
 from llamate.core.download import download_binary, extract_binary
 
+# libyaml's C loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
 @pytest.fixture
 def mock_platform_info():
     with patch('llamate.core.platform.get_platform_info') as mock_get_platform:
@@ -22,43 +29,53 @@ def mock_download():
     with patch('llamate.core.download.download_file') as mock_download_file:
         yield mock_download_file
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_github_response():
-    mock_response = {
-        "assets": [
-            {
+    """Read-only release listing, so sharing it across the session is safe"""
+    return MappingProxyType({
+        "assets": (
+            MappingProxyType({
                 "name": "llama-swap_linux_amd64.tar.gz",
                 "browser_download_url": "https://example.com/download/llama-swap_linux_amd64.tar.gz"
-            },
-            {
+            }),
+            MappingProxyType({
                 "name": "llama-swap_windows_amd64.zip",
                 "browser_download_url": "https://example.com/download/llama-swap_windows_amd64.zip"
-            }
-        ]
-    }
-    return mock_response
+            }),
+        )
+    })
+
+# Release payloads shared by the download tests, serialized once at import
+_SUCCESS_PAYLOAD = {
+    'assets': [
+        # Updated asset name and download URL to match expected format
+        {'name': 'llama-swap_124-custom_linux_amd64.tar.gz', 'browser_download_url': 'https://example.com/download/llama-swap_124-custom_linux_amd64.tar.gz'},
+        {'name': 'other-asset', 'browser_download_url': 'http://example.com/other-asset'},
+    ]
+}
+_SUCCESS_BYTES = json.dumps(_SUCCESS_PAYLOAD).encode('utf-8')
+_NO_MATCH_PAYLOAD = {
+    'assets': [
+        {'name': 'other-asset', 'browser_download_url': 'http://example.com/other-asset'},
+    ]
+}
+_NO_MATCH_BYTES = json.dumps(_NO_MATCH_PAYLOAD).encode('utf-8')
 
 # Custom mock class to simulate requests.Response
 class MockResponse:
-    def __init__(self, json_data, status_code):
+    __slots__ = ("_json_data", "status_code", "status", "_body")
+
+    def __init__(self, json_data, content, status_code):
         self._json_data = json_data
         self.status_code = status_code
         self.status = status_code
-        self._content = json.dumps(json_data).encode('utf-8')
-        self._read_pos = 0
+        self._body = io.BytesIO(content)
 
     def json(self):
         return self._json_data
 
     def read(self, size=-1):
-        if size == -1:
-            chunk = self._content[self._read_pos:]
-            self._read_pos = len(self._content)
-            return chunk
-        else:
-            chunk = self._content[self._read_pos:self._read_pos + size]
-            self._read_pos += len(chunk)
-            return chunk
+        return self._body.read(size)
 
     def __enter__(self):
         return self
@@ -66,87 +83,83 @@ class MockResponse:
     def __exit__(self, exc_type, exc_val, exc_tb):
         pass
 
-@patch('requests.get')
-def test_download_binary_success(mock_get, tmp_path, mock_platform_info, mock_download, mock_github_response):
-    """Test successful binary download."""
-    # Use custom MockResponse
-    mock_response = MockResponse({
-        'assets': [
-            # Updated asset name and download URL to match expected format
-            {'name': 'llama-swap_124-custom_linux_amd64.tar.gz', 'browser_download_url': 'https://example.com/download/llama-swap_124-custom_linux_amd64.tar.gz'},
-            {'name': 'other-asset', 'browser_download_url': 'http://example.com/other-asset'},
-        ]
-    }, 200)
-    print(f"Mock response for success test: {mock_response.__dict__}") # Debug print
-    mock_get.return_value = mock_response
-
-    with patch('urllib.request.urlopen', return_value=mock_get.return_value):
-        dest_file, _ = download_binary(tmp_path, "https://api.example.com/releases/latest")
-
-    assert dest_file == tmp_path / "llama-swap_124-custom_linux_amd64.tar.gz"
+@pytest.fixture
+def mock_urlopen():
+    """Patch the GitHub API call download_binary makes through urllib."""
+    with patch.object(urllib.request, 'urlopen') as mock_open_url:
+        yield mock_open_url
+
+@pytest.mark.parametrize("payload, content, expected_name, error_match", [
+    (_SUCCESS_PAYLOAD, _SUCCESS_BYTES, "llama-swap_124-custom_linux_amd64.tar.gz", None),
+    (_NO_MATCH_PAYLOAD, _NO_MATCH_BYTES, None, r"No asset found for 'llama-swap'"),
+], ids=["success", "no_matching_asset"])
+def test_download_binary(mock_urlopen, tmp_path, mock_platform_info, mock_download,
+                         payload, content, expected_name, error_match):
+    """Test binary download picks the matching release asset, or fails when there is none."""
+    mock_urlopen.return_value = MockResponse(payload, content, 200)
+
+    if error_match:
+        with pytest.raises(RuntimeError, match=error_match):
+            download_binary(tmp_path, "https://api.example.com/releases/latest")
+        mock_download.assert_not_called()
+        return
+
+    dest_file, _ = download_binary(tmp_path, "https://api.example.com/releases/latest")
+
+    assert dest_file == tmp_path / expected_name
     mock_download.assert_called_once_with(
-        "https://example.com/download/llama-swap_124-custom_linux_amd64.tar.gz",
+        f"https://example.com/download/{expected_name}",
         dest_file,
         timeout=60,
         max_size=500*1024*1024
     )
 
-
-@patch('requests.get')
-def test_download_binary_no_matching_asset(mock_get, tmp_path, mock_platform_info, mock_download):
-    """Test binary download when no matching asset is found."""
-    # Use custom MockResponse
-    mock_response = MockResponse({
-        'assets': [
-            {'name': 'other-asset', 'browser_download_url': 'http://example.com/other-asset'},
-        ]
-    }, 200)
-    print(f"Mock response for no matching asset test: {mock_response.__dict__}") # Debug print
-    mock_get.return_value = mock_response
-
-    with patch('urllib.request.urlopen', return_value=mock_get.return_value):
-        with pytest.raises(RuntimeError, match=r"No asset found for 'llama-swap'"):
-            download_binary(tmp_path, "https://api.example.com/releases/latest")
-
-def test_download_binary_github_api_error(tmp_path, mock_platform_info, mock_download):
+def test_download_binary_github_api_error(mock_urlopen, tmp_path, mock_platform_info, mock_download):
     """Test binary download when GitHub API request fails."""
-    with patch('urllib.request.urlopen', side_effect=urllib.error.URLError("API error")):
-        with pytest.raises(RuntimeError, match=r"Failed to get release info \(Network error\): .*API error"):
-            download_binary(tmp_path, "https://api.example.com/releases/latest")
+    mock_urlopen.side_effect = urllib.error.URLError("API error")
+    with pytest.raises(RuntimeError, match=r"Failed to get release info \(Network error\): .*API error"):
+        download_binary(tmp_path, "https://api.example.com/releases/latest")
 
-def test_extract_binary_zip(tmp_path):
+def test_extract_binary_zip():
     """Test extracting binary from zip archive."""
-    archive = tmp_path / "test.zip"
-    dest_dir = tmp_path / "dest"
-    dest_dir.mkdir()
-    bin_dir = dest_dir / "bin"
-    bin_dir.mkdir()
+    # The archive modules are mocked, so neither path is ever touched
+    archive = Path("/nonexistent/test.zip")
+    dest_dir = Path("/nonexistent/dest")
 
-    # Create test zip file
     with patch('zipfile.ZipFile') as mock_zip:
         extract_binary(archive, dest_dir)
         mock_zip.assert_called_once_with(archive, 'r')
         mock_zip.return_value.__enter__.return_value.extractall.assert_called_once_with(dest_dir)
 
-def test_extract_binary_targz(tmp_path):
+def test_extract_binary_targz():
     """Test extracting binary from tar.gz archive."""
-    archive = tmp_path / "test.tar.gz"
-    dest_dir = tmp_path / "dest"
-    dest_dir.mkdir()
-    bin_dir = dest_dir / "bin"
-    bin_dir.mkdir()
+    # The archive modules are mocked, so neither path is ever touched
+    archive = Path("/nonexistent/test.tar.gz")
+    dest_dir = Path("/nonexistent/dest")
 
-    # Create test tar.gz file
     with patch('tarfile.open') as mock_tar:
         extract_binary(archive, dest_dir)
         mock_tar.assert_called_once_with(archive, 'r:gz')
         mock_tar.return_value.__enter__.return_value.extractall.assert_called_once_with(dest_dir)
 
+@pytest.fixture(scope="module")
+def swap_paths(tmp_path_factory):
+    """Point the models dir and config files at a temp dir, patched once per module."""
+    tmp_path = tmp_path_factory.mktemp("llama_swap")
+    models_dir = tmp_path / "models"
+    models_dir.mkdir()
+    config_file = tmp_path / "config.yaml"
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(config.constants, 'MODELS_DIR', models_dir)
+        mp.setattr(config.constants, 'LLAMATE_CONFIG_FILE', config_file)
+        mp.setattr(config.constants, 'LLAMA_SWAP_CONFIG_FILE', config_file)
+        yield tmp_path
+
 @patch('llamate.services.llama_swap.load_config')
-def test_save_llama_swap_config(mock_load_config, tmp_path):
+def test_save_llama_swap_config(mock_load_config, swap_paths, std_global_config):
     """Test saving llama-swap configuration file."""
+    tmp_path = swap_paths
     models_dir = tmp_path / "models"
-    models_dir.mkdir()
     config_file = tmp_path / "config.yaml"
 
     # Create a mock model config file for the test to find
@@ -163,50 +176,35 @@ def test_save_llama_swap_config(mock_load_config, tmp_path):
         }
     }
 
-    mock_global_config = {
-        "llama_server_path": "/path/to/llama-server",
-        "ggufs_storage_path": str(tmp_path / "ggufs"),
-        "healthCheckTimeout": 30
-    }
-
     # Explicitly set the return value of the mocked load_llama_swap_config
     mock_load_config.return_value = {
         'healthCheckTimeout': 30,
         'models': {}
     }
 
-    with patch('llamate.core.config.constants.MODELS_DIR', models_dir), \
-         patch('llamate.core.config.constants.LLAMATE_CONFIG_FILE', config_file), \
-         patch('llamate.services.llama_swap.config.constants.LLAMA_SWAP_CONFIG_FILE', tmp_path / "config.yaml"), \
-         patch('llamate.core.config.load_model_config', side_effect=lambda name: mock_model_config[name]), \
-         patch('llamate.core.config.load_global_config', return_value=mock_global_config):
+    # Capture the YAML in memory instead of writing it to disk and reading it back
+    sink = mock_open()
+    with patch('llamate.core.config.load_model_config', side_effect=lambda name: mock_model_config[name]), \
+         patch('llamate.core.config.load_global_config', return_value=std_global_config), \
+         patch('llamate.services.llama_swap.open', sink, create=True):
 
         # Call the actual save_llama_swap_config function
         llama_swap.save_llama_swap_config()
 
-        # Assert that the config file exists
-        assert (tmp_path / "config.yaml").exists()
-        with open(config_file) as f:
-            saved_config = yaml.safe_load(f)
+    sink.assert_called_once_with(config_file, 'w')
+    written = "".join(c.args[0] for c in sink.return_value.write.call_args_list)
+    saved_config = yaml.load(written, Loader=_Loader)
 
-        # Assert the content of the saved config
-        assert "models" in saved_config
-        assert "test_model" in saved_config["models"]
-        assert "healthCheckTimeout" in saved_config
-        assert saved_config["healthCheckTimeout"] == 30
+    # Assert the content of the saved config
+    assert "models" in saved_config
+    assert "test_model" in saved_config["models"]
+    assert "healthCheckTimeout" in saved_config
+    assert saved_config["healthCheckTimeout"] == 30
 
     # Removed assertions related to the mocked save_config call
 
-def test_generate_config():
+def test_generate_config(std_global_config):
     """Test generating llama-swap configuration."""
-    mock_global_config = {
-        "llama_server_path": "/path/to/llama-server",
-        "ggufs_storage_path": "/path/to/ggufs",
-        "healthCheckTimeout": 30,
-        "logLevel": "debug",
-        "groups": {"group1": ["model1"]}
-    }
-
     model_configs = {
         "model1": {
             "hf_repo": "repo1",
@@ -219,7 +217,7 @@ def test_generate_config():
         }
     }
 
-    with patch('llamate.core.config.load_global_config', return_value=mock_global_config):
+    with patch('llamate.core.config.load_global_config', return_value=std_global_config):
         config = llama_swap.generate_config(model_configs)
 
         assert "models" in config
@@ -236,14 +234,9 @@ def test_generate_config():
         assert "proxy" not in model1_cmd  # Should be in model config, not command
         assert config["models"]["model1"]["proxy"] == "http://localhost:8000"
 
-def test_generate_config_no_models():
+def test_generate_config_no_models(std_global_config):
     """Test generating config with no models."""
-    mock_global_config = {
-        "llama_server_path": "/path/to/llama-server",
-        "ggufs_storage_path": "/path/to/ggufs"
-    }
-
-    with patch('llamate.core.config.load_global_config', return_value=mock_global_config):
+    with patch('llamate.core.config.load_global_config', return_value=std_global_config):
         config = llama_swap.generate_config({})
         
         assert "models" not in config  # No models section when no models configured
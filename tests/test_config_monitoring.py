@@ -1,58 +1,142 @@
 import os
 import platform
+import signal
 import shutil
 import subprocess
+import sys
 import tempfile
+import threading
 import time
 import unittest
 from pathlib import Path
 
-# Don't import yaml here as we want to ensure the test doesn't depend on it
-
-
+from tests._wait import wait_for_path
 
-class TestConfigMonitoring(unittest.TestCase):
-    def setUp(self):
-        # Create a temporary directory for test
-        self.test_dir = Path(tempfile.mkdtemp())
-        self.config_dir = self.test_dir / ".config" / "llamate"
-        self.config_dir.mkdir(parents=True, exist_ok=True)
+# Don't import yaml here as we want to ensure the test doesn't depend on it
 
-        # Track the original environment
-        self.original_env = os.environ.copy()
+# Run serve with the interpreter running the tests, through the package entry point
+SERVE_CMD = [sys.executable, "-m", "llamate", "serve"]
 
-        # Create a marker file to detect changes
-        self.change_marker = self.test_dir / "change_detected"
+# Starting llama-swap and model configs written into every test's tree
+CONFIG_YAML = b"""
+models:
+  test-model:
+    cmd: echo "Test model running"
+groups: {}
+"""
+MODEL_YAML = b"""
+hf_repo: test/repo
+hf_file: test.gguf
+args:
+  ctx-size: "4096"
+  temp: "0.7"
+"""
 
-        # Create models directory
-        self.models_dir = self.config_dir / "models"
-        self.models_dir.mkdir(exist_ok=True)
+# Configs the tests write while serve is running
+CHANGED_CONFIG_YAML = b"""
+models:
+  test-model:
+    cmd: echo "Test model running"
+  new-model:
+    cmd: echo "New model added"
+groups: {}
+"""
+CHANGED_MODEL_YAML = b"""
+hf_repo: test/repo
+hf_file: test.gguf
+args:
+  ctx-size: "8192"  # Changed from 4096 to 8192
+  temp: "0.7"
+  n-gpu-layers: "32"  # Added a new argument
+"""
+NEW_MODEL_YAML = b"""
+hf_repo: new/repo
+hf_file: new.gguf
+args:
+  ctx-size: "4096"
+  temp: "0.8"
+"""
+DELETED_MODEL_YAML = b"""
+hf_repo: delete/repo
+hf_file: delete.gguf
+args:
+  ctx-size: "4096"
+  temp: "0.7"
+"""
+
+# On POSIX, serve and the llama-swap it starts share a fresh session, so one
+# killpg stops both
+if os.name == 'posix':
+    SERVE_POPEN_KWARGS = {"start_new_session": True}
+else:
+    SERVE_POPEN_KWARGS = {}
+
+
+def _terminate_group(process):
+    """SIGTERM the process's whole group on POSIX, or terminate just the process elsewhere."""
+    if os.name != 'posix':
+        process.terminate()
+        return
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        pass  # The group is already gone
+
+
+def _kill_group(process):
+    """SIGKILL the process's whole group on POSIX, or kill just the process elsewhere."""
+    if os.name != 'posix':
+        process.kill()
+        return
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def _test_tmpdir():
+    """Pick where test trees go: $LLAMATE_TEST_TMPDIR, else tmpfs when it can run the stub, else the default."""
+    override = os.environ.get("LLAMATE_TEST_TMPDIR")
+    if override:
+        return override
+    try:
+        # The llama-swap stub is executed from the tree, so a noexec mount won't do
+        if not os.statvfs("/dev/shm").f_flag & os.ST_NOEXEC:
+            return "/dev/shm"
+    except (AttributeError, OSError):
+        pass
+    return None
 
-        # Create bin directory and dummy llama-swap executable
-        self.bin_dir = self.config_dir / "bin"
-        self.bin_dir.mkdir(exist_ok=True)
-        self.llama_swap_path = self.bin_dir / "llama-swap"
 
-        # Create a platform-appropriate script that touches our marker file
-        # and then runs forever until terminated
+class TestConfigMonitoring(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Files that are identical for every test are generated once per class
+        cls.class_dir = Path(tempfile.mkdtemp(dir=_test_tmpdir()))
+        cls._removers = []
+        cls.shared_bin_dir = cls.class_dir / "bin"
+        cls.shared_bin_dir.mkdir()
+
+        # Create a platform-appropriate script that touches a marker file in the
+        # test's home directory and then runs forever until terminated
         if platform.system() == 'Windows':
             # Create a batch script for Windows
-            self.llama_swap_path = self.bin_dir / "llama-swap.bat"
-            with open(self.llama_swap_path, 'w') as f:
-                f.write(f"""@echo off
+            cls.shared_llama_swap = cls.shared_bin_dir / "llama-swap.bat"
+            with open(cls.shared_llama_swap, 'w') as f:
+                f.write("""@echo off
 echo Starting llama-swap with args: %*
 echo PID: %PID%
 echo Config file: %2
 
 rem Touch the marker file to indicate we started
-echo. > {self.change_marker}
-echo [%date% %time%] Process started with args: %* >> {self.test_dir}/llama_swap_log.txt
+echo. > "%USERPROFILE%\\change_detected"
+echo [%date% %time%] Process started with args: %* >> "%USERPROFILE%\\llama_swap_log.txt"
 
 rem Check if the marker file was successfully created
-if exist {self.change_marker} (
-    echo [%date% %time%] Marker file created successfully >> {self.test_dir}/llama_swap_log.txt
+if exist "%USERPROFILE%\\change_detected" (
+    echo [%date% %time%] Marker file created successfully >> "%USERPROFILE%\\llama_swap_log.txt"
 ) else (
-    echo [%date% %time%] Failed to create marker file >> {self.test_dir}/llama_swap_log.txt
+    echo [%date% %time%] Failed to create marker file >> "%USERPROFILE%\\llama_swap_log.txt"
 )
 
 rem Stay running until terminated
@@ -61,62 +145,84 @@ timeout /t 1 >nul
 goto loop
 """)
         else:
-            # Create a shell script for Unix-like systems
-            with open(self.llama_swap_path, 'w') as f:
-                f.write(f"""#!/bin/sh
-        echo "Starting llama-swap with args: $@"
-        echo "PID: $$"
-        echo "Config file: $2"
-
-        # Touch the marker file to indicate we started
-        touch {self.change_marker}
-        echo "[$(date)] Process started with PID: $$ and args: $@" >> {self.test_dir}/llama_swap_log.txt
-
-        # Check if the marker file was successfully created
-        if [ -f {self.change_marker} ]; then
-            echo "[$(date)] Marker file created successfully" >> {self.test_dir}/llama_swap_log.txt
-        else
-            echo "[$(date)] Failed to create marker file" >> {self.test_dir}/llama_swap_log.txt
-        fi
-
-        # Stay running until terminated
-        while true; do
-            sleep 1
-        done
-        """)
-            os.chmod(self.llama_swap_path, 0o755)
-
-        # Create a basic config file
-        self.config_file = self.config_dir / "config.yaml"
-        with open(self.config_file, 'w') as f:
-            f.write("""
-models:
-  test-model:
-    cmd: echo "Test model running"
-groups: {}
+            # A Python stub for Unix-like systems; it sleeps in signal.pause() rather
+            # than waking every second, and dies on the first SIGTERM
+            cls.shared_llama_swap = cls.shared_bin_dir / "llama-swap"
+            with open(cls.shared_llama_swap, 'w') as f:
+                f.write(f"""#!{sys.executable} -S
+import os, signal, sys, time
+
+print("Starting llama-swap with args:", *sys.argv[1:])
+print("PID:", os.getpid())
+print("Config file:", sys.argv[2] if len(sys.argv) > 2 else "")
+
+# Touch the marker file to indicate we started
+marker = os.path.join(os.environ["HOME"], "change_detected")
+open(marker, "w").close()
+with open(os.path.join(os.environ["HOME"], "llama_swap_log.txt"), "a") as log:
+    log.write(f"[{{time.ctime()}}] Process started with PID: {{os.getpid()}} and args: {{sys.argv[1:]}}\\n")
+
+    # Check if the marker file was successfully created
+    if os.path.exists(marker):
+        log.write(f"[{{time.ctime()}}] Marker file created successfully\\n")
+    else:
+        log.write(f"[{{time.ctime()}}] Failed to create marker file\\n")
+
+# Stay running until terminated
+signal.pause()
 """)
+            os.chmod(cls.shared_llama_swap, 0o755)
 
-        # Create a llamate config file with platform-appropriate paths
-        llama_server_path = self.bin_dir / "llama-server"
+        # Create llamate config contents with platform-appropriate paths
+        llama_server_path = cls.shared_bin_dir / "llama-server"
         if platform.system() == 'Windows':
-            llama_server_path = self.bin_dir / "llama-server.exe"
-
-        with open(self.config_dir / "llamate.yaml", 'w') as f:
-            f.write(f"""
+            llama_server_path = cls.shared_bin_dir / "llama-server.exe"
+        cls.llamate_yaml = f"""
 llama_server_path: {llama_server_path}
-ggufs_storage_path: {self.test_dir}/ggufs
-""")
+ggufs_storage_path: {cls.class_dir}/ggufs
+""".encode()
+
+    @classmethod
+    def tearDownClass(cls):
+        for remover in cls._removers:
+            remover.join()
+        shutil.rmtree(cls.class_dir)
+
+    def setUp(self):
+        # Create a directory for this test, used as its home directory
+        self.test_dir = self.class_dir / self.id()
+        self.config_dir = self.test_dir / ".config" / "llamate"
+        self.config_dir.mkdir(parents=True, exist_ok=True)
+
+        # Track the original environment
+        self.original_env = os.environ.copy()
+
+        # The llama-swap stub touches this marker file in $HOME when it starts
+        self.change_marker = self.test_dir / "change_detected"
+
+        # Create models directory
+        self.models_dir = self.config_dir / "models"
+        self.models_dir.mkdir(exist_ok=True)
+
+        # Install the shared llama-swap stub; a hard link shares its contents and mode
+        self.bin_dir = self.config_dir / "bin"
+        self.bin_dir.mkdir(exist_ok=True)
+        self.llama_swap_path = self.bin_dir / self.shared_llama_swap.name
+        try:
+            os.link(self.shared_llama_swap, self.llama_swap_path)
+        except OSError:
+            shutil.copy2(self.shared_llama_swap, self.llama_swap_path)
 
-        # Create a model config file
+        # Write the starting config files, already encoded
+        self.config_file = self.config_dir / "config.yaml"
         self.model_config_file = self.models_dir / "test-model.yaml"
-        with open(self.model_config_file, 'w') as f:
-            f.write("""
-hf_repo: test/repo
-hf_file: test.gguf
-args:
-  ctx-size: "4096"
-  temp: "0.7"
-""")
+        files = {
+            self.config_file: CONFIG_YAML,
+            self.config_dir / "llamate.yaml": self.llamate_yaml,
+            self.model_config_file: MODEL_YAML,
+        }
+        for path, contents in files.items():
+            path.write_bytes(contents)
 
         # Environment setup - handle both Windows and Unix-like systems
         self.original_home = os.environ.get('HOME')
@@ -140,8 +246,19 @@ args:
             if self.original_home:
                 os.environ['HOME'] = self.original_home
 
-        # Clean up temporary directory
-        shutil.rmtree(self.test_dir)
+        # Remove this test's tree in the background; tearDownClass waits for it
+        remover = threading.Thread(
+            target=shutil.rmtree, args=(self.test_dir,), kwargs={"ignore_errors": True}, daemon=True
+        )
+        remover.start()
+        self._removers.append(remover)
+
+    def _print_stub_log(self):
+        """Print the llama-swap stub's log; tests call this only when they fail."""
+        log_file = self.test_dir / "llama_swap_log.txt"
+        if log_file.exists():
+            print("llama-swap log file contents:")
+            print(log_file.read_text())
 
     def test_config_monitoring(self):
         """Test that the serve command automatically restarts when config changes."""
@@ -171,144 +288,74 @@ args:
 
         # Start the server process
         process = subprocess.Popen(
-            ["python", "-m", "llamate.cli.cli", "serve"],
+            SERVE_CMD,
             env=env,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            universal_newlines=True
+            **SERVE_POPEN_KWARGS
         )
 
         try:
             # Give it time to start
-            start_time = time.time()
-            while time.time() - start_time < 10:
-                if self.change_marker.exists():
-                    break
-                time.sleep(0.5)
+            wait_for_path(self.change_marker, 10)
 
             # Verify the marker file was created, indicating the process started
             self.assertTrue(self.change_marker.exists(), "Process should have executed the command")
             print(f"Initial process started successfully at {time.time()}")
 
-            # Check for any log file content
-            log_file = self.test_dir / "llama_swap_log.txt"
-            if log_file.exists():
-                print("Initial log file contents:")
-                with open(log_file, 'r') as f:
-                    print(f.read())
-
             # Remove the marker file to detect the restart
             os.unlink(self.change_marker)
             print(f"Marker file removed at {time.time()}")
 
             # Modify the config file to trigger a restart
-            with open(self.config_file, 'w') as f:
-                f.write("""
-models:
-  test-model:
-    cmd: echo "Test model running"
-  new-model:
-    cmd: echo "New model added"
-groups: {}
-""")
+            self.config_file.write_bytes(CHANGED_CONFIG_YAML)
             print(f"Config file modified at {time.time()}")
 
             # Create a flag file to indicate the config was changed
             with open(self.test_dir / "config_changed", 'w') as f:
                 f.write(f"Config changed at {time.time()}")
 
-            # Wait for the original process to terminate after config change
-            try:
-                process.wait(timeout=10)
-                print(f"Original process terminated with exit code: {process.returncode}")
-            except subprocess.TimeoutExpired:
-                print("Original process did not terminate within expected time")
-                poll_result = process.poll()
-                print(f"Process poll result: {poll_result}")
-                # Don't terminate it here, we'll handle it in the finally block
-
-            # Start a new serve process to simulate the restart behavior
-            # This mimics what the serve_command function would do after detecting a config change
-            print("Starting a new serve process to simulate restart...")
-            new_process = subprocess.Popen(
-                ["python", "-m", "llamate.cli.cli", "serve"],
-                env=env,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True
-            )
-
-            # Give the new process time to start and create the marker file
+            # serve polls for changes every 5 seconds, then restarts llama-swap in place,
+            # which touches the marker file again
             start_time = time.time()
             timeout = 15
-            restart_detected = False
-
-            while time.time() - start_time < timeout:
-                if self.change_marker.exists():
-                    restart_detected = True
-                    print(f"Restart detected at {time.time()}, {time.time() - start_time} seconds after starting new process")
-                    break
-                time.sleep(0.5)
-
-            if not restart_detected:
+            restart_detected = wait_for_path(self.change_marker, timeout)
+            if restart_detected:
+                print(f"Restart detected at {time.time()}, {time.time() - start_time} seconds after the change")
+            else:
                 print(f"No restart detected after {timeout} seconds")
-                if new_process.poll() is None:
-                    print("New process is running but hasn't created marker file")
+                if process.poll() is None:
+                    print("serve is running but hasn't restarted llama-swap")
                 else:
-                    print(f"New process exited with code {new_process.returncode}")
-
-                # Check log file for diagnostics
-                if log_file.exists():
-                    print("Log file contents:")
-                    with open(log_file, 'r') as f:
-                        print(f.read())
+                    print(f"serve exited with code {process.returncode}")
 
             # Verify the marker file was created again, indicating a restart
             self.assertTrue(self.change_marker.exists(), "Process should have restarted after config change")
 
-            # Clean up the new process
-            if new_process.poll() is None:
-                new_process.terminate()
-                try:
-                    new_process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    new_process.kill()
-                    new_process.wait()
-
+        except Exception:
+            # Dump the stub's log while this test's tree still exists
+            self._print_stub_log()
+            raise
         finally:
             # Clean up - always terminate the process
             if process.poll() is None:
-                process.terminate()
-                try:
-                    process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    process.kill()
-                    process.wait()
-
-            # Ensure original process is terminated
-            if process.poll() is None:
-                print("Original process still running, terminating...")
-                process.terminate()
+                _terminate_group(process)
                 try:
                     process.wait(timeout=5)
                 except subprocess.TimeoutExpired:
-                    print("Process didn't terminate within timeout, killing...")
-                    process.kill()
+                    _kill_group(process)
                     process.wait()
 
             # Capture output for debugging
+            # Pipes are read as bytes and only decoded here, for printing
             stdout, stderr = process.communicate()
+            stdout = stdout.decode("utf-8", "replace")
+            stderr = stderr.decode("utf-8", "replace")
             if stdout:
                 print("Original process stdout:", stdout)
             if stderr:
                 print("Original process stderr:", stderr)
 
-            # Also dump any log file we created
-            log_file = self.test_dir / "llama_swap_log.txt"
-            if log_file.exists():
-                print("Complete log file contents:")
-                with open(log_file, 'r') as f:
-                    print(f.read())
 
     def test_model_config_monitoring(self):
         """Test that the serve command automatically restarts when model config changes."""
@@ -337,20 +384,16 @@ groups: {}
 
         # Start the server process
         process = subprocess.Popen(
-            ["python", "-m", "llamate.cli.cli", "serve"],
+            SERVE_CMD,
             env=env,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            universal_newlines=True
+            **SERVE_POPEN_KWARGS
         )
 
         try:
             # Give it time to start
-            start_time = time.time()
-            while time.time() - start_time < 10:
-                if self.change_marker.exists():
-                    break
-                time.sleep(0.5)
+            wait_for_path(self.change_marker, 10)
 
             # Verify the marker file was created, indicating the process started
             self.assertTrue(self.change_marker.exists(), "Process should have executed the command")
@@ -361,112 +404,54 @@ groups: {}
             print(f"Marker file removed at {time.time()}")
 
             # Modify the model config file to trigger a restart
-            with open(self.model_config_file, 'w') as f:
-                f.write("""
-hf_repo: test/repo
-hf_file: test.gguf
-args:
-  ctx-size: "8192"  # Changed from 4096 to 8192
-  temp: "0.7"
-  n-gpu-layers: "32"  # Added a new argument
-""")
+            self.model_config_file.write_bytes(CHANGED_MODEL_YAML)
             print(f"Model config file modified at {time.time()}")
 
             # Create a flag file to indicate the config was changed
             with open(self.test_dir / "model_config_changed", 'w') as f:
                 f.write(f"Model config changed at {time.time()}")
 
-            # Wait for the original process to terminate after config change
-            try:
-                process.wait(timeout=10)
-                print(f"Original process terminated with exit code: {process.returncode}")
-            except subprocess.TimeoutExpired:
-                print("Original process did not terminate within expected time")
-                poll_result = process.poll()
-                print(f"Process poll result: {poll_result}")
-
-            # Start a new serve process to simulate the restart behavior
-            print("Starting a new serve process to simulate restart...")
-            new_process = subprocess.Popen(
-                ["python", "-m", "llamate.cli.cli", "serve"],
-                env=env,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True
-            )
-
-            # Give the new process time to start and create the marker file
+            # serve polls for changes every 5 seconds, then restarts llama-swap in place,
+            # which touches the marker file again
             start_time = time.time()
             timeout = 15
-            restart_detected = False
-
-            while time.time() - start_time < timeout:
-                if self.change_marker.exists():
-                    restart_detected = True
-                    print(f"Restart detected at {time.time()}, {time.time() - start_time} seconds after starting new process")
-                    break
-                time.sleep(0.5)
-
-            if not restart_detected:
+            restart_detected = wait_for_path(self.change_marker, timeout)
+            if restart_detected:
+                print(f"Restart detected at {time.time()}, {time.time() - start_time} seconds after the change")
+            else:
                 print(f"No restart detected after {timeout} seconds")
-                if new_process.poll() is None:
-                    print("New process is running but hasn't created marker file")
+                if process.poll() is None:
+                    print("serve is running but hasn't restarted llama-swap")
                 else:
-                    print(f"New process exited with code {new_process.returncode}")
-
-                # Check log file for diagnostics
-                log_file = self.test_dir / "llama_swap_log.txt"
-                if log_file.exists():
-                    print("Log file contents:")
-                    with open(log_file, 'r') as f:
-                        print(f.read())
+                    print(f"serve exited with code {process.returncode}")
 
             # Verify the marker file was created again, indicating a restart
             self.assertTrue(self.change_marker.exists(), "Process should have restarted after model config change")
 
-            # Clean up the new process
-            if new_process.poll() is None:
-                new_process.terminate()
-                try:
-                    new_process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    new_process.kill()
-                    new_process.wait()
-
+        except Exception:
+            # Dump the stub's log while this test's tree still exists
+            self._print_stub_log()
+            raise
         finally:
             # Clean up - always terminate the process
             if process.poll() is None:
-                process.terminate()
-                try:
-                    process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    process.kill()
-                    process.wait()
-
-            # Ensure original process is terminated
-            if process.poll() is None:
-                print("Original process still running, terminating...")
-                process.terminate()
+                _terminate_group(process)
                 try:
                     process.wait(timeout=5)
                 except subprocess.TimeoutExpired:
-                    print("Process didn't terminate within timeout, killing...")
-                    process.kill()
+                    _kill_group(process)
                     process.wait()
 
             # Capture output for debugging
+            # Pipes are read as bytes and only decoded here, for printing
             stdout, stderr = process.communicate()
+            stdout = stdout.decode("utf-8", "replace")
+            stderr = stderr.decode("utf-8", "replace")
             if stdout:
                 print("Original process stdout:", stdout)
             if stderr:
                 print("Original process stderr:", stderr)
 
-            # Also dump any log file we created
-            log_file = self.test_dir / "llama_swap_log.txt"
-            if log_file.exists():
-                print("Complete log file contents:")
-                with open(log_file, 'r') as f:
-                    print(f.read())
 
     def test_new_model_file_detection(self):
         """Test that the serve command restarts when a new model file is added."""
@@ -495,20 +480,16 @@ args:
 
         # Start the server process
         process = subprocess.Popen(
-            ["python", "-m", "llamate.cli.cli", "serve"],
+            SERVE_CMD,
             env=env,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            universal_newlines=True
+            **SERVE_POPEN_KWARGS
         )
 
         try:
             # Give it time to start
-            start_time = time.time()
-            while time.time() - start_time < 10:
-                if self.change_marker.exists():
-                    break
-                time.sleep(0.5)
+            wait_for_path(self.change_marker, 10)
 
             # Verify the marker file was created, indicating the process started
             self.assertTrue(self.change_marker.exists(), "Process should have executed the command")
@@ -520,111 +501,54 @@ args:
 
             # Add a new model config file to trigger a restart
             new_model_file = self.models_dir / "new-model.yaml"
-            with open(new_model_file, 'w') as f:
-                f.write("""
-hf_repo: new/repo
-hf_file: new.gguf
-args:
-  ctx-size: "4096"
-  temp: "0.8"
-""")
+            new_model_file.write_bytes(NEW_MODEL_YAML)
             print(f"New model config file created at {time.time()}")
 
             # Create a flag file to indicate the config was changed
             with open(self.test_dir / "new_model_added", 'w') as f:
                 f.write(f"New model file added at {time.time()}")
 
-            # Wait for the original process to terminate after config change
-            try:
-                process.wait(timeout=10)
-                print(f"Original process terminated with exit code: {process.returncode}")
-            except subprocess.TimeoutExpired:
-                print("Original process did not terminate within expected time")
-                poll_result = process.poll()
-                print(f"Process poll result: {poll_result}")
-
-            # Start a new serve process to simulate the restart behavior
-            print("Starting a new serve process to simulate restart...")
-            new_process = subprocess.Popen(
-                ["python", "-m", "llamate.cli.cli", "serve"],
-                env=env,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True
-            )
-
-            # Give the new process time to start and create the marker file
+            # serve polls for changes every 5 seconds, then restarts llama-swap in place,
+            # which touches the marker file again
             start_time = time.time()
             timeout = 15
-            restart_detected = False
-
-            while time.time() - start_time < timeout:
-                if self.change_marker.exists():
-                    restart_detected = True
-                    print(f"Restart detected at {time.time()}, {time.time() - start_time} seconds after starting new process")
-                    break
-                time.sleep(0.5)
-
-            if not restart_detected:
+            restart_detected = wait_for_path(self.change_marker, timeout)
+            if restart_detected:
+                print(f"Restart detected at {time.time()}, {time.time() - start_time} seconds after the change")
+            else:
                 print(f"No restart detected after {timeout} seconds")
-                if new_process.poll() is None:
-                    print("New process is running but hasn't created marker file")
+                if process.poll() is None:
+                    print("serve is running but hasn't restarted llama-swap")
                 else:
-                    print(f"New process exited with code {new_process.returncode}")
-
-                # Check log file for diagnostics
-                log_file = self.test_dir / "llama_swap_log.txt"
-                if log_file.exists():
-                    print("Log file contents:")
-                    with open(log_file, 'r') as f:
-                        print(f.read())
+                    print(f"serve exited with code {process.returncode}")
 
             # Verify the marker file was created again, indicating a restart
             self.assertTrue(self.change_marker.exists(), "Process should have restarted after new model file was added")
 
-            # Clean up the new process
-            if new_process.poll() is None:
-                new_process.terminate()
-                try:
-                    new_process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    new_process.kill()
-                    new_process.wait()
-
+        except Exception:
+            # Dump the stub's log while this test's tree still exists
+            self._print_stub_log()
+            raise
         finally:
             # Clean up - always terminate the process
             if process.poll() is None:
-                process.terminate()
-                try:
-                    process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    process.kill()
-                    process.wait()
-
-            # Ensure original process is terminated
-            if process.poll() is None:
-                print("Original process still running, terminating...")
-                process.terminate()
+                _terminate_group(process)
                 try:
                     process.wait(timeout=5)
                 except subprocess.TimeoutExpired:
-                    print("Process didn't terminate within timeout, killing...")
-                    process.kill()
+                    _kill_group(process)
                     process.wait()
 
             # Capture output for debugging
+            # Pipes are read as bytes and only decoded here, for printing
             stdout, stderr = process.communicate()
+            stdout = stdout.decode("utf-8", "replace")
+            stderr = stderr.decode("utf-8", "replace")
             if stdout:
                 print("Original process stdout:", stdout)
             if stderr:
                 print("Original process stderr:", stderr)
 
-            # Also dump any log file we created
-            log_file = self.test_dir / "llama_swap_log.txt"
-            if log_file.exists():
-                print("Complete log file contents:")
-                with open(log_file, 'r') as f:
-                    print(f.read())
 
     def test_model_file_deletion(self):
         """Test that the serve command restarts when a model file is deleted."""
@@ -653,31 +577,20 @@ args:
 
         # Create a second model file that we'll delete during the test
         model_to_delete = self.models_dir / "model-to-delete.yaml"
-        with open(model_to_delete, 'w') as f:
-            f.write("""
-hf_repo: delete/repo
-hf_file: delete.gguf
-args:
-  ctx-size: "4096"
-  temp: "0.7"
-""")
+        model_to_delete.write_bytes(DELETED_MODEL_YAML)
 
         # Start the server process
         process = subprocess.Popen(
-            ["python", "-m", "llamate.cli.cli", "serve"],
+            SERVE_CMD,
             env=env,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            universal_newlines=True
+            **SERVE_POPEN_KWARGS
         )
 
         try:
             # Give it time to start
-            start_time = time.time()
-            while time.time() - start_time < 10:
-                if self.change_marker.exists():
-                    break
-                time.sleep(0.5)
+            wait_for_path(self.change_marker, 10)
 
             # Verify the marker file was created, indicating the process started
             self.assertTrue(self.change_marker.exists(), "Process should have executed the command")
@@ -695,97 +608,47 @@ args:
             with open(self.test_dir / "model_deleted", 'w') as f:
                 f.write(f"Model file deleted at {time.time()}")
 
-            # Wait for the original process to terminate after config change
-            try:
-                process.wait(timeout=10)
-                print(f"Original process terminated with exit code: {process.returncode}")
-            except subprocess.TimeoutExpired:
-                print("Original process did not terminate within expected time")
-                poll_result = process.poll()
-                print(f"Process poll result: {poll_result}")
-
-            # Start a new serve process to simulate the restart behavior
-            print("Starting a new serve process to simulate restart...")
-            new_process = subprocess.Popen(
-                ["python", "-m", "llamate.cli.cli", "serve"],
-                env=env,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True
-            )
-
-            # Give the new process time to start and create the marker file
+            # serve polls for changes every 5 seconds, then restarts llama-swap in place,
+            # which touches the marker file again
             start_time = time.time()
             timeout = 15
-            restart_detected = False
-
-            while time.time() - start_time < timeout:
-                if self.change_marker.exists():
-                    restart_detected = True
-                    print(f"Restart detected at {time.time()}, {time.time() - start_time} seconds after starting new process")
-                    break
-                time.sleep(0.5)
-
-            if not restart_detected:
+            restart_detected = wait_for_path(self.change_marker, timeout)
+            if restart_detected:
+                print(f"Restart detected at {time.time()}, {time.time() - start_time} seconds after the change")
+            else:
                 print(f"No restart detected after {timeout} seconds")
-                if new_process.poll() is None:
-                    print("New process is running but hasn't created marker file")
+                if process.poll() is None:
+                    print("serve is running but hasn't restarted llama-swap")
                 else:
-                    print(f"New process exited with code {new_process.returncode}")
-
-                # Check log file for diagnostics
-                log_file = self.test_dir / "llama_swap_log.txt"
-                if log_file.exists():
-                    print("Log file contents:")
-                    with open(log_file, 'r') as f:
-                        print(f.read())
+                    print(f"serve exited with code {process.returncode}")
 
             # Verify the marker file was created again, indicating a restart
             self.assertTrue(self.change_marker.exists(), "Process should have restarted after model file was deleted")
 
-            # Clean up the new process
-            if new_process.poll() is None:
-                new_process.terminate()
-                try:
-                    new_process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    new_process.kill()
-                    new_process.wait()
-
+        except Exception:
+            # Dump the stub's log while this test's tree still exists
+            self._print_stub_log()
+            raise
         finally:
             # Clean up - always terminate the process
             if process.poll() is None:
-                process.terminate()
-                try:
-                    process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    process.kill()
-                    process.wait()
-
-            # Ensure original process is terminated
-            if process.poll() is None:
-                print("Original process still running, terminating...")
-                process.terminate()
+                _terminate_group(process)
                 try:
                     process.wait(timeout=5)
                 except subprocess.TimeoutExpired:
-                    print("Process didn't terminate within timeout, killing...")
-                    process.kill()
+                    _kill_group(process)
                     process.wait()
 
             # Capture output for debugging
+            # Pipes are read as bytes and only decoded here, for printing
             stdout, stderr = process.communicate()
+            stdout = stdout.decode("utf-8", "replace")
+            stderr = stderr.decode("utf-8", "replace")
             if stdout:
                 print("Original process stdout:", stdout)
             if stderr:
                 print("Original process stderr:", stderr)
 
-            # Also dump any log file we created
-            log_file = self.test_dir / "llama_swap_log.txt"
-            if log_file.exists():
-                print("Complete log file contents:")
-                with open(log_file, 'r') as f:
-                    print(f.read())
 
 if __name__ == "__main__":
     unittest.main()
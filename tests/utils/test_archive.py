@@ -1,4 +1,6 @@
 """Tests for archive handling utilities."""
+import errno
+import os
 import pytest
 from pathlib import Path
 import zipfile
@@ -8,39 +10,42 @@ import platform
 
 from llamate.utils.archive import extract_archive, get_platform_archive_ext
 
-# Fixture to create dummy archive files
-@pytest.fixture
-def dummy_archives(tmp_path):
+# The archives are only ever read, so they are built once for the session
+@pytest.fixture(scope='session')
+def archive_files(tmp_path_factory):
     # Create a dummy directory structure and files
-    extract_dir = tmp_path / "extracted"
-    extract_dir.mkdir()
-    
+    tmp_path = tmp_path_factory.mktemp('archives')
     data_dir = tmp_path / "data"
     data_dir.mkdir()
     (data_dir / "file1.txt").write_text("content1")
     (data_dir / "subdir").mkdir()
     (data_dir / "subdir" / "file2.txt").write_text("content2")
 
-    # Create a dummy zip file
+    # Create a dummy zip file (stored, as compressing the tiny payload buys nothing)
     zip_path = tmp_path / "test.zip"
-    with zipfile.ZipFile(zip_path, 'w') as zf:
+    with zipfile.ZipFile(zip_path, 'w', compression=zipfile.ZIP_STORED) as zf:
         zf.write(data_dir / "file1.txt", arcname="file1.txt")
         zf.write(data_dir / "subdir" / "file2.txt", arcname="subdir/file2.txt")
 
     # Create a dummy tar.gz file
     tar_gz_path = tmp_path / "test.tar.gz"
-    with tarfile.open(tar_gz_path, 'w:gz') as tf:
+    with tarfile.open(tar_gz_path, 'w:gz', compresslevel=1) as tf:
         tf.add(data_dir / "file1.txt", arcname="file1.txt")
         tf.add(data_dir / "subdir" / "file2.txt", arcname="subdir/file2.txt")
 
-    yield {
-        "tmp_path": tmp_path,
+    return {
         "zip_path": zip_path,
         "tar_gz_path": tar_gz_path,
-        "extract_dir": extract_dir,
         "data_dir": data_dir
     }
 
+# Per-test scratch space and extraction target around the shared archives
+@pytest.fixture
+def dummy_archives(archive_files, tmp_path):
+    extract_dir = tmp_path / "extracted"
+    extract_dir.mkdir()
+    return {**archive_files, "tmp_path": tmp_path, "extract_dir": extract_dir}
+
 def test_extract_archive_zip(dummy_archives):
     """Test extracting a zip archive."""
     archives = dummy_archives
@@ -50,9 +55,37 @@ def test_extract_archive_zip(dummy_archives):
     extracted_file2 = archives["extract_dir"] / "subdir" / "file2.txt"
 
     assert extracted_file1.exists()
-    assert extracted_file1.read_text() == "content1"
+    assert extracted_file1.read_bytes() == b"content1"
     assert extracted_file2.exists()
-    assert extracted_file2.read_text() == "content2"
+    assert extracted_file2.read_bytes() == b"content2"
+
+@pytest.mark.skipif(not hasattr(os, 'copy_file_range'), reason="copy_file_range is Linux-only")
+def test_extract_archive_zip_stored_copy_file_range(dummy_archives):
+    """Test stored zip members are copied in-kernel, falling back to zipfile when that fails."""
+    archives = dummy_archives
+    with patch('llamate.utils.archive.libarchive', None), \
+         patch('os.copy_file_range', wraps=os.copy_file_range) as copy_file_range:
+        extract_archive(archives["zip_path"], archives["extract_dir"] / "fast")
+    assert copy_file_range.call_count == 2
+
+    with patch('llamate.utils.archive.libarchive', None), \
+         patch('os.copy_file_range', side_effect=OSError(errno.EXDEV, "cross-device")):
+        extract_archive(archives["zip_path"], archives["extract_dir"] / "fallback")
+
+    for sub in ("fast", "fallback"):
+        assert (archives["extract_dir"] / sub / "file1.txt").read_bytes() == b"content1"
+        assert (archives["extract_dir"] / sub / "subdir" / "file2.txt").read_bytes() == b"content2"
+
+def test_extract_archive_zip_stored_bad_crc(dummy_archives):
+    """Test a corrupted stored zip member is rejected like zipfile would."""
+    archives = dummy_archives
+    corrupt_zip_path = archives["tmp_path"] / "corrupt.zip"
+    data = archives["zip_path"].read_bytes()
+    corrupt_zip_path.write_bytes(data.replace(b"content1", b"contentX", 1))
+
+    with patch('llamate.utils.archive.libarchive', None), \
+         pytest.raises(zipfile.BadZipFile, match="Bad CRC-32"):
+        extract_archive(corrupt_zip_path, archives["extract_dir"])
 
 def test_extract_archive_tar_gz(dummy_archives):
     """Test extracting a tar.gz archive."""
@@ -63,9 +96,20 @@ def test_extract_archive_tar_gz(dummy_archives):
     extracted_file2 = archives["extract_dir"] / "subdir" / "file2.txt"
 
     assert extracted_file1.exists()
-    assert extracted_file1.read_text() == "content1"
+    assert extracted_file1.read_bytes() == b"content1"
     assert extracted_file2.exists()
-    assert extracted_file2.read_text() == "content2"
+    assert extracted_file2.read_bytes() == b"content2"
+
+def test_extract_archive_without_libarchive(dummy_archives):
+    """Test the zipfile/tarfile fallback used when libarchive isn't installed."""
+    archives = dummy_archives
+    with patch('llamate.utils.archive.libarchive', None):
+        extract_archive(archives["zip_path"], archives["extract_dir"] / "zip")
+        extract_archive(archives["tar_gz_path"], archives["extract_dir"] / "tar")
+
+    for sub in ("zip", "tar"):
+        assert (archives["extract_dir"] / sub / "file1.txt").read_bytes() == b"content1"
+        assert (archives["extract_dir"] / sub / "subdir" / "file2.txt").read_bytes() == b"content2"
 
 def test_extract_archive_unsupported_format(dummy_archives):
     """Test extracting an unsupported archive format."""
@@ -93,17 +137,35 @@ def test_extract_archive_zipslip_vulnerability(dummy_archives):
     with pytest.raises(ValueError, match="Attempted path traversal in archive"):
         extract_archive(zipslip_tar_gz_path, archives["extract_dir"])
 
-def test_get_platform_archive_ext_windows():
+@pytest.fixture
+def fresh_archive_ext():
+    """Make get_platform_archive_ext consult the (mocked) platform afresh."""
+    get_platform_archive_ext.cache_clear()
+    yield
+    get_platform_archive_ext.cache_clear()
+
+def test_get_platform_archive_ext_windows(fresh_archive_ext):
     """Test get_platform_archive_ext on Windows."""
     with patch('platform.system', return_value='Windows'):
         assert get_platform_archive_ext() == '.zip'
 
-def test_get_platform_archive_ext_linux():
+def test_get_platform_archive_ext_linux(fresh_archive_ext):
     """Test get_platform_archive_ext on Linux."""
     with patch('platform.system', return_value='Linux'):
         assert get_platform_archive_ext() == '.tar.gz'
 
-def test_get_platform_archive_ext_macos():
+def test_get_platform_archive_ext_macos(fresh_archive_ext):
     """Test get_platform_archive_ext on macOS."""
     with patch('platform.system', return_value='Darwin'):
         assert get_platform_archive_ext() == '.tar.gz'
+
+def test_extract_archive_zip_path_traversal(dummy_archives):
+    """Test zipslip vulnerability protection for zip."""
+    archives = dummy_archives
+    zipslip_zip_path = archives["tmp_path"] / "zipslip.zip"
+    with zipfile.ZipFile(zipslip_zip_path, 'w') as zf:
+        zf.writestr("../malicious.txt", "")
+
+    with pytest.raises(ValueError, match="Attempted path traversal in archive"):
+        extract_archive(zipslip_zip_path, archives["extract_dir"])
+    assert not (archives["tmp_path"] / "malicious.txt").exists()
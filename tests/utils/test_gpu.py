@@ -5,6 +5,29 @@ import subprocess
 
 from llamate.utils import gpu
 
+# Memory probes cached for the process; cleared so each test sees its own mocks
+CACHED_PROBES = (gpu.get_nvidia_memory, gpu.get_amd_memory)
+
+@pytest.fixture(autouse=True)
+def fresh_gpu_probes(monkeypatch):
+    """Keep the tests on the nvidia-smi path unless they install a fake pynvml, and probe afresh."""
+    monkeypatch.setattr(gpu, 'pynvml', None)
+    for probe in CACHED_PROBES:
+        probe.cache_clear()
+    yield
+    for probe in CACHED_PROBES:
+        probe.cache_clear()
+
+@pytest.fixture
+def mock_pynvml(monkeypatch):
+    """Install a fake pynvml module reporting a 16 GiB device."""
+    nvml = MagicMock()
+    nvml.NVMLError = type("NVMLError", (Exception,), {})
+    nvml.nvmlDeviceGetCount.return_value = 1
+    nvml.nvmlDeviceGetMemoryInfo.return_value = MagicMock(total=16 * 1024**3)
+    monkeypatch.setattr(gpu, 'pynvml', nvml)
+    return nvml
+
 @pytest.fixture
 def mock_subprocess_run():
     with patch('subprocess.run') as mock_run:
@@ -13,18 +36,57 @@ def mock_subprocess_run():
 def test_get_nvidia_memory_success(mock_subprocess_run):
     """Test successful NVIDIA GPU memory detection."""
     # Mock nvidia-smi output showing 16384 MB memory
-    mock_process = MagicMock()
-    mock_process.stdout = "16384\n"
+    mock_process = MagicMock(returncode=0)
+    mock_process.stdout = b"16384\n"
     mock_subprocess_run.return_value = mock_process
 
     memory = gpu.get_nvidia_memory()
 
     mock_subprocess_run.assert_called_once_with(
         ['nvidia-smi', '--query-gpu=memory.total', '--format=csv,noheader,nounits'],
-        capture_output=True, text=True, check=True
+        capture_output=True
     )
     assert memory == 16.0  # 16384 MB = 16 GB
 
+def test_get_nvidia_memory_nvml(mock_subprocess_run, mock_pynvml):
+    """Test NVIDIA GPU memory is read through NVML without spawning nvidia-smi."""
+    memory = gpu.get_nvidia_memory()
+
+    assert memory == 16.0
+    mock_pynvml.nvmlDeviceGetHandleByIndex.assert_called_once_with(0)
+    mock_pynvml.nvmlShutdown.assert_called_once()
+    mock_subprocess_run.assert_not_called()
+
+def test_get_nvidia_memory_nvml_multi_gpu(mock_subprocess_run, mock_pynvml):
+    """Test NVIDIA GPU memory reports the first device on a multi-GPU host."""
+    mock_pynvml.nvmlDeviceGetCount.return_value = 2
+    mock_pynvml.nvmlDeviceGetMemoryInfo.side_effect = [MagicMock(total=16 * 1024**3), MagicMock(total=8 * 1024**3)]
+
+    assert gpu.get_nvidia_memory() == 16.0
+
+def test_get_nvidia_memory_nvml_error_falls_back(mock_subprocess_run, mock_pynvml):
+    """Test NVIDIA GPU memory detection falls back to nvidia-smi when NVML cannot initialize."""
+    mock_pynvml.nvmlInit.side_effect = mock_pynvml.NVMLError()
+    mock_process = MagicMock(returncode=0)
+    mock_process.stdout = b"8192\n"
+    mock_subprocess_run.return_value = mock_process
+
+    memory = gpu.get_nvidia_memory()
+
+    mock_subprocess_run.assert_called_once()
+    assert memory == 8.0
+
+def test_get_nvidia_memory_cached(mock_subprocess_run):
+    """Test nvidia-smi is only run once per process."""
+    mock_process = MagicMock(returncode=0)
+    mock_process.stdout = b"16384\n"
+    mock_subprocess_run.return_value = mock_process
+
+    assert gpu.get_nvidia_memory() == 16.0
+    assert gpu.get_nvidia_memory() == 16.0
+
+    mock_subprocess_run.assert_called_once()
+
 def test_get_nvidia_memory_not_found(mock_subprocess_run):
     """Test NVIDIA GPU memory detection when nvidia-smi is not found."""
     mock_subprocess_run.side_effect = FileNotFoundError()
@@ -43,10 +105,19 @@ def test_get_nvidia_memory_command_error(mock_subprocess_run):
     mock_subprocess_run.assert_called_once()
     assert memory is None
 
+def test_get_nvidia_memory_nonzero_exit(mock_subprocess_run):
+    """Test NVIDIA GPU memory detection when nvidia-smi exits with an error."""
+    mock_subprocess_run.return_value = MagicMock(returncode=9, stdout=b"")
+
+    memory = gpu.get_nvidia_memory()
+
+    mock_subprocess_run.assert_called_once()
+    assert memory is None
+
 def test_get_nvidia_memory_invalid_output(mock_subprocess_run):
     """Test NVIDIA GPU memory detection with invalid output."""
-    mock_process = MagicMock()
-    mock_process.stdout = "invalid"
+    mock_process = MagicMock(returncode=0)
+    mock_process.stdout = b"invalid"
     mock_subprocess_run.return_value = mock_process
 
     memory = gpu.get_nvidia_memory()
@@ -56,8 +127,8 @@ def test_get_nvidia_memory_invalid_output(mock_subprocess_run):
 
 def test_get_amd_memory_success(mock_subprocess_run):
     """Test successful AMD GPU memory detection."""
-    mock_process = MagicMock()
-    mock_process.stdout = """
+    mock_process = MagicMock(returncode=0)
+    mock_process.stdout = b"""
 ======================ROCm System Management Interface======================
 =================Memory Usage (Utilization[%] / Used[GB])==================
 GPU_MEMORY:     40% / 12.3GB
@@ -68,7 +139,7 @@ GPU_MEMORY:     40% / 12.3GB
 
     mock_subprocess_run.assert_called_once_with(
         ['rocm-smi', '--showmeminfo'],
-        capture_output=True, text=True, check=True
+        capture_output=True
     )
     assert memory == 8.0  # Conservative estimate
 
@@ -92,8 +163,8 @@ def test_get_amd_memory_command_error(mock_subprocess_run):
 
 def test_get_amd_memory_no_gpu_info(mock_subprocess_run):
     """Test AMD GPU memory detection when no GPU info is found."""
-    mock_process = MagicMock()
-    mock_process.stdout = "No GPU information found"
+    mock_process = MagicMock(returncode=0)
+    mock_process.stdout = b"No GPU information found"
     mock_subprocess_run.return_value = mock_process
 
     memory = gpu.get_amd_memory()